@@ -3,14 +3,18 @@ Main Streamlit Application for Misinformation Detection
 Analyzes TikTok/Instagram videos for claims, scams, and deepfakes
 """
 
+import time
 import streamlit as st
-import json
-from datetime import datetime
-from modules.video_processor import VideoProcessor
-from modules.transcript_extractor import TranscriptExtractor
-from modules.claim_detector import ClaimDetector
-from modules.risk_analyzer import RiskAnalyzer
+from datetime import datetime, timedelta
+from modules.pipeline import AnalysisPipeline, NO_TRANSCRIPT
+from modules.export import MIME_TYPES, serialize
+from modules.pdf_report import result_hash
 from modules.report_generator import ReportGenerator
+from modules.result_cache import ResultCache
+from modules.jobs import DONE, FAILED, INVALID_LINK_ERROR, JobService
+from modules.results_store import ResultsStore
+from modules.tracing import Trace, start_metrics_server_from_env
+from modules import start_warm_up
 from utils.helpers import set_page_config, format_risk_level
 
 # Page configuration
@@ -36,12 +40,103 @@ st.markdown("""
 # Initialize session state
 if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = None
+if 'analysis_exports' not in st.session_state:
+    st.session_state.analysis_exports = {}
+    st.session_state.analysis_hash = None
+    st.session_state.pdf_requested = False
 if 'current_step' not in st.session_state:
     st.session_state.current_step = 'input'
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+if 'history_cursors' not in st.session_state:
+    st.session_state.history_cursors = [None]  # cursor of each visited history page
+    st.session_state.history_filters = None
+
+# Seconds between status checks while a job is queued or running
+JOB_POLL_SECONDS = 0.5
+
+HISTORY_PAGE_SIZE = 25
+
+HISTORY_PERIODS = {
+    'Last 24 hours': timedelta(days=1),
+    'Last 7 days': timedelta(days=7),
+    'Last 30 days': timedelta(days=30),
+    'All time': None,
+}
+
+JOB_STAGE_MESSAGES = {
+    'link': "🔗 Validating video link...",
+    'transcript': "📝 Extracting transcript...",
+    'analysis': "🔎 Detecting claims and analyzing risks...",
+}
+
+@st.cache_resource
+def get_pipeline() -> AnalysisPipeline:
+    """Analysis pipeline shared by every session in this process"""
+    return AnalysisPipeline()
+
+
+@st.cache_resource
+def start_background_warm_up():
+    """Load heavy models once per process without blocking the first page"""
+    return start_warm_up(get_pipeline())
+
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Serve /metrics once per process when METRICS_PORT is set"""
+    return start_metrics_server_from_env()
+
+
+@st.cache_resource
+def get_job_service() -> JobService:
+    """Job queue whose workers run every session's analyses"""
+    return JobService.from_env(get_pipeline())
+
+
+@st.cache_resource
+def get_results_store():
+    """History of finished analyses, or None if RESULTS_DB_PATH is empty"""
+    return ResultsStore.from_env()
+
+
+@st.cache_resource
+def get_report_generator() -> ReportGenerator:
+    """Report generator shared by every session in this process"""
+    return ReportGenerator()
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Finished analyses keyed by video link, shared across sessions"""
+    return ResultCache(matcher=get_pipeline().claim_detector.matcher)
+
+
+def set_analysis_results(results):
+    """Store the current result and drop exports serialized for the previous one"""
+    # A job still pending from an earlier submission must not overwrite this result
+    st.session_state.job_id = None
+    st.session_state.analysis_results = results
+    st.session_state.analysis_exports = {}
+    # Hashed once here, so reruns can find the cached PDF without rehashing
+    st.session_state.analysis_hash = result_hash(results) if results else None
+    st.session_state.pdf_requested = False
+
+
+def get_export(format_type: str) -> bytes:
+    """Current result serialized in format_type, computed once per result"""
+    exports = st.session_state.analysis_exports
+    if format_type not in exports:
+        exports[format_type] = serialize(st.session_state.analysis_results, format_type)
+    return exports[format_type]
+
 
 def main():
     """Main application flow"""
     
+    start_background_warm_up()
+    start_metrics_exporter()
+    
     # Header
     st.title("🔍 Misinformation Analyzer")
     st.markdown("### Analyze TikTok & Instagram videos for credibility, scams, and deepfakes")
@@ -85,96 +180,169 @@ def main():
             st.session_state.current_step = 'processing'
             process_video(video_link)
     
-    # Display previous results if available
+    if st.session_state.job_id:
+        poll_job()
+    
+    # Display results (rendered exactly once per rerun)
     if st.session_state.analysis_results:
         display_results(st.session_state.analysis_results)
+    
+    display_history()
 
 
 def process_video(video_link):
-    """Process the uploaded video through all analysis modules"""
+    """Serve a cached analysis, or queue the video for the analysis workers"""
     
-    progress_placeholder = st.empty()
-    status_placeholder = st.empty()
+    trace = Trace()
+    result_cache = get_result_cache()
+    with trace.span('result_cache', bytes_processed=len(video_link)) as span:
+        cached_results = result_cache.get(video_link)
+        span['cache'] = 'miss' if cached_results is None else 'hit'
+    if cached_results is not None:
+        # Timings of this lookup replace those of the original analysis
+        set_analysis_results({**cached_results, 'timings': trace.to_list()})
+        st.success("✅ Analysis complete! (served from cache)")
+        return
     
-    try:
-        # Step 1: Validate and extract video info
-        with status_placeholder.container():
-            st.info("🔗 Validating video link...")
-        
-        video_processor = VideoProcessor()
-        video_info = video_processor.process_link(video_link)
-        
-        if not video_info:
-            st.error("❌ Could not process this video link. Please check the URL.")
+    # The pipeline runs in the job service's workers, not in this script run
+    set_analysis_results(None)
+    st.session_state.job_id = get_job_service().submit(video_link)
+
+
+def poll_job():
+    """Show the current job's progress, rerunning until it finishes"""
+    
+    job_service = get_job_service()
+    job = job_service.status(st.session_state.job_id)
+    if job is None:
+        st.session_state.job_id = None
+        return
+    
+    if job['status'] == DONE:
+        st.session_state.job_id = None
+        analysis_results = job_service.result(job['id'])
+        if analysis_results is None:
+            # Pruned or unreadable between the status and result reads
+            st.session_state.current_step = 'error'
+            st.error("❌ The analysis result is no longer available. Please analyze the video again.")
             return
+        set_analysis_results(analysis_results)
+        get_result_cache().set(job['url'], analysis_results)
         
-        # Step 2: Extract transcript
-        with status_placeholder.container():
-            st.info("📝 Extracting transcript...")
-        
-        transcript_extractor = TranscriptExtractor()
-        transcript = transcript_extractor.extract(video_info)
-        
-        if not transcript:
+        if analysis_results.get('transcript') == NO_TRANSCRIPT:
             st.warning("⚠️ Could not extract transcript. Proceeding with visual analysis...")
-            transcript = "[No transcript available]"
-        
-        # Step 3: Detect claims
-        with status_placeholder.container():
-            st.info("🔎 Detecting claims...")
-        
-        claim_detector = ClaimDetector()
-        claims = claim_detector.detect_claims(transcript)
+        # main() renders the results
+        st.success("✅ Analysis complete!")
+    
+    elif job['status'] == FAILED:
+        st.session_state.job_id = None
+        st.session_state.current_step = 'error'
+        if job['error'] == INVALID_LINK_ERROR:
+            st.error("❌ Could not process this video link. Please check the URL.")
+        else:
+            st.error(f"❌ Error during analysis: {job['error']}")
+    
+    else:
+        if job.get('position'):
+            st.info(f"⏳ Waiting for a free analysis worker ({job['position']} ahead in the queue)...")
+        else:
+            st.info(JOB_STAGE_MESSAGES.get(job['stage'], "⏳ Waiting for a free analysis worker..."))
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
+
+def display_history():
+    """Browse earlier analyses one page at a time"""
+    
+    results_store = get_results_store()
+    if results_store is None:
+        return
+    
+    with st.expander("📚 Analysis History"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            platform = st.selectbox("Platform", ['All', 'tiktok', 'instagram', 'youtube'])
+        with col2:
+            scam_risk = st.selectbox("Scam Risk", ['Any', 'high', 'medium', 'low'])
+        with col3:
+            period = st.selectbox("Period", list(HISTORY_PERIODS), index=1)
         
-        # Step 4: Analyze risks
-        with status_placeholder.container():
-            st.info("⚠️ Analyzing risks...")
+        # Changing a filter starts again from the first page
+        filters = (platform, scam_risk, period)
+        if filters != st.session_state.history_filters:
+            st.session_state.history_filters = filters
+            st.session_state.history_cursors = [None]
         
-        risk_analyzer = RiskAnalyzer()
-        risk_analysis = risk_analyzer.analyze(
-            transcript=transcript,
-            claims=claims,
-            video_info=video_info
+        since = datetime.now() - HISTORY_PERIODS[period] if HISTORY_PERIODS[period] else None
+        page = results_store.query(
+            limit=HISTORY_PAGE_SIZE,
+            cursor=st.session_state.history_cursors[-1],
+            platform=None if platform == 'All' else platform,
+            scam_risk_level=None if scam_risk == 'Any' else scam_risk,
+            since=since.timestamp() if since else None
         )
         
-        # Step 5: Generate credibility score
-        credibility_score = calculate_credibility_score(risk_analysis, claims)
-        
-        # Compile results
-        analysis_results = {
-            "timestamp": datetime.now().isoformat(),
-            "video_info": video_info,
-            "transcript": transcript,
-            "claims": claims,
-            "risk_analysis": risk_analysis,
-            "credibility_score": credibility_score,
-            "url": video_link
-        }
-        
-        st.session_state.analysis_results = analysis_results
-        
-        # Step 6: Generate report
-        with status_placeholder.container():
-            st.info("📊 Generating report...")
-        
-        report_generator = ReportGenerator()
-        report = report_generator.generate(analysis_results)
-        
-        # Clear status and show success
-        status_placeholder.empty()
-        st.success("✅ Analysis complete!")
+        if not page['rows']:
+            st.info("No analyses match these filters.")
+            return
         
-        # Display results
-        display_results(analysis_results)
+        st.dataframe([
+            {
+                'ID': row['id'],
+                'Analyzed': datetime.fromtimestamp(row['analyzed_at']).strftime('%Y-%m-%d %H:%M'),
+                'Platform': row['platform'],
+                'Title': row['title'],
+                'Credibility': row['credibility_score'],
+                'Scam Risk': row['scam_risk_level'],
+                'Deepfake Risk': row['deepfake_risk_level'],
+                'Claims': row['claim_count'],
+                'URL': row['url'],
+            }
+            for row in page['rows']
+        ], use_container_width=True, hide_index=True)
         
-    except Exception as e:
-        st.error(f"❌ Error during analysis: {str(e)}")
-        st.session_state.current_step = 'error'
+        col1, col2, col3, col4 = st.columns([1, 1, 2, 1])
+        with col1:
+            if st.button("⬅️ Newer", disabled=len(st.session_state.history_cursors) == 1):
+                st.session_state.history_cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Older ➡️", disabled=page['next_cursor'] is None):
+                st.session_state.history_cursors.append(page['next_cursor'])
+                st.rerun()
+        with col3:
+            result_id = st.selectbox("Analysis", [row['id'] for row in page['rows']],
+                                     label_visibility="collapsed")
+        with col4:
+            if st.button("Open", use_container_width=True):
+                set_analysis_results(results_store.get(result_id))
+                st.rerun()
+
+
+def display_timings(timings):
+    """Show the per-stage timing breakdown of an analysis in the sidebar"""
+    with st.sidebar:
+        st.divider()
+        st.header("⏱️ Timing")
+        for span in timings:
+            details = []
+            if span.get('cache'):
+                details.append(f"cache {span['cache']}")
+            if span.get('bytes'):
+                details.append(f"{span['bytes']:,} bytes")
+            if span.get('error'):
+                details.append("error")
+            suffix = f" ({', '.join(details)})" if details else ""
+            st.write(f"• {span['stage']}: {span['duration_ms']:.1f} ms{suffix}")
+        st.caption(f"Total: {sum(span['duration_ms'] for span in timings):.1f} ms")
 
 
 def display_results(results):
     """Display analysis results in a formatted way"""
     
+    if results.get('timings'):
+        display_timings(results['timings'])
+    
     st.divider()
     st.header("📊 Analysis Results")
     
@@ -208,7 +376,7 @@ def display_results(results):
     # Transcript
     with st.expander("📝 Transcript"):
         transcript_text = results['transcript']
-        if transcript_text == "[No transcript available]":
+        if transcript_text == NO_TRANSCRIPT:
             st.warning("⚠️ Transcript not available for this video. The app will analyze visual content and metadata instead.")
         st.text_area("Full Transcript", value=transcript_text, height=200, disabled=True, key="transcript_area")
     
@@ -224,6 +392,10 @@ def display_results(results):
                     color = 'green' if status == 'verified' else 'red' if status == 'false' else 'gray'
                     st.markdown(f"<span style='color: {color};'>**{status.upper()}**</span>", unsafe_allow_html=True)
                 st.caption(f"Confidence: {claim.get('confidence', 0)}%")
+                if 'start' in claim:
+                    st.caption(f"On screen at {claim['start']:.1f}s-{claim['end']:.1f}s")
+                if claim.get('fact_check'):
+                    st.caption(f"Fact-check match ({claim['match_score']:.0%}): {claim['fact_check']['claim']}")
         else:
             st.info("No significant claims detected.")
     
@@ -233,41 +405,43 @@ def display_results(results):
     
     # Download Report
     st.divider()
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
-        report_json = json.dumps(results, indent=2)
         st.download_button(
             label="📥 Download JSON Report",
-            data=report_json,
+            data=get_export('json'),
             file_name=f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-            mime="application/json"
+            mime=MIME_TYPES['json']
         )
     
-    with col2:
-        # TODO: Add PDF report download
-        st.button("📄 Generate PDF Report (Coming Soon)", disabled=True, key="pdf_button")
-
-
-def calculate_credibility_score(risk_analysis, claims):
-    """Calculate credibility score based on risk analysis and claims"""
-    
-    score = 100
-    
-    # Deduct based on scam risk
-    scam_risk = risk_analysis.get('scam_risk_level', 'low')
-    score -= {'low': 5, 'medium': 20, 'high': 40}.get(scam_risk, 0)
-    
-    # Deduct based on deepfake risk
-    deepfake_risk = risk_analysis.get('deepfake_risk_level', 'low')
-    score -= {'low': 5, 'medium': 15, 'high': 35}.get(deepfake_risk, 0)
-    
-    # Deduct based on false claims
-    false_claims = sum(1 for claim in claims if claim.get('status') == 'false')
-    score -= false_claims * 10
+    with col3:
+        st.download_button(
+            label="📦 Download MessagePack",
+            data=get_export('msgpack'),
+            file_name=f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.msgpack",
+            mime=MIME_TYPES['msgpack']
+        )
     
-    # Floor at 0
-    return max(0, min(100, score))
+    with col2:
+        # Rendered by a background worker on request; cached by result hash after the first time
+        if not st.session_state.pdf_requested:
+            if st.button("📄 Prepare PDF Report", key="pdf_button"):
+                st.session_state.pdf_requested = True
+        if st.session_state.pdf_requested:
+            pdf_job = get_report_generator().pdf_service.submit(results, st.session_state.analysis_hash)
+            if not pdf_job.done():
+                st.button("⏳ Preparing PDF Report... (click to refresh)", key="pdf_refresh_button")
+            elif pdf_job.exception() is not None:
+                st.error(f"PDF report failed: {pdf_job.exception()}")
+            else:
+                with open(pdf_job.result(), 'rb') as pdf_file:
+                    st.download_button(
+                        label="📄 Download PDF Report",
+                        data=pdf_file.read(),
+                        file_name=f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                        mime="application/pdf"
+                    )
 
 
 if __name__ == "__main__":
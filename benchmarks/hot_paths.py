@@ -0,0 +1,162 @@
+"""
+Hot Path Benchmarks
+Throughput of claim detection, risk analysis, report generation and link parsing
+
+Usage:
+    python benchmarks/hot_paths.py --save benchmarks/baseline.json
+    python benchmarks/hot_paths.py --compare benchmarks/baseline.json --threshold 0.2
+    python benchmarks/hot_paths.py --sizes 1KB 64KB 1MB
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.claim_detector import ClaimDetector
+from modules.report_generator import ReportGenerator
+from modules.risk_analyzer import RiskAnalyzer
+from modules.scoring import calculate_credibility_score
+from modules.video_processor import VideoProcessor
+
+from synthetic import SIZES, make_transcript, make_urls
+
+
+URL_BATCH = 10000
+
+
+def best_time(fn: Callable, min_time: float = 0.5, max_repeat: int = 20) -> float:
+    """Best wall time of fn over repeats lasting at least min_time in total"""
+    best = float('inf')
+    total = 0.0
+    runs = 0
+    while runs < max_repeat and (runs == 0 or total < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return best
+
+
+def run_benchmarks(sizes: List[str], keyword_density: float = 0.1,
+                   min_time: float = 0.5) -> Dict[str, Dict]:
+    """
+    Run every benchmark
+    
+    Returns:
+        Benchmark name -> {'seconds', 'throughput', 'unit'}
+    """
+    detector = ClaimDetector()
+    analyzer = RiskAnalyzer(matcher=detector.matcher)
+    reports = ReportGenerator()
+    processor = VideoProcessor()
+    video_info = {'platform': 'tiktok', 'video_id': '1', 'url': 'https://www.tiktok.com/video/1', 'duration': 30}
+    results: Dict[str, Dict] = {}
+    
+    def record(name: str, seconds: float, amount: float, unit: str):
+        results[name] = {'seconds': round(seconds, 6), 'throughput': round(amount / seconds, 3), 'unit': unit}
+        print(f"  {name:<32} {results[name]['throughput']:>14,.2f} {unit:<10} ({seconds * 1000:.2f} ms)")
+    
+    for size_name in sizes:
+        transcript = make_transcript(SIZES[size_name], keyword_density)
+        megabytes = len(transcript.encode('utf-8')) / (1 << 20)
+        claims = detector.detect_claims(transcript)
+        risk_analysis = analyzer.analyze(transcript, claims, video_info)
+        result = {
+            'timestamp': datetime.now().isoformat(),
+            'video_info': video_info,
+            'transcript': transcript,
+            'claims': claims,
+            'risk_analysis': risk_analysis,
+            'credibility_score': calculate_credibility_score(risk_analysis, claims),
+            'url': video_info['url'],
+        }
+        
+        record(f'detect_claims[{size_name}]',
+               best_time(lambda: detector.detect_claims(transcript), min_time), megabytes, 'MB/s')
+        record(f'risk_analyze[{size_name}]',
+               best_time(lambda: analyzer.analyze(transcript, claims, video_info), min_time), megabytes, 'MB/s')
+        record(f'report_json[{size_name}]',
+               best_time(lambda: reports.generate(result, 'json'), min_time), megabytes, 'MB/s')
+        record(f'report_html[{size_name}]',
+               best_time(lambda: reports.generate(result, 'html'), min_time), 1, 'reports/s')
+    
+    urls = make_urls(URL_BATCH)
+    record('process_link', best_time(lambda: [processor.process_link(url) for url in urls], min_time),
+           len(urls), 'links/s')
+    record('process_links', best_time(lambda: processor.process_links(urls), min_time),
+           len(urls), 'links/s')
+    return results
+
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    Names of benchmarks whose throughput fell more than threshold below baseline
+    
+    Benchmarks missing from either side are skipped.
+    """
+    regressions = []
+    print(f"\n  {'benchmark':<32} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name in sorted(set(current) & set(baseline)):
+        before = baseline[name]['throughput']
+        after = current[name]['throughput']
+        change = after / before - 1 if before else 0.0
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"  {name:<32} {before:>14,.2f} {after:>14,.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the analysis hot paths")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES),
+                        help="Transcript sizes to benchmark (default: all)")
+    parser.add_argument('--keyword-density', type=float, default=0.1,
+                        help="Expected fraction of sentences containing a keyword")
+    parser.add_argument('--min-time', type=float, default=0.5, help="Minimum seconds spent per benchmark")
+    parser.add_argument('--save', default=None, help="Write results to this JSON file")
+    parser.add_argument('--compare', default=None, help="Baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed throughput drop before flagging a regression (default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    
+    print(f"Python {platform.python_version()} on {platform.machine()}, keyword density {args.keyword_density}")
+    results = run_benchmarks(args.sizes, args.keyword_density, args.min_time)
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': datetime.now().isoformat(),
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                    'keyword_density': args.keyword_density,
+                },
+                'results': results,
+            }, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}")
+            return 1
+        print("\nOK: no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Startup Time Benchmark
+Measures the cold import time of the modules app.py loads at startup
+
+Fails (exit code 1) if the import takes longer than the budget or pulls in
+a heavy dependency that should only load on first use.
+
+Usage:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --max-ms 150 --runs 10
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def app_imports(path: str = os.path.join(ROOT, 'app.py')) -> Tuple[str, ...]:
+    """
+    The ``modules`` package imports of app.py, in order
+    
+    Read from app.py itself so the benchmark follows the app's real startup
+    path. Streamlit and ``utils`` (which only wraps streamlit) are left out.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.append(node.module)
+    return tuple(dict.fromkeys(name for name in names if name.split('.')[0] == 'modules'))
+
+
+# What app.py imports from this repository
+STARTUP_IMPORTS = app_imports()
+
+# Dependencies that must not be imported until a request needs them
+HEAVY_MODULES = (
+    'torch', 'transformers', 'easyocr', 'yt_dlp', 'youtube_transcript_api',
+    'numpy', 'pandas', 'PIL', 'msgpack', 'requests',
+)
+
+DEFAULT_MAX_MS = 150.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': elapsed, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_once(imports=STARTUP_IMPORTS) -> Dict:
+    """Import the given modules in a fresh interpreter and report time and heavy modules"""
+    code = _PROBE.format(imports='\n'.join(f'import {name}' for name in imports), heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, check=True,
+        stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(runs: int = 5, imports=STARTUP_IMPORTS) -> Dict:
+    """
+    Best-of-N cold import time
+    
+    Returns:
+        Dict with 'best_ms', 'median_ms', 'runs' and 'heavy' (heavy modules loaded)
+    """
+    samples: List[float] = []
+    heavy = set()
+    for _ in range(runs):
+        result = measure_once(imports)
+        samples.append(result['ms'])
+        heavy.update(result['heavy'])
+    samples.sort()
+    return {
+        'best_ms': round(samples[0], 2),
+        'median_ms': round(samples[len(samples) // 2], 2),
+        'runs': runs,
+        'heavy': sorted(heavy),
+    }
+
+
+def main(argv=None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Check cold import time of the app's modules")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument('--max-ms', type=float,
+                        default=float(os.environ.get('STARTUP_BUDGET_MS', DEFAULT_MAX_MS)),
+                        help="Fail if the best import time exceeds this (default: STARTUP_BUDGET_MS or 150)")
+    args = parser.parse_args(argv)
+    
+    result = measure(args.runs)
+    print(f"Cold import of {', '.join(STARTUP_IMPORTS)}")
+    print(f"  best {result['best_ms']} ms, median {result['median_ms']} ms over {result['runs']} runs "
+          f"(budget {args.max_ms} ms)")
+    
+    failed = False
+    if result['heavy']:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(result['heavy'])}")
+        failed = True
+    if result['best_ms'] > args.max_ms:
+        print(f"FAIL: import time {result['best_ms']} ms exceeds budget {args.max_ms} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
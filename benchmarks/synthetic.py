@@ -0,0 +1,84 @@
+"""
+Synthetic Transcripts
+Deterministic transcript generator for the benchmark suite
+"""
+
+import os
+import random
+import sys
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.keyword_matcher import DEFAULT_RULESET
+
+
+FILLER_WORDS = (
+    'the', 'video', 'people', 'money', 'today', 'really', 'going', 'think', 'about',
+    'this', 'that', 'market', 'health', 'every', 'morning', 'friends', 'family', 'new',
+    'phone', 'home', 'work', 'time', 'know', 'right', 'thing', 'story', 'watch', 'share',
+    'doctor', 'price', 'world', 'week', 'year', 'city', 'food', 'water', 'energy',
+)
+
+SIZES = {
+    '1KB': 1 << 10,
+    '64KB': 64 << 10,
+    '1MB': 1 << 20,
+    '10MB': 10 << 20,
+    '50MB': 50 << 20,
+}
+
+
+def make_sentence(rng: random.Random, keyword_density: float, number_rate: float = 0.2,
+                  ruleset: Optional[Dict[str, List[str]]] = None) -> str:
+    """One sentence of filler words, carrying a ruleset keyword with probability keyword_density"""
+    ruleset = ruleset or DEFAULT_RULESET
+    words = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(8, 16))]
+    if rng.random() < number_rate:
+        words.insert(rng.randrange(len(words)), f"{rng.randint(2, 99)}%")
+    if rng.random() < keyword_density:
+        category = rng.choice(sorted(ruleset))
+        words.insert(rng.randrange(len(words)), rng.choice(ruleset[category]))
+    words[0] = words[0].capitalize()
+    return ' '.join(words) + rng.choice('..!?')
+
+
+def make_transcript(size: int, keyword_density: float = 0.1, seed: int = 0,
+                    pool_size: int = 2000) -> str:
+    """
+    Transcript of about size bytes (never more) with controlled keyword density
+    
+    Sentences are drawn from a fixed pool so generating 50 MB stays fast;
+    keyword_density is the expected fraction of sentences with a keyword.
+    """
+    rng = random.Random(seed)
+    pool = [make_sentence(rng, keyword_density) for _ in range(pool_size)]
+    
+    parts: List[str] = []
+    length = 0
+    while True:
+        sentence = rng.choice(pool)
+        if length + len(sentence) + 1 > size:
+            break
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(parts)
+
+
+def make_urls(count: int, seed: int = 0) -> List[str]:
+    """Mixed TikTok, Instagram, YouTube and unsupported links"""
+    rng = random.Random(seed)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'
+    
+    def token(length: int) -> str:
+        return ''.join(rng.choice(alphabet) for _ in range(length))
+    
+    templates = (
+        lambda: f"https://www.tiktok.com/@user{rng.randint(1, 9999)}/video/{rng.randint(10**18, 10**19)}",
+        lambda: f"https://vm.tiktok.com/{token(9).replace('_', 'x').replace('-', 'y')}",
+        lambda: f"https://www.instagram.com/reel/{token(11)}/",
+        lambda: f"https://www.youtube.com/watch?v={token(11)}&t={rng.randint(1, 600)}s",
+        lambda: f"https://youtu.be/{token(11)}",
+        lambda: f"https://example.com/watch/{token(8)}",
+    )
+    return [rng.choice(templates)() for _ in range(count)]
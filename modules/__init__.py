@@ -1 +1,69 @@
 # Analysis modules for misinformation detection
+"""
+Public classes are resolved lazily (PEP 562), so ``import modules`` costs
+nothing and ``from modules import ResultCache`` only imports the submodule
+that defines it. Heavy backends (torch, transformers, EasyOCR, NumPy) are
+imported inside the functions that use them; ``start_warm_up`` loads them
+in the background ahead of the first request.
+"""
+
+import importlib
+import threading
+from typing import Optional
+
+
+# Public name -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    'AnalysisPipeline': 'modules.pipeline',
+    'NO_TRANSCRIPT': 'modules.pipeline',
+    'AsyncAnalysisPipeline': 'modules.async_pipeline',
+    'VideoProcessor': 'modules.video_processor',
+    'TranscriptExtractor': 'modules.transcript_extractor',
+    'TranscriptCache': 'modules.transcript_cache',
+    'ChunkedTranscriber': 'modules.speech_to_text',
+    'OverlayTextExtractor': 'modules.overlay_text',
+    'DeepfakeScorer': 'modules.deepfake_detector',
+    'KeywordMatcher': 'modules.keyword_matcher',
+    'ClaimDetector': 'modules.claim_detector',
+    'ClaimClassifier': 'modules.claim_classifier',
+    'FactChecker': 'modules.fact_checker',
+    'DuplicateIndex': 'modules.duplicate_index',
+    'RiskAnalyzer': 'modules.risk_analyzer',
+    'calculate_credibility_score': 'modules.scoring',
+    'ReportGenerator': 'modules.report_generator',
+    'PDFReportService': 'modules.pdf_report',
+    'ResultCache': 'modules.result_cache',
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES) + ['start_warm_up']
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'modules' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+def start_warm_up(pipeline: Optional['AnalysisPipeline'] = None) -> threading.Thread:
+    """
+    Warm up a pipeline's heavy backends in a daemon thread
+    
+    Args:
+        pipeline: Pipeline to warm up (a default AnalysisPipeline if not given)
+        
+    Returns:
+        The started thread; join it to wait for warm-up to finish
+    """
+    def run():
+        (pipeline or __getattr__('AnalysisPipeline')()).warm_up()
+    
+    thread = threading.Thread(target=run, name='modules-warm-up', daemon=True)
+    thread.start()
+    return thread
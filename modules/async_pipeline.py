@@ -0,0 +1,180 @@
+"""
+Async Pipeline Module
+Asyncio analysis pipeline that overlaps a video's independent network fetches
+"""
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.pipeline import AnalysisPipeline
+from modules.tracing import Trace
+from modules.video_processor import is_resolved
+
+
+# Fetcher: takes video_info, returns stage output (run in the I/O thread pool)
+Fetcher = Callable[[Dict], Any]
+
+DEFAULT_PLATFORM_LIMITS = {'youtube': 8, 'tiktok': 4, 'instagram': 4}
+
+
+class AsyncAnalysisPipeline:
+    """
+    Run AnalysisPipeline with concurrent fetch stages
+    
+    After link validation (and, with a metadata provider, resolving a
+    TikTok short link so every stage sees the same video), every
+    registered fetcher starts at once: the transcript fetch, the metadata
+    lookup (when the pipeline has a metadata provider) and any fetchers
+    added with ``add_fetcher``. Fetches for a
+    platform share a semaphore so no platform sees more than its limit of
+    concurrent requests. Claim detection and risk analysis only await the
+    fetched data once all fetchers for the video have finished.
+    
+    Fetchers and analysis run in a shared thread pool because the
+    transcript, metadata and media libraries are blocking. ``self.session``
+    is the pooled ``requests.Session`` the metadata lookups use; other
+    HTTP-based fetchers should use it too. ``close`` only closes the
+    session if this object created it.
+    """
+    
+    def __init__(self, pipeline: Optional[AnalysisPipeline] = None,
+                 max_workers: int = 16,
+                 platform_limits: Optional[Dict[str, int]] = None,
+                 default_platform_limit: int = 4,
+                 max_concurrent_videos: int = 32):
+        self.pipeline = pipeline or AnalysisPipeline()
+        self.platform_limits = dict(DEFAULT_PLATFORM_LIMITS, **(platform_limits or {}))
+        self.default_platform_limit = default_platform_limit
+        self.max_concurrent_videos = max_concurrent_videos
+        
+        provider = self.pipeline.metadata_provider
+        # The provider's session is shared with its other users, so it is not ours to close
+        self._owns_session = provider is None or provider.session is None
+        if not self._owns_session:
+            self.session = provider.session
+        else:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Event loop -> platform -> semaphore; a semaphore only works on the loop it was made on
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]' = (
+            weakref.WeakKeyDictionary()
+        )
+        
+        # Stage name -> fetcher(video_info, trace); 'transcript' output feeds
+        # the analysis, dict outputs of other stages are merged into video_info
+        self.fetchers: Dict[str, Callable[[Dict, Trace], Any]] = {
+            'transcript': self.pipeline.extract_transcript
+        }
+        if provider is not None:
+            self.fetchers['metadata'] = self.pipeline.fetch_metadata
+    
+    def add_fetcher(self, name: str, fetcher: Fetcher):
+        """Register an extra fetch stage to run alongside the others"""
+        def traced(video_info: Dict, trace: Trace) -> Any:
+            with trace.span(name):
+                return fetcher(video_info)
+        self.fetchers[name] = traced
+    
+    def _semaphore(self, platform: str) -> asyncio.Semaphore:
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if platform not in semaphores:
+            limit = self.platform_limits.get(platform, self.default_platform_limit)
+            semaphores[platform] = asyncio.Semaphore(limit)
+        return semaphores[platform]
+    
+    async def _run_blocking(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    async def _fetch(self, platform: str, fetcher: Callable, video_info: Dict, trace: Trace) -> Any:
+        async with self._semaphore(platform):
+            return await self._run_blocking(fetcher, video_info, trace)
+    
+    def _resolve_short_link(self, video_info: Dict, trace: Trace):
+        with trace.span('short_link'):
+            self.pipeline.metadata_provider.resolve_short_link(video_info)
+    
+    async def run(self, url: str) -> Optional[Dict]:
+        """
+        Analyze a video link end to end
+        
+        Args:
+            url: Video URL
+            
+        Returns:
+            Analysis results, or None if the link is invalid
+        """
+        trace = Trace()
+        # Link validation is a regex match with no I/O, so it stays on the loop
+        video_info = self.pipeline.validate_link(url, trace)
+        if not video_info:
+            return None
+        
+        platform = video_info.get('platform', '')
+        # Resolved before the fetches start, so the transcript is fetched
+        # (and cached) under the same video ID the metadata is looked up by
+        if (self.pipeline.metadata_provider is not None
+                and not is_resolved((platform, video_info['video_id']))):
+            await self._fetch(platform, self._resolve_short_link, video_info, trace)
+        
+        names = list(self.fetchers)
+        outputs = await asyncio.gather(*(
+            self._fetch(platform, self.fetchers[name], video_info, trace) for name in names
+        ))
+        
+        transcript = None
+        for name, output in zip(names, outputs):
+            if name == 'transcript':
+                transcript = output
+            elif isinstance(output, dict):
+                video_info.update(output)
+        
+        return await self._run_blocking(self.pipeline.analyze, url, video_info, transcript, trace)
+    
+    async def run_many(self, urls: Iterable[str], max_concurrent: Optional[int] = None) -> List[Optional[Dict]]:
+        """
+        Analyze many links concurrently
+        
+        At most ``max_concurrent`` videos (default ``max_concurrent_videos``)
+        are in flight at once, each worker taking the next link when its
+        current one finishes.
+        
+        Returns:
+            Results in input order; None for invalid links, the exception
+            instance for links that failed
+        """
+        urls = list(urls)
+        results: List[Any] = [None] * len(urls)
+        indices = iter(range(len(urls)))
+        
+        async def worker():
+            for index in indices:
+                try:
+                    results[index] = await self.run(urls[index])
+                except Exception as e:
+                    results[index] = e
+        
+        workers = min(max_concurrent or self.max_concurrent_videos, len(urls))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+    
+    def close(self):
+        """Release the thread pool and the HTTP session, if this object created it"""
+        self._executor.shutdown(wait=False)
+        if self._owns_session:
+            self.session.close()
+    
+    async def __aenter__(self) -> 'AsyncAnalysisPipeline':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,303 @@
+"""
+Batch Analysis Module
+Headless command-line analysis of many video links
+
+Usage:
+    python -m modules.batch urls.csv -o results.ndjson
+    python -m modules.batch urls.csv -o results.ndjson --html-report report.html
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from modules.export import to_ndjson_line
+from modules.pipeline import AnalysisPipeline
+from modules.records import ResultRecord
+from modules.report_generator import write_html_report
+from modules.results_store import ResultsStore
+from modules.tracing import METRICS, Trace, write_metrics_file_from_env
+from modules.video_processor import canonical_key
+
+
+# Per-process pipeline for the CPU stage, built on first use in each worker
+_worker_pipeline: Optional[AnalysisPipeline] = None
+
+
+def _get_worker_pipeline() -> AnalysisPipeline:
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        _worker_pipeline = AnalysisPipeline()
+    return _worker_pipeline
+
+
+def _analyze_in_worker(url: str, video_info: Dict, transcript: Optional[str]) -> Dict:
+    """CPU stage, run inside a process pool worker"""
+    return _get_worker_pipeline().analyze(url, video_info, transcript)
+
+
+def iter_urls(path: str) -> Iterator[str]:
+    """
+    Read video URLs from a CSV, NDJSON or plain text file
+    
+    CSV files use the ``url`` column if present, otherwise the first column.
+    NDJSON files (``.ndjson``/``.jsonl``) use each record's ``url`` field.
+    Any other file is read as one URL per line.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    
+    with open(path, newline='', encoding='utf-8') as handle:
+        if extension == '.csv':
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            if header is None:
+                return
+            column = 0
+            if 'url' in [field.strip().lower() for field in header]:
+                column = [field.strip().lower() for field in header].index('url')
+            elif header and header[0].strip():
+                yield header[0].strip()
+            for row in reader:
+                if len(row) > column and row[column].strip():
+                    yield row[column].strip()
+        elif extension in ('.ndjson', '.jsonl'):
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                url = json.loads(line).get('url')
+                if url:
+                    yield url.strip()
+        else:
+            for line in handle:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """
+    Collect URLs already analysed successfully in an NDJSON output file
+    
+    A trailing partial line left by a crash is truncated so new records
+    append cleanly. Error records are not counted, so they are retried.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    
+    with open(output_path, 'rb+') as handle:
+        valid_end = 0
+        for line in handle:
+            if not line.endswith(b'\n'):
+                break
+            valid_end += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'error' not in record and record.get('url'):
+                completed.add(record['url'])
+        handle.truncate(valid_end)
+    
+    return completed
+
+
+def iter_results(output_path: str) -> Iterator[Dict]:
+    """Lazily read successful analysis records from an NDJSON output file"""
+    with open(output_path, encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'error' not in record:
+                yield record
+
+
+def _claim_resolved_key(video_info: Dict, url: str, completed: Set) -> bool:
+    """
+    Record the video's key once its short link was resolved
+    
+    Returns:
+        False if the resolved video was already analysed or queued
+    """
+    key = (video_info.get('platform'), video_info.get('video_id'))
+    if key == canonical_key(url):
+        return True
+    if key in completed:
+        return False
+    completed.add(key)
+    return True
+
+
+def run_batch(urls: Iterable[str], output_path: str, io_workers: int = 8,
+              cpu_workers: Optional[int] = None, max_pending: int = 256,
+              resume: bool = True, results_store: Optional[ResultsStore] = None,
+              store_batch_size: int = 500) -> Dict[str, int]:
+    """
+    Analyze many URLs, appending one NDJSON record per URL as it finishes
+    
+    Link validation and transcript fetches run in a thread pool; claim
+    detection, risk analysis and scoring run in a process pool. The output
+    file doubles as the checkpoint: with ``resume`` set, URLs already in it
+    are skipped. Links are compared on their canonical (platform, video_id)
+    key, so other links to an already analysed video are skipped as well.
+    When a metadata provider resolves a TikTok short link, the resolved
+    key is checked again, so a short link to a video already queued is
+    skipped before analysis.
+    
+    Stage spans of every analysis are recorded in ``modules.tracing.METRICS``
+    of this process, including those timed inside the worker processes.
+    
+    Args:
+        urls: Video URLs to analyze
+        output_path: NDJSON file to append results to
+        io_workers: Threads for network-bound stages
+        cpu_workers: Processes for CPU-bound stages (default: CPU count)
+        max_pending: Maximum URLs in flight at once
+        resume: Skip videos already present in output_path
+        results_store: Also append successful results to this history,
+            ``store_batch_size`` rows per transaction. Results are buffered
+            as compact ``ResultRecord``s, so the history gets that form
+            (without auxiliary video_info keys); the NDJSON output is complete
+        store_batch_size: Results buffered per results_store write
+        
+    Returns:
+        Counts of analysed, failed and skipped URLs
+    """
+    completed = {canonical_key(url) or url for url in load_checkpoint(output_path)} if resume else set()
+    stats = {'analyzed': 0, 'failed': 0, 'skipped': 0}
+    
+    def todo() -> Iterator[str]:
+        for url in urls:
+            key = canonical_key(url) or url
+            if key in completed:
+                stats['skipped'] += 1
+                continue
+            completed.add(key)
+            yield url
+    
+    pipeline = AnalysisPipeline()
+    matcher = pipeline.claim_detector.matcher
+    
+    fetch_timings = {}  # url -> spans of the I/O stages
+    
+    def fetch(url: str) -> Optional[Dict]:
+        trace = Trace()
+        video_info = pipeline.process_link(url, trace)
+        if not video_info:
+            return None
+        transcript = pipeline.extract_transcript(video_info, trace)
+        fetch_timings[url] = trace.to_list()
+        return {'video_info': video_info, 'transcript': transcript}
+    
+    pending_urls = todo()
+    
+    unstored: List[ResultRecord] = []  # successful results not yet in results_store
+    
+    with ThreadPoolExecutor(max_workers=io_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=cpu_workers) as cpu_pool, \
+            open(output_path, 'ab') as output:
+        
+        def write(record: Dict):
+            output.write(to_ndjson_line(record))
+            output.flush()
+            if 'error' in record:
+                stats['failed'] += 1
+                return
+            stats['analyzed'] += 1
+            if results_store is not None:
+                unstored.append(ResultRecord.from_dict(record, matcher, include_transcript=True))
+                if len(unstored) >= store_batch_size:
+                    results_store.append_many(stored.to_dict(matcher) for stored in unstored)
+                    unstored.clear()
+        
+        def write_error(url: str, error: str):
+            write({'url': url, 'error': error, 'timestamp': datetime.now().isoformat()})
+        
+        in_flight = {}  # future -> (stage, url)
+        exhausted = False
+        
+        while True:
+            while not exhausted and len(in_flight) < max_pending:
+                url = next(pending_urls, None)
+                if url is None:
+                    exhausted = True
+                    break
+                in_flight[io_pool.submit(fetch, url)] = ('fetch', url)
+            
+            if not in_flight:
+                break
+            
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, url = in_flight.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    fetch_timings.pop(url, None)
+                    write_error(url, f"{stage} failed: {e}")
+                    continue
+                
+                if stage == 'analyze':
+                    # Worker spans were recorded in the worker's registry
+                    for span in value.get('timings', []):
+                        METRICS.observe(span)
+                    value['timings'] = fetch_timings.pop(url, []) + value.get('timings', [])
+                    write(value)
+                elif value is None:
+                    write_error(url, 'invalid or unsupported video link')
+                elif not _claim_resolved_key(value['video_info'], url, completed):
+                    fetch_timings.pop(url, None)
+                    stats['skipped'] += 1
+                else:
+                    in_flight[cpu_pool.submit(
+                        _analyze_in_worker, url, value['video_info'], value['transcript']
+                    )] = ('analyze', url)
+    
+    if unstored:
+        results_store.append_many(stored.to_dict(matcher) for stored in unstored)
+    return stats
+
+
+def main(argv=None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Analyze video links in bulk and write NDJSON results"
+    )
+    parser.add_argument('input', help="CSV, NDJSON or text file of video URLs")
+    parser.add_argument('-o', '--output', required=True, help="NDJSON results file (also the checkpoint)")
+    parser.add_argument('--io-workers', type=int, default=8, help="Threads for link/transcript fetches")
+    parser.add_argument('--cpu-workers', type=int, default=None, help="Processes for analysis (default: CPU count)")
+    parser.add_argument('--max-pending', type=int, default=256, help="Maximum URLs in flight")
+    parser.add_argument('--no-resume', action='store_true', help="Reanalyze URLs already in the output file")
+    parser.add_argument('--html-report', default=None, help="Also write an HTML report of all results to this file")
+    args = parser.parse_args(argv)
+    
+    stats = run_batch(
+        iter_urls(args.input),
+        args.output,
+        io_workers=args.io_workers,
+        cpu_workers=args.cpu_workers,
+        max_pending=args.max_pending,
+        resume=not args.no_resume,
+        results_store=ResultsStore.from_env()
+    )
+    
+    print(f"Analyzed: {stats['analyzed']}  Failed: {stats['failed']}  Skipped: {stats['skipped']}")
+    write_metrics_file_from_env()
+    
+    if args.html_report:
+        written = write_html_report(iter_results(args.output), args.html_report)
+        print(f"Wrote HTML report of {written} analyses to {args.html_report}")
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
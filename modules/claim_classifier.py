@@ -0,0 +1,238 @@
+"""
+Claim Classifier Module
+Transformer claim-worthiness scoring with micro-batching and a score cache
+"""
+
+import hashlib
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Seconds a caller waits for its batch (the first one may load the model)
+BATCH_TIMEOUT_SECONDS = 120.0
+
+class ClaimBackend(ABC):
+    """Claim-worthiness model interface"""
+    
+    name = 'base'
+    
+    @abstractmethod
+    def predict(self, sentences: Sequence[str]) -> List[float]:
+        """Return the probability that each sentence is a check-worthy claim"""
+    
+    def warm_up(self):
+        """Load the model ahead of the first batch (no-op by default)"""
+
+
+class StubClaimBackend(ClaimBackend):
+    """
+    Offline backend for tests and dry runs
+    
+    Scores with ``score_sentence(sentence)`` if given, otherwise 0.0.
+    """
+    
+    name = 'stub'
+    
+    def __init__(self, score_sentence: Optional[Callable[[str], float]] = None):
+        self.score_sentence = score_sentence
+        self.batches: List[int] = []  # sizes of the batches seen
+    
+    def predict(self, sentences: Sequence[str]) -> List[float]:
+        self.batches.append(len(sentences))
+        if self.score_sentence is None:
+            return [0.0] * len(sentences)
+        return [self.score_sentence(sentence) for sentence in sentences]
+
+
+@lru_cache(maxsize=2)
+def _load_sequence_classifier(model_name: str):
+    """Load tokenizer and model once per process"""
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    return tokenizer, model
+
+
+class TransformersClaimBackend(ClaimBackend):
+    """Sequence-classification transformer (e.g. a fine-tuned claim-detection model)"""
+    
+    name = 'transformers'
+    
+    def __init__(self, model_name: str, positive_label: int = 1, max_length: int = 128):
+        self.model_name = model_name
+        self.positive_label = positive_label
+        self.max_length = max_length
+    
+    def warm_up(self):
+        _load_sequence_classifier(self.model_name)
+    
+    def predict(self, sentences: Sequence[str]) -> List[float]:
+        import torch
+        
+        tokenizer, model = _load_sequence_classifier(self.model_name)
+        inputs = tokenizer(
+            list(sentences), padding=True, truncation=True,
+            max_length=self.max_length, return_tensors='pt'
+        )
+        with torch.inference_mode():
+            logits = model(**inputs).logits
+        return torch.softmax(logits, dim=-1)[:, self.positive_label].tolist()
+
+
+def sentence_key(sentence: str) -> str:
+    """Content hash of a whitespace/case-normalized sentence"""
+    normalized = ' '.join(sentence.lower().split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class ScoreCache:
+    """Thread-safe LRU cache of sentence scores keyed by content hash"""
+    
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            return score
+    
+    def set(self, key: str, score: float):
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+
+class MicroBatcher:
+    """
+    Group sentences from concurrent callers into shared forward passes
+    
+    A background thread takes the first queued sentence, then keeps
+    collecting until the batch is full or ``max_latency_ms`` has passed
+    since that first sentence arrived, and runs one ``predict`` call for
+    the whole batch. If anything fails while a batch is handled, every
+    future of that batch still unresolved gets the exception, and the
+    thread goes on with the next batch.
+    """
+    
+    def __init__(self, backend: ClaimBackend, max_batch_size: int = 32, max_latency_ms: float = 10.0):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue: 'queue.Queue[Tuple[str, Future]]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='claim-micro-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, sentence: str) -> Future:
+        """Queue a sentence; the future resolves to its score"""
+        future = Future()
+        self._queue.put((sentence, future))
+        return future
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                # Identical sentences in one batch are encoded once
+                unique: Dict[str, int] = {}
+                for sentence, _ in batch:
+                    unique.setdefault(sentence, len(unique))
+                scores = self.backend.predict(list(unique))
+                if len(scores) != len(unique):
+                    raise ValueError(f"{self.backend.name} backend returned {len(scores)} scores "
+                                     f"for {len(unique)} sentences")
+                for sentence, future in batch:
+                    future.set_result(scores[unique[sentence]])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class ClaimClassifier:
+    """
+    Claim-worthiness classifier shared by every request in a process
+    
+    Scores are cached by sentence content hash, so boilerplate lines
+    repeated across videos are encoded once. Cache misses go through a
+    MicroBatcher, so sentences from concurrent analyses share batches.
+    """
+    
+    def __init__(self, backend: ClaimBackend, threshold: float = 0.5,
+                 cache_size: int = 100000, max_batch_size: int = 32,
+                 max_latency_ms: float = 10.0):
+        self.backend = backend
+        self.threshold = threshold
+        self.cache = ScoreCache(cache_size)
+        self.batcher = MicroBatcher(backend, max_batch_size, max_latency_ms)
+    
+    @classmethod
+    def from_env(cls) -> Optional['ClaimClassifier']:
+        """
+        Build a classifier from environment settings
+        
+        CLAIM_MODEL_NAME selects a transformers sequence-classification
+        model (empty disables the classifier) and CLAIM_THRESHOLD the
+        probability above which a sentence counts as a claim.
+        """
+        model_name = os.environ.get('CLAIM_MODEL_NAME', '')
+        if not model_name:
+            return None
+        threshold = float(os.environ.get('CLAIM_THRESHOLD', 0.5))
+        return cls(TransformersClaimBackend(model_name), threshold=threshold)
+    
+    def warm_up(self):
+        """Load the model ahead of the first sentence"""
+        self.backend.warm_up()
+    
+    def score(self, sentences: Sequence[str]) -> List[float]:
+        """Return claim-worthiness probabilities for sentences"""
+        scores: List[Optional[float]] = []
+        pending = []
+        for index, sentence in enumerate(sentences):
+            key = sentence_key(sentence)
+            cached = self.cache.get(key)
+            scores.append(cached)
+            if cached is None:
+                pending.append((index, key, self.batcher.submit(sentence)))
+        
+        deadline = time.monotonic() + BATCH_TIMEOUT_SECONDS
+        for index, key, future in pending:
+            score = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            self.cache.set(key, score)
+            scores[index] = score
+        
+        return scores
+    
+    def is_claim(self, sentence: str) -> bool:
+        """Check whether a single sentence is a claim"""
+        return self.score([sentence])[0] >= self.threshold
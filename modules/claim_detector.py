@@ -3,32 +3,58 @@ Claim Detector Module
 Identifies and extracts claims from transcript
 """
 
-from typing import List, Dict
+from bisect import bisect_left
+from itertools import combinations
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Tuple, Union
+import codecs
+import heapq
 import re
 
+from modules.keyword_matcher import (
+    DEFAULT_RULESET, KeywordMatch, KeywordMatcher, get_default_matcher
+)
+from modules.claim_classifier import ClaimClassifier
+
+
+SENTENCE_BOUNDARY = re.compile(r'[.!?]\s+')
+NUMBER_PATTERN = re.compile(r'\d+[%]?')
+
+# A "sentence" with no boundary in this many characters is emitted as-is
+# so streaming memory stays bounded on unpunctuated captions
+MAX_PENDING_CHARS = 1 << 20
+
+# Sentences sent to the claim classifier per call from detect_claims
+CLASSIFIER_BLOCK_SIZE = 32
+
+TextSource = Union[str, Iterable[str], Any]
+
 
 class ClaimDetector:
-    """Detect factual claims in text"""
-    
-    def __init__(self):
-        self.claim_keywords = [
-            'studies show', 'research proves', 'data shows', 'experts say',
-            'doctors recommend', 'scientists discovered', 'proven fact',
-            'statistics show', 'according to', 'it was found that'
-        ]
-        
-        self.suspicious_keywords = [
-            'they dont want you to know', 'secret', 'hidden truth',
-            'big pharma', 'government conspiracy', 'cover up',
-            'shocking', 'unbelievable', 'this one trick'
-        ]
-    
-    def detect_claims(self, text: str) -> List[Dict]:
+    """
+    Detect factual claims in text
+    
+    Without a classifier, a sentence is a claim if it has a claim keyword,
+    or a number and more than five words. With a ClaimClassifier, the
+    number heuristic is replaced by the model's claim-worthiness score.
+    """
+    
+    def __init__(self, matcher: Optional[KeywordMatcher] = None,
+                 classifier: Optional[ClaimClassifier] = None):
+        self.matcher = matcher or get_default_matcher()
+        self.classifier = classifier
+        
+        self.claim_keywords = self.matcher.ruleset.get('claim', DEFAULT_RULESET['claim'])
+        self.suspicious_keywords = self.matcher.ruleset.get('suspicious', DEFAULT_RULESET['suspicious'])
+        self._max_confidence: Optional[int] = None
+    
+    def detect_claims(self, text: str, matches: Optional[List[KeywordMatch]] = None) -> List[Dict]:
         """
         Detect factual claims in text
         
         Args:
             text: Input text/transcript
+            matches: Keyword matches for text from ``self.matcher.scan``;
+                scanned here if not given
             
         Returns:
             List of detected claims with metadata
@@ -37,77 +63,317 @@ class ClaimDetector:
         if not text or len(text) < 10:
             return []
         
+        if matches is None:
+            matches = self.matcher.scan(text)
+        starts = [match.start for match in matches]
+        
         claims = []
+        block_size = CLASSIFIER_BLOCK_SIZE if self.classifier is not None else 1
+        spans = self._sentence_spans(text)
+        
+        while len(claims) < 10:  # Limit to top 10 claims
+            block = [span for _, span in zip(range(block_size), spans)]
+            if not block:
+                break
+            
+            sentences = [text[start:end] for start, end in block]
+            scores = self._classifier_scores(sentences)
+            for (start, end), sentence, score in zip(block, sentences, scores):
+                sentence_matches = self._matches_in_span(matches, starts, start, end)
+                if self._contains_claim(sentence, sentence_matches, score):
+                    claims.append(self._build_claim(sentence, sentence_matches))
+                    if len(claims) == 10:
+                        break
+        
+        return claims
+    
+    def detect_claims_streaming(self, source: TextSource, top_k: int = 10,
+                                max_sentences: Optional[int] = None,
+                                max_chars: Optional[int] = None) -> List[Dict]:
+        """
+        Detect the top-k claims by confidence in constant memory
+        
+        Sentences are read lazily from source and only the best ``top_k``
+        claims are kept in a bounded heap. Reading stops early once the
+        sentence or character budget is spent, or once the heap is full of
+        claims that no later sentence could outrank.
+        
+        Args:
+            source: Transcript string, iterable of text chunks, or file-like object
+            top_k: Number of claims to keep
+            max_sentences: Stop after this many sentences (None for no limit)
+            max_chars: Stop after this many characters of sentence text (None for no limit)
+            
+        Returns:
+            Claims ordered by confidence, earliest first among equals
+        """
+        if top_k <= 0:
+            return []
+        
+        heap = []  # (confidence, -position, claim); the root is the weakest claim kept
+        max_confidence = self.max_claim_confidence()
+        sentences_read = 0
+        chars_read = 0
+        
+        for position, (sentence, claim) in enumerate(self._iter_sentence_claims(source)):
+            sentences_read += 1
+            chars_read += len(sentence)
+            
+            if claim is not None:
+                entry = (claim['confidence'], -position, claim)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif claim['confidence'] > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+                
+                # Ties go to earlier sentences, so nothing later can displace these
+                if len(heap) == top_k and heap[0][0] >= max_confidence:
+                    break
+            
+            if max_sentences is not None and sentences_read >= max_sentences:
+                break
+            if max_chars is not None and chars_read >= max_chars:
+                break
+        
+        return [claim for _, _, claim in sorted(heap, key=lambda entry: (-entry[0], -entry[1]))]
+    
+    def iter_claims(self, source: TextSource) -> Iterator[Dict]:
+        """
+        Lazily yield claims in transcript order
+        
+        Args:
+            source: Transcript string, iterable of text chunks, or file-like object
+        """
+        for _, claim in self._iter_sentence_claims(source):
+            if claim is not None:
+                yield claim
+    
+    def iter_sentences(self, source: TextSource, chunk_size: int = 65536) -> Iterator[str]:
+        """
+        Lazily split a transcript into sentences
+        
+        Produces the same sentences as ``_split_sentences`` on the joined text
+        while holding at most one pending sentence in memory.
+        
+        Args:
+            source: Transcript string, iterable of text chunks, or file-like object
+            chunk_size: Read size for file-like sources
+        """
+        pieces: List[str] = []  # text since the last boundary, joined only once a sentence ends
+        pending_chars = 0
+        for chunk in self._iter_chunks(source, chunk_size):
+            # Each chunk is scanned once, starting one character back so a
+            # boundary split across chunks (". " / "...!\n") is still found
+            overlap = pieces[-1][-1:] if pieces else ''
+            text = overlap + chunk
+            boundaries = list(SENTENCE_BOUNDARY.finditer(text))
+            if not boundaries:
+                pieces.append(chunk)
+                pending_chars += len(chunk)
+            else:
+                offset = pending_chars - len(overlap)
+                pending = ''.join(pieces) + chunk
+                position = 0
+                for boundary in boundaries:
+                    span = self._strip_span(pending, position, offset + boundary.start())
+                    if span:
+                        yield pending[span[0]:span[1]]
+                    position = offset + boundary.end()
+                pending = pending[position:]
+                pieces = [pending] if pending else []
+                pending_chars = len(pending)
+            
+            if pending_chars > MAX_PENDING_CHARS:
+                pending = ''.join(pieces)
+                span = self._strip_span(pending, 0, len(pending))
+                if span:
+                    yield pending[span[0]:span[1]]
+                pieces = []
+                pending_chars = 0
+        
+        pending = ''.join(pieces)
+        span = self._strip_span(pending, 0, len(pending))
+        if span:
+            yield pending[span[0]:span[1]]
+    
+    @staticmethod
+    def _iter_chunks(source: TextSource, chunk_size: int) -> Iterator[str]:
+        """Yield text chunks from a string, file-like object or iterable"""
+        if isinstance(source, str):
+            yield source
+            return
+        
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        if hasattr(source, 'read'):
+            chunks = iter(lambda: source.read(chunk_size), source.read(0))
+        else:
+            chunks = iter(source)
         
-        # Split into sentences
-        sentences = self._split_sentences(text)
+        for chunk in chunks:
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk)
+            if chunk:
+                yield chunk
         
-        for sentence in sentences:
-            if self._contains_claim(sentence):
-                claim_obj = {
-                    'text': sentence.strip(),
-                    'confidence': self._calculate_claim_confidence(sentence),
-                    'status': 'unknown',  # Will be filled by fact-checker
-                    'is_suspicious': self._is_suspicious_claim(sentence),
-                    'keywords_found': self._extract_keywords(sentence)
-                }
-                claims.append(claim_obj)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    def _iter_sentence_claims(self, source: TextSource) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Lazily yield (sentence, claim dict or None) in transcript order
         
-        return claims[:10]  # Limit to top 10 claims
+        With a classifier, sentences are read and scored in blocks of
+        CLASSIFIER_BLOCK_SIZE so each block is one batched model call rather
+        than one call per sentence.
+        """
+        block_size = CLASSIFIER_BLOCK_SIZE if self.classifier is not None else 1
+        sentences = self.iter_sentences(source)
+        while True:
+            block = [sentence for _, sentence in zip(range(block_size), sentences)]
+            if not block:
+                return
+            for sentence, score in zip(block, self._classifier_scores(block)):
+                yield sentence, self._claim_for_sentence(sentence, score)
+    
+    def _claim_for_sentence(self, sentence: str, score: Optional[float] = None) -> Optional[Dict]:
+        """Return the claim dict for a stripped sentence, or None if it is not a claim"""
+        sentence_matches = self.matcher.scan(sentence)
+        if not self._contains_claim(sentence, sentence_matches, score):
+            return None
+        return self._build_claim(sentence, sentence_matches)
+    
+    def _classifier_scores(self, sentences: List[str]) -> List[Optional[float]]:
+        """
+        Claim-worthiness scores for sentences
+        
+        All None without a classifier, or if the model fails, in which case
+        the sentences fall back to the keyword/number heuristic.
+        """
+        if self.classifier is None:
+            return [None] * len(sentences)
+        try:
+            return self.classifier.score(sentences)
+        except Exception as e:
+            print(f"Error scoring claims with the classifier, using the keyword heuristic: {e}")
+            return [None] * len(sentences)
+    
+    def _build_claim(self, sentence: str, sentence_matches: List[KeywordMatch]) -> Dict:
+        """Build the claim dict for a sentence known to contain a claim"""
+        return {
+            'text': sentence.strip(),
+            'confidence': self._calculate_claim_confidence(sentence, sentence_matches),
+            'status': 'unknown',  # Will be filled by fact-checker
+            'is_suspicious': self._is_suspicious_claim(sentence_matches),
+            'keywords_found': self._extract_keywords(sentence_matches)
+        }
+    
+    def max_claim_confidence(self) -> int:
+        """
+        Highest confidence ``_build_claim`` can give any sentence
+        
+        Confidence depends only on which keyword categories a sentence
+        matches and whether it has a number, so every combination is scored
+        once and the maximum is kept. ``detect_claims_streaming`` stops
+        early once every kept claim reaches it.
+        """
+        if self._max_confidence is None:
+            categories = list(self.matcher.ruleset)
+            best = 0
+            for sentence in ('', '1'):
+                for count in range(len(categories) + 1):
+                    for subset in combinations(categories, count):
+                        matches = [KeywordMatch(0, 0, category, '', 0) for category in subset]
+                        best = max(best, self._build_claim(sentence, matches)['confidence'])
+            self._max_confidence = best
+        return self._max_confidence
     
     def _split_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
+        return [text[start:end] for start, end in self._sentence_spans(text)]
+    
+    def _sentence_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of stripped sentences longer than 10 characters"""
         # Simple sentence splitting - can be improved with NLTK
-        sentences = re.split(r'[.!?]\s+', text)
-        return [s.strip() for s in sentences if len(s.strip()) > 10]
+        position = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(text):
+            span = self._strip_span(text, position, boundary.start())
+            if span:
+                yield span
+            position = boundary.end()
+        span = self._strip_span(text, position, len(text))
+        if span:
+            yield span
+    
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Narrow a span to exclude surrounding whitespace; None if too short"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return (start, end) if end - start > 10 else None
+    
+    @staticmethod
+    def _matches_in_span(matches: List[KeywordMatch], starts: List[int],
+                         start: int, end: int) -> List[KeywordMatch]:
+        """Return the matches lying entirely within [start, end)"""
+        found = []
+        for index in range(bisect_left(starts, start), len(matches)):
+            match = matches[index]
+            if match.start >= end:
+                break
+            if match.end <= end:
+                found.append(match)
+        return found
     
-    def _contains_claim(self, sentence: str) -> bool:
+    def _contains_claim(self, sentence: str, sentence_matches: List[KeywordMatch],
+                        score: Optional[float] = None) -> bool:
         """Check if sentence contains a factual claim"""
-        sentence_lower = sentence.lower()
-        
         # Check for claim keywords
-        has_claim_keyword = any(keyword in sentence_lower for keyword in self.claim_keywords)
+        has_claim_keyword = any(match.category == 'claim' for match in sentence_matches)
+        
+        # Model score replaces the number/length heuristic when available
+        if score is not None:
+            return has_claim_keyword or score >= self.classifier.threshold
         
         # Check for common claim patterns
-        has_number = bool(re.search(r'\d+[%]?', sentence))
+        has_number = bool(NUMBER_PATTERN.search(sentence))
         
         # Check length (claims are usually longer)
         is_long_enough = len(sentence.split()) > 5
         
         return has_claim_keyword or (has_number and is_long_enough)
     
-    def _calculate_claim_confidence(self, sentence: str) -> int:
+    def _calculate_claim_confidence(self, sentence: str, sentence_matches: List[KeywordMatch]) -> int:
         """Calculate confidence that this is a factual claim (0-100)"""
         confidence = 50
         
-        sentence_lower = sentence.lower()
+        categories = {match.category for match in sentence_matches}
         
         # Increase confidence for explicit claim indicators
-        if any(keyword in sentence_lower for keyword in self.claim_keywords):
+        if 'claim' in categories:
             confidence += 20
         
         # Increase confidence for numerical data
-        if re.search(r'\d+[%]?', sentence):
+        if NUMBER_PATTERN.search(sentence):
             confidence += 15
         
         # Check for attribution (decreases confidence if missing)
-        if not any(word in sentence_lower for word in ['according', 'study', 'research', 'reported']):
+        if 'attribution' not in categories:
             confidence -= 10
         
         return min(100, max(0, confidence))
     
-    def _is_suspicious_claim(self, sentence: str) -> bool:
+    def _is_suspicious_claim(self, sentence_matches: List[KeywordMatch]) -> bool:
         """Check if claim contains suspicious language"""
-        sentence_lower = sentence.lower()
-        return any(keyword in sentence_lower for keyword in self.suspicious_keywords)
+        return any(match.category == 'suspicious' for match in sentence_matches)
     
-    def _extract_keywords(self, sentence: str) -> List[str]:
+    def _extract_keywords(self, sentence_matches: List[KeywordMatch]) -> List[str]:
         """Extract relevant keywords from sentence"""
-        sentence_lower = sentence.lower()
-        found_keywords = []
-        
-        for keyword in self.claim_keywords + self.suspicious_keywords:
-            if keyword in sentence_lower:
-                found_keywords.append(keyword)
+        found = {}
+        for match in sentence_matches:
+            if match.category in ('claim', 'suspicious'):
+                found[match.keyword_id] = match.keyword
         
-        return found_keywords
+        return [found[keyword_id] for keyword_id in sorted(found)]
@@ -0,0 +1,319 @@
+"""
+Deepfake Detector Module
+Batched CPU inference of a frame-level deepfake classifier
+"""
+
+import os
+import queue
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+# Seconds a caller waits for its crops to be scored (the first batch may load the model)
+SCORE_TIMEOUT_SECONDS = 300.0
+
+
+_threads_lock = threading.Lock()
+_threads_configured = False
+
+
+def configure_torch_threads(num_threads: Optional[int] = None,
+                            num_interop_threads: Optional[int] = None):
+    """
+    Set torch intra-op and inter-op thread counts, once per process
+    
+    Defaults come from TORCH_NUM_THREADS and TORCH_NUM_INTEROP_THREADS.
+    Inter-op threads can only be set before torch runs its first operation,
+    so later calls are no-ops.
+    """
+    global _threads_configured
+    with _threads_lock:
+        if _threads_configured:
+            return
+        _threads_configured = True
+    
+    import torch
+    
+    num_threads = num_threads or int(os.environ.get('TORCH_NUM_THREADS', 0) or 0)
+    num_interop_threads = num_interop_threads or int(os.environ.get('TORCH_NUM_INTEROP_THREADS', 0) or 0)
+    
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if num_interop_threads:
+        try:
+            torch.set_num_interop_threads(num_interop_threads)
+        except RuntimeError as e:
+            print(f"Could not set torch inter-op threads: {e}")
+
+
+@lru_cache(maxsize=4)
+def load_deepfake_model(model_path: str, quantize: bool = False):
+    """
+    Load the deepfake classifier once per process
+    
+    TorchScript archives are loaded with ``torch.jit.load``; anything else
+    must be a pickled ``nn.Module``. With ``quantize`` the Linear layers of
+    a pickled module are converted to int8 with dynamic quantization for
+    faster CPU inference. A TorchScript archive cannot be quantized after
+    scripting, so it is used as saved; quantize the eager model before
+    scripting it instead.
+    """
+    import torch
+    
+    try:
+        model = torch.jit.load(model_path, map_location='cpu')
+    except RuntimeError:
+        model = torch.load(model_path, map_location='cpu')
+    model.eval()
+    
+    if quantize:
+        if isinstance(model, torch.jit.ScriptModule):
+            print(f"Not quantizing {model_path}: TorchScript models must be quantized before scripting")
+        else:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def center_face_crop(image, ratio: float = 0.6):
+    """
+    Crop the central region of a frame, where the speaker's face usually is
+    
+    Used when no face detector has supplied crops.
+    """
+    width, height = image.size
+    side = int(min(width, height) * ratio)
+    left = (width - side) // 2
+    top = max(0, (height - side) // 3)
+    return image.crop((left, top, left + side, top + side))
+
+
+def sample_video_frames(path: str, fps: float = 1.0, max_frames: int = 16, size: int = 256) -> List:
+    """
+    Decode up to max_frames evenly timed frames from a video via ffmpeg
+    
+    Returns:
+        List of PIL images scaled to size x size
+    """
+    from PIL import Image
+    
+    frame_bytes = size * size * 3
+    command = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error', '-i', path,
+        '-vf', f'fps={fps},scale={size}:{size}', '-frames:v', str(max_frames),
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            data = process.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                break
+            frames.append(Image.frombytes('RGB', (size, size), data))
+    finally:
+        process.stdout.close()
+        process.wait()
+    return frames
+
+
+def aggregate_frame_scores(probabilities: Sequence[float]) -> int:
+    """
+    Combine per-frame fake probabilities into a 0-100 video score
+    
+    Manipulation is often confined to a few frames, so the score is the
+    mean of the top quarter of frame probabilities rather than the mean of all.
+    """
+    if not probabilities:
+        return 0
+    ranked = sorted(probabilities, reverse=True)
+    top = ranked[:max(1, len(ranked) // 4)]
+    return int(round(100 * sum(top) / len(top)))
+
+
+class CropBatcher:
+    """
+    Pack face crops from concurrent callers into shared forward passes
+    
+    Same scheme as the claim classifier's MicroBatcher: a background thread
+    takes the first queued request (one video's crops), keeps collecting
+    until ``batch_size`` crops or ``max_latency_ms`` is reached, and scores
+    them all with one ``score_batch`` call. Only this thread runs the model.
+    A failure fails every unresolved future of the batch, not the thread.
+    """
+    
+    def __init__(self, score_batch: Callable[[Sequence], List[float]], batch_size: int = 32,
+                 max_latency_ms: float = 10.0):
+        self.score_batch = score_batch
+        self.batch_size = batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue: 'queue.Queue[Tuple[Sequence, Future]]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='deepfake-crop-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, crops: Sequence) -> Future:
+        """Queue crops; the future resolves to their fake probabilities"""
+        future = Future()
+        self._queue.put((crops, future))
+        return future
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_latency
+            while count < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                count += len(batch[-1][0])
+            
+            try:
+                crops = [crop for request_crops, _ in batch for crop in request_crops]
+                probabilities = self.score_batch(crops)
+                if len(probabilities) != len(crops):
+                    raise ValueError(f"Model returned {len(probabilities)} scores for {len(crops)} crops")
+                start = 0
+                for request_crops, future in batch:
+                    future.set_result(probabilities[start:start + len(request_crops)])
+                    start += len(request_crops)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class DeepfakeScorer:
+    """
+    Score face crops with a deepfake classifier in batched forward passes
+    
+    The model is loaded once per process. Crops from several videos are
+    packed into the same batches, so a batch run pays for full batches
+    instead of one small forward pass per video: ``score_videos`` packs the
+    videos it is given, and a CropBatcher merges the crops of videos scored
+    concurrently (e.g. by job workers) into shared forward passes.
+    
+    The model must take N x 3 x input_size x input_size ImageNet-normalized
+    tensors and return either one logit per crop or two (real, fake) logits.
+    """
+    
+    def __init__(self, model_path: str, batch_size: int = 32, input_size: int = 224,
+                 quantize: bool = False, num_threads: Optional[int] = None):
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.input_size = input_size
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.batcher = CropBatcher(self.score_crops, batch_size)
+    
+    @classmethod
+    def from_env(cls) -> Optional['DeepfakeScorer']:
+        """
+        Build a scorer from environment settings
+        
+        DEEPFAKE_MODEL_PATH enables the model (empty disables it) and
+        DEEPFAKE_QUANTIZE=1 selects the int8 dynamic-quantized path.
+        """
+        model_path = os.environ.get('DEEPFAKE_MODEL_PATH', '')
+        if not model_path:
+            return None
+        quantize = os.environ.get('DEEPFAKE_QUANTIZE', '').lower() in ('1', 'true', 'yes')
+        return cls(model_path, quantize=quantize)
+    
+    def warm_up(self):
+        """Load (and quantize) the model ahead of the first video"""
+        self._model()
+    
+    def _model(self):
+        configure_torch_threads(self.num_threads)
+        return load_deepfake_model(self.model_path, self.quantize)
+    
+    def _to_tensor(self, crops: Iterable):
+        import numpy as np
+        import torch
+        
+        arrays = [
+            np.asarray(crop.convert('RGB').resize((self.input_size, self.input_size)), dtype=np.float32)
+            for crop in crops
+        ]
+        batch = torch.from_numpy(np.stack(arrays)).permute(0, 3, 1, 2) / 255.0
+        mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+        std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+        return (batch - mean) / std
+    
+    def score_crops(self, crops: Sequence) -> List[float]:
+        """
+        Return the fake probability for each crop
+        
+        Args:
+            crops: PIL images of faces
+        """
+        import torch
+        
+        if not crops:
+            return []
+        
+        model = self._model()
+        probabilities: List[float] = []
+        with torch.inference_mode():
+            for start in range(0, len(crops), self.batch_size):
+                logits = model(self._to_tensor(crops[start:start + self.batch_size]))
+                if logits.dim() == 2 and logits.shape[1] == 2:
+                    batch_probabilities = torch.softmax(logits, dim=1)[:, 1]
+                else:
+                    batch_probabilities = torch.sigmoid(logits.reshape(-1))
+                probabilities.extend(batch_probabilities.tolist())
+        return probabilities
+    
+    def score_videos(self, crops_by_video: Dict[str, Sequence]) -> Dict[str, Dict]:
+        """
+        Score several videos with shared batches
+        
+        Args:
+            crops_by_video: Video key -> face crops (PIL images)
+            
+        Returns:
+            Video key -> dict with 'deepfake_model_score' (0-100),
+            'frame_scores' and 'frames_scored'
+        """
+        keys = []
+        crops = []
+        for key, video_crops in crops_by_video.items():
+            keys.extend([key] * len(video_crops))
+            crops.extend(video_crops)
+        
+        frame_scores: Dict[str, List[float]] = {key: [] for key in crops_by_video}
+        probabilities = self.batcher.submit(crops).result(timeout=SCORE_TIMEOUT_SECONDS) if crops else []
+        for key, probability in zip(keys, probabilities):
+            frame_scores[key].append(probability)
+        
+        return {
+            key: {
+                'deepfake_model_score': aggregate_frame_scores(scores),
+                'frame_scores': [round(score, 4) for score in scores],
+                'frames_scored': len(scores)
+            }
+            for key, scores in frame_scores.items()
+        }
+    
+    def score_video_file(self, path: str, max_frames: int = 16) -> Optional[Dict]:
+        """
+        Sample frames from a local video and score their central face region
+        
+        Returns:
+            Scoring dict as in ``score_videos``, or None if no frames decoded
+        """
+        frames = sample_video_frames(path, max_frames=max_frames)
+        if not frames:
+            return None
+        return self.score_videos({path: [center_face_crop(frame) for frame in frames]})[path]
@@ -0,0 +1,250 @@
+"""
+Duplicate Index Module
+MinHash fingerprints of analyzed transcripts for spotting reposted scripts
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from modules.similarity import MinHasher, band_keys, shingles, tokenize
+
+
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'duplicates.db')
+
+
+class DuplicateIndex:
+    """
+    On-disk near-duplicate index of analyzed transcripts
+    
+    Each transcript is reduced to a MinHash signature over word 3-grams of
+    its normalized text. Signatures are split into LSH bands stored in an
+    indexed SQLite table, so a lookup only compares against transcripts
+    sharing a band instead of scanning every earlier analysis. Candidates
+    whose estimated Jaccard similarity reaches ``threshold`` are matches,
+    and their stored claims can be reused. Each video keeps only its
+    latest fingerprint.
+    """
+    
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, threshold: float = 0.8,
+                 num_perm: int = 128, bands: int = 32, shingle_size: int = 3,
+                 min_words: int = 20, max_entries: int = 100000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.max_entries = max_entries
+        
+        self.hits = 0
+        self.misses = 0
+        
+        self._hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+    
+    @classmethod
+    def from_env(cls) -> Optional['DuplicateIndex']:
+        """
+        Build an index from environment settings
+        
+        DUPLICATE_INDEX_PATH sets the database file (an empty value disables
+        duplicate detection) and DUPLICATE_THRESHOLD the minimum similarity.
+        """
+        path = os.environ.get('DUPLICATE_INDEX_PATH', DEFAULT_INDEX_PATH)
+        if not path:
+            return None
+        
+        threshold = os.environ.get('DUPLICATE_THRESHOLD')
+        if threshold:
+            return cls(path, threshold=float(threshold))
+        return cls(path)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are opened lazily and never shared across a fork
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT,
+                    video_id TEXT,
+                    url TEXT,
+                    signature BLOB NOT NULL,
+                    claims TEXT NOT NULL,
+                    risk_analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprint_bands (
+                    band_key INTEGER NOT NULL,
+                    fingerprint_id INTEGER NOT NULL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_bands_key ON fingerprint_bands (band_key)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_bands_id ON fingerprint_bands (fingerprint_id)')
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+    
+    def warm_up(self):
+        """Open the database and prepare the hasher ahead of the first transcript"""
+        with self._lock:
+            self._connect()
+        self._hasher.signature(['warm-up'])
+    
+    def fingerprint(self, text: str) -> Optional[Tuple[int, ...]]:
+        """
+        MinHash signature of a transcript
+        
+        Returns:
+            Signature tuple, or None if the text is too short to fingerprint reliably
+        """
+        tokens = tokenize(text)
+        if len(tokens) < self.min_words:
+            return None
+        return self._hasher.signature(shingles(tokens, self.shingle_size))
+    
+    @staticmethod
+    def _pack(signature: Tuple[int, ...]) -> bytes:
+        return b''.join(value.to_bytes(4, 'little') for value in signature)
+    
+    @staticmethod
+    def _unpack(blob: bytes) -> List[int]:
+        return [int.from_bytes(blob[i:i + 4], 'little') for i in range(0, len(blob), 4)]
+    
+    def find(self, signature: Tuple[int, ...],
+             exclude: Optional[Tuple[Optional[str], Optional[str]]] = None) -> Optional[Dict]:
+        """
+        Find the most similar earlier transcript
+        
+        Args:
+            signature: Signature from ``fingerprint``
+            exclude: (platform, video_id) whose own fingerprints are skipped,
+                so re-analyzing a video does not match its earlier analysis
+        
+        Returns:
+            Dict with 'id', 'platform', 'video_id', 'url', 'similarity',
+            'claims' and 'risk_analysis', or None if nothing reaches the threshold
+        """
+        keys = band_keys(signature, self.bands)
+        with self._lock:
+            conn = self._connect()
+            placeholders = ', '.join('?' * len(keys))
+            sql = ('SELECT id, signature FROM fingerprints WHERE id IN ('
+                   f'SELECT DISTINCT fingerprint_id FROM fingerprint_bands WHERE band_key IN ({placeholders}))')
+            params = list(keys)
+            if exclude is not None:
+                sql += ' AND NOT (platform IS ? AND video_id IS ?)'
+                params.extend(exclude)
+            rows = conn.execute(sql, params).fetchall()
+            
+            best_id = None
+            best_similarity = 0.0
+            for fingerprint_id, blob in rows:
+                stored = self._unpack(blob)
+                similarity = sum(1 for a, b in zip(signature, stored) if a == b) / len(signature)
+                if similarity > best_similarity:
+                    best_id, best_similarity = fingerprint_id, similarity
+            
+            if best_id is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            
+            platform, video_id, url, claims, risk_analysis = conn.execute(
+                'SELECT platform, video_id, url, claims, risk_analysis FROM fingerprints WHERE id = ?',
+                (best_id,)
+            ).fetchone()
+            self.hits += 1
+        
+        return {
+            'id': best_id,
+            'platform': platform,
+            'video_id': video_id,
+            'url': url,
+            'similarity': round(best_similarity, 3),
+            'claims': json.loads(claims),
+            'risk_analysis': json.loads(risk_analysis),
+        }
+    
+    def add(self, signature: Tuple[int, ...], video_info: Dict, url: Optional[str],
+            claims: List[Dict], risk_analysis: Dict) -> int:
+        """
+        Store an analyzed transcript's fingerprint and analysis output
+        
+        Replaces any earlier fingerprint of the same (platform, video_id).
+        
+        Returns:
+            Row ID of the new fingerprint
+        """
+        platform, video_id = video_info.get('platform'), video_info.get('video_id')
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'DELETE FROM fingerprint_bands WHERE fingerprint_id IN ('
+                'SELECT id FROM fingerprints WHERE platform IS ? AND video_id IS ?)',
+                (platform, video_id)
+            )
+            conn.execute('DELETE FROM fingerprints WHERE platform IS ? AND video_id IS ?', (platform, video_id))
+            cursor = conn.execute(
+                'INSERT INTO fingerprints '
+                '(platform, video_id, url, signature, claims, risk_analysis, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (platform, video_id, url,
+                 self._pack(signature), json.dumps(claims), json.dumps(risk_analysis), time.time())
+            )
+            fingerprint_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO fingerprint_bands (band_key, fingerprint_id) VALUES (?, ?)',
+                [(key, fingerprint_id) for key in band_keys(signature, self.bands)]
+            )
+            self._evict(conn)
+            conn.commit()
+        return fingerprint_id
+    
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop the oldest fingerprints beyond max_entries"""
+        if not self.max_entries:
+            return
+        # Counted in rows, not ids: ``add`` deletes a video's older
+        # fingerprint, which leaves gaps in the ids
+        row = conn.execute(
+            'SELECT id FROM fingerprints ORDER BY id DESC LIMIT 1 OFFSET ?', (self.max_entries,)
+        ).fetchone()
+        if row is None:
+            return
+        cutoff = row[0]
+        conn.execute('DELETE FROM fingerprint_bands WHERE fingerprint_id <= ?', (cutoff,))
+        conn.execute('DELETE FROM fingerprints WHERE id <= ?', (cutoff,))
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this index instance"""
+        return {'hits': self.hits, 'misses': self.misses}
+    
+    def clear(self):
+        """Remove every fingerprint"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM fingerprint_bands')
+            conn.execute('DELETE FROM fingerprints')
+            conn.commit()
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
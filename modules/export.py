@@ -0,0 +1,150 @@
+"""
+Export Module
+Serializes analysis results as JSON, NDJSON or MessagePack
+
+Usage:
+    python -m modules.export results.ndjson -o archive.msgpack
+    python -m modules.export results.ndjson -o results.arrow
+"""
+
+import argparse
+import json
+import sys
+from typing import BinaryIO, Dict, Iterable, Iterator
+
+
+EXPORT_FORMATS = ('json', 'ndjson', 'msgpack')
+
+MIME_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'msgpack': 'application/msgpack',
+}
+
+
+def to_json_bytes(analysis_results: Dict, indent: int = 2) -> bytes:
+    """Pretty-printed JSON document for one result"""
+    return json.dumps(analysis_results, indent=indent, default=str).encode('utf-8')
+
+
+def to_ndjson_line(analysis_results: Dict) -> bytes:
+    """Compact single-line JSON record, newline-terminated"""
+    return json.dumps(
+        analysis_results, ensure_ascii=False, separators=(',', ':'), default=str
+    ).encode('utf-8') + b'\n'
+
+
+def iter_ndjson(results: Iterable[Dict]) -> Iterator[bytes]:
+    """Lazily encode results as NDJSON lines"""
+    for analysis_results in results:
+        yield to_ndjson_line(analysis_results)
+
+
+def iter_msgpack(results: Iterable[Dict]) -> Iterator[bytes]:
+    """Lazily encode results as a stream of concatenated MessagePack objects"""
+    import msgpack
+    
+    packer = msgpack.Packer(default=str, use_bin_type=True)
+    for analysis_results in results:
+        yield packer.pack(analysis_results)
+
+
+def serialize(analysis_results: Dict, format_type: str = 'json') -> bytes:
+    """
+    Serialize one result
+    
+    Args:
+        analysis_results: Complete analysis results
+        format_type: 'json' (indented), 'ndjson' (one compact line) or 'msgpack'
+    """
+    if format_type == 'json':
+        return to_json_bytes(analysis_results)
+    elif format_type == 'ndjson':
+        return to_ndjson_line(analysis_results)
+    elif format_type == 'msgpack':
+        return next(iter_msgpack([analysis_results]))
+    raise ValueError(f"Unknown export format: {format_type}")
+
+
+def write_export(results: Iterable[Dict], out: BinaryIO, format_type: str = 'ndjson') -> int:
+    """
+    Stream results to a binary file one record at a time
+    
+    Returns:
+        Number of records written
+    """
+    if format_type == 'ndjson':
+        chunks = iter_ndjson(results)
+    elif format_type == 'msgpack':
+        chunks = iter_msgpack(results)
+    else:
+        raise ValueError(f"Streaming export supports 'ndjson' and 'msgpack', not {format_type}")
+    
+    count = 0
+    for chunk in chunks:
+        out.write(chunk)
+        count += 1
+    return count
+
+
+def read_ndjson(handle: BinaryIO) -> Iterator[Dict]:
+    """Lazily decode NDJSON records, skipping blank and malformed lines"""
+    for line in handle:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def read_msgpack(handle: BinaryIO) -> Iterator[Dict]:
+    """Lazily decode a MessagePack stream written by ``write_export``"""
+    import msgpack
+    
+    yield from msgpack.Unpacker(handle, raw=False)
+
+
+def main(argv=None) -> int:
+    """Command-line entry point: convert between NDJSON and MessagePack, or to Arrow"""
+    parser = argparse.ArgumentParser(
+        description="Convert analysis results between NDJSON and MessagePack, or to an Arrow file"
+    )
+    parser.add_argument('input', help="NDJSON or .msgpack results file")
+    parser.add_argument('-o', '--output', required=True, help="Output file")
+    parser.add_argument('--format', choices=('ndjson', 'msgpack', 'arrow'), default=None,
+                        help="Output format (default: from the output file extension)")
+    parser.add_argument('--include-errors', action='store_true', help="Keep batch error records")
+    args = parser.parse_args(argv)
+    
+    format_type = args.format
+    if format_type is None:
+        if args.output.endswith(('.msgpack', '.mpk')):
+            format_type = 'msgpack'
+        elif args.output.endswith(('.arrow', '.feather')):
+            format_type = 'arrow'
+        else:
+            format_type = 'ndjson'
+    reader = read_msgpack if args.input.endswith(('.msgpack', '.mpk')) else read_ndjson
+    
+    if format_type == 'arrow':
+        # Columnar output is typed, so error records are always left out
+        from modules.records import iter_records, write_arrow
+        
+        with open(args.input, 'rb') as source:
+            count = write_arrow(iter_records(reader(source), include_transcript=True), args.output)
+        print(f"Wrote {count} records to {args.output}")
+        return 0
+    
+    with open(args.input, 'rb') as source, open(args.output, 'wb') as out:
+        records = reader(source)
+        if not args.include_errors:
+            records = (record for record in records if 'error' not in record)
+        count = write_export(records, out, format_type)
+    
+    print(f"Wrote {count} records to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
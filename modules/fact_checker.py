@@ -0,0 +1,213 @@
+"""
+Fact Checker Module
+Matches detected claims against a local corpus of fact-checked claims
+"""
+
+import csv
+import json
+import os
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from modules.similarity import LSHIndex, MinHasher, jaccard, tokenize
+
+
+# Fact-checker ratings -> claim status; anything else maps to 'unknown'
+VERDICT_STATUS = {
+    'true': 'verified',
+    'mostly true': 'verified',
+    'correct': 'verified',
+    'accurate': 'verified',
+    'verified': 'verified',
+    'false': 'false',
+    'mostly false': 'false',
+    'pants on fire': 'false',
+    'fake': 'false',
+    'incorrect': 'false',
+    'misleading': 'false',
+    'debunked': 'false',
+    'scam': 'false',
+}
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'at', 'for',
+    'by', 'with', 'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been',
+    'it', 'its', 'this', 'that', 'these', 'those', 'has', 'have', 'had',
+    'will', 'would', 'can', 'could', 'do', 'does', 'did', 'so', 'than',
+    'i', 'you', 'he', 'she', 'we', 'they', 'my', 'your', 'our', 'their',
+})
+NEGATIONS = frozenset({'not', 'no', 'never', 'cannot', 'nothing', 'none'})
+
+
+class FactCheckEntry(NamedTuple):
+    """A checked claim from the corpus"""
+    claim: str
+    status: str
+    source: Optional[str]
+    terms: frozenset
+    negated: bool
+
+
+def normalize_verdict(rating: str) -> str:
+    """Map a fact-checker rating to 'verified', 'false' or 'unknown'"""
+    return VERDICT_STATUS.get(' '.join(str(rating).lower().split()), 'unknown')
+
+
+def claim_terms(text: str):
+    """
+    Content terms of a claim and whether it is negated
+    
+    Negation words are kept out of the terms so "X is not Y" still finds
+    "X is Y"; the negation flag is compared separately.
+    """
+    tokens = tokenize(text)
+    negated = any(token in NEGATIONS or token.endswith("n't") for token in tokens)
+    terms = frozenset(
+        token for token in tokens
+        if token not in STOP_WORDS and token not in NEGATIONS and not token.endswith("n't")
+    )
+    return terms, negated
+
+
+def load_corpus(path: str) -> Iterator[Dict]:
+    """
+    Read fact-check records from a JSONL or CSV file
+    
+    Each record needs a 'claim' and a 'verdict' (or 'rating') field and
+    may carry a 'source' (or 'url').
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            claim = row.get('claim')
+            if not claim:
+                continue
+            yield {
+                'claim': claim,
+                'verdict': row.get('verdict') or row.get('rating') or '',
+                'source': row.get('source') or row.get('url'),
+            }
+
+
+class FactChecker:
+    """
+    Look up claims in an in-memory fact-check index
+    
+    Candidates come from MinHash LSH buckets plus an inverted index over
+    rare terms (terms in at most ``max_postings`` entries), so a lookup
+    never scans the corpus. Candidates are then ranked by exact Jaccard
+    similarity of their content terms.
+    """
+    
+    def __init__(self, records: Iterable[Dict] = (), match_threshold: float = 0.6,
+                 num_perm: int = 64, bands: int = 16, max_postings: int = 50):
+        self.match_threshold = match_threshold
+        self.max_postings = max_postings
+        self.entries: List[FactCheckEntry] = []
+        self._hasher = MinHasher(num_perm)
+        self._lsh = LSHIndex(num_perm, bands)
+        self._postings: Dict[str, List[int]] = {}
+        
+        for record in records:
+            self.add(record['claim'], record.get('verdict', ''), record.get('source'))
+    
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> 'FactChecker':
+        """Build an index from a JSONL or CSV corpus file"""
+        return cls(load_corpus(path), **kwargs)
+    
+    @classmethod
+    def from_env(cls) -> Optional['FactChecker']:
+        """
+        Build an index from environment settings
+        
+        FACT_CHECK_CORPUS_PATH points at the corpus file (empty disables
+        fact-checking) and FACT_CHECK_THRESHOLD sets the minimum match score.
+        """
+        path = os.environ.get('FACT_CHECK_CORPUS_PATH', '')
+        if not path:
+            return None
+        
+        try:
+            threshold = float(os.environ.get('FACT_CHECK_THRESHOLD', 0.6))
+            return cls.from_path(path, match_threshold=threshold)
+        except (OSError, ValueError) as e:
+            print(f"Error loading fact-check corpus {path}: {e}")
+            return None
+    
+    def add(self, claim: str, verdict: str, source: Optional[str] = None):
+        """Add a checked claim to the index"""
+        terms, negated = claim_terms(claim)
+        if not terms:
+            return
+        
+        entry_id = len(self.entries)
+        self.entries.append(FactCheckEntry(claim, normalize_verdict(verdict), source, terms, negated))
+        self._lsh.add(entry_id, self._hasher.signature(terms))
+        for term in terms:
+            self._postings.setdefault(term, []).append(entry_id)
+    
+    def lookup(self, text: str) -> Optional[Dict]:
+        """
+        Find the best matching checked claim
+        
+        Returns:
+            Dict with 'status', 'match_score', 'matched_claim' and 'source',
+            or None if nothing reaches the match threshold
+        """
+        terms, negated = claim_terms(text)
+        if not terms:
+            return None
+        
+        candidates = self._lsh.query(self._hasher.signature(terms))
+        
+        # Entries sharing two or more rare terms (one for very short claims)
+        shared = Counter()
+        for term in terms:
+            postings = self._postings.get(term, ())
+            if len(postings) <= self.max_postings:
+                shared.update(postings)
+        required = 1 if len(terms) < 3 else 2
+        candidates.update(entry_id for entry_id, count in shared.items() if count >= required)
+        
+        best_score = 0.0
+        best = None
+        for entry_id in candidates:
+            entry = self.entries[entry_id]
+            score = jaccard(terms, entry.terms)
+            if score > best_score:
+                best_score, best = score, entry
+        
+        if best is None or best_score < self.match_threshold:
+            return None
+        
+        # "X is not Y" matching a check of "X is Y" says nothing definite
+        status = best.status if best.negated == negated else 'unknown'
+        return {
+            'status': status,
+            'match_score': round(best_score, 2),
+            'matched_claim': best.claim,
+            'source': best.source,
+        }
+    
+    def check_claims(self, claims: List[Dict]) -> List[Dict]:
+        """
+        Set 'status' and 'match_score' on each claim in place
+        
+        Claims without a match keep status 'unknown' with a match score of 0.
+        A matched claim also gets a 'fact_check' dict naming the checked
+        claim and its source.
+        """
+        for claim in claims:
+            match = self.lookup(claim.get('text', ''))
+            if match is None:
+                claim['status'] = 'unknown'
+                claim['match_score'] = 0.0
+                continue
+            claim['status'] = match['status']
+            claim['match_score'] = match['match_score']
+            claim['fact_check'] = {'claim': match['matched_claim'], 'source': match['source']}
+        return claims
@@ -0,0 +1,303 @@
+"""
+Jobs Module
+SQLite-backed analysis job queue run by a fixed-size worker pool
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from modules.pipeline import AnalysisPipeline
+from modules.result_cache import ResultCache
+from modules.results_store import ResultsStore
+from modules.tracing import Trace, write_metrics_file_from_env
+
+
+DEFAULT_JOB_DB_PATH = os.path.join('.cache', 'jobs.db')
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+IN_FLIGHT = (QUEUED, RUNNING)
+
+INVALID_LINK_ERROR = 'invalid or unsupported video link'
+
+# How often a service refreshes the heartbeat of the jobs it owns; jobs whose
+# heartbeat is older than STALE_HEARTBEATS intervals are taken as abandoned
+HEARTBEAT_SECONDS = 15.0
+STALE_HEARTBEATS = 4
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a local process with this pid exists (always True where it cannot be checked)"""
+    if os.name != 'posix':
+        return True  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists, but owned by another user
+    return True
+
+
+class JobService:
+    """
+    Run analyses in a worker pool instead of the caller's thread
+    
+    ``submit`` records a job in SQLite and returns its ID at once; callers
+    poll ``status`` and fetch the finished analysis with ``result``. At
+    most ``max_workers`` pipelines run at a time no matter how many
+    callers submit. Submitting a link to a video that already has a queued
+    or running job returns that job instead of starting another.
+    
+    Finished analyses are also appended to ``results_store``, if given.
+    Each job records the pid of the process that owns it, which refreshes
+    the job's heartbeat every ``heartbeat_seconds``. Queued or running jobs
+    whose owner has exited or stopped heartbeating are marked failed, so
+    several processes can share the database without failing each other's
+    jobs. Finished jobs older than ``retention_seconds`` are pruned.
+    """
+    
+    def __init__(self, pipeline: Optional[AnalysisPipeline] = None,
+                 path: str = DEFAULT_JOB_DB_PATH, max_workers: int = 2,
+                 retention_seconds: float = 7 * 24 * 3600,
+                 results_store: Optional[ResultsStore] = None,
+                 heartbeat_seconds: float = HEARTBEAT_SECONDS):
+        self.pipeline = pipeline or AnalysisPipeline()
+        self.results_store = results_store
+        self.path = path
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        
+        self.recover_abandoned()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM jobs WHERE finished_at < ?', (time.time() - retention_seconds,))
+            conn.commit()
+        
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='analysis-job-heartbeat', daemon=True)
+        self._heartbeat.start()
+    
+    @classmethod
+    def from_env(cls, pipeline: Optional[AnalysisPipeline] = None) -> 'JobService':
+        """
+        Build a job service from environment settings
+        
+        JOB_DB_PATH sets the job database file and JOB_WORKERS the number
+        of analyses that may run at once. Results go to the store configured
+        by RESULTS_DB_PATH.
+        """
+        path = os.environ.get('JOB_DB_PATH') or DEFAULT_JOB_DB_PATH
+        workers = int(os.environ.get('JOB_WORKERS') or 2)
+        return cls(pipeline, path=path, max_workers=workers, results_store=ResultsStore.from_env())
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are opened lazily and never shared across a fork
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    video_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner_pid INTEGER,
+                    heartbeat_at REAL
+                )
+            """)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column in ('owner_pid INTEGER', 'heartbeat_at REAL'):
+                if column.split()[0] not in columns:
+                    # Databases created before jobs had owners
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column}')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_key_status ON jobs (video_key, status)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)')
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+    
+    def _update(self, job_id: str, **fields):
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+            conn.commit()
+    
+    def recover_abandoned(self) -> int:
+        """
+        Mark failed the queued or running jobs whose owner is gone
+        
+        An owner is gone when its process no longer exists or its heartbeat
+        is more than STALE_HEARTBEATS intervals old (e.g. a process on
+        another host, or a reused pid). Jobs without an owner were left by
+        a version that did not record one.
+        
+        Returns:
+            Number of jobs marked failed
+        """
+        stale_before = time.time() - self.heartbeat_seconds * STALE_HEARTBEATS
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                f"SELECT id, owner_pid, heartbeat_at FROM jobs WHERE status IN ({', '.join('?' * len(IN_FLIGHT))})",
+                IN_FLIGHT
+            ).fetchall()
+            abandoned = [
+                job_id for job_id, owner_pid, heartbeat_at in rows
+                if owner_pid is None or heartbeat_at is None or heartbeat_at < stale_before
+                or not _process_alive(owner_pid)
+            ]
+            if abandoned:
+                conn.executemany(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? "
+                    f"WHERE id = ? AND status IN ({', '.join('?' * len(IN_FLIGHT))})",
+                    [(FAILED, 'interrupted by a restart', time.time(), job_id, *IN_FLIGHT)
+                     for job_id in abandoned]
+                )
+                conn.commit()
+        return len(abandoned)
+    
+    def _heartbeat_loop(self):
+        """Refresh this process's in-flight jobs and recover those of exited processes"""
+        while not self._stopped.wait(self.heartbeat_seconds):
+            try:
+                with self._lock:
+                    conn = self._connect()
+                    conn.execute(
+                        'UPDATE jobs SET heartbeat_at = ? '
+                        f"WHERE owner_pid = ? AND status IN ({', '.join('?' * len(IN_FLIGHT))})",
+                        (time.time(), os.getpid(), *IN_FLIGHT)
+                    )
+                    conn.commit()
+                self.recover_abandoned()
+            except sqlite3.Error as e:
+                print(f"Error refreshing job heartbeats: {e}")
+    
+    def submit(self, url: str) -> str:
+        """
+        Queue an analysis of url
+        
+        Returns:
+            Job ID (of the existing job if the same video is already queued or running)
+        """
+        video_key = ResultCache.make_key(url)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT id FROM jobs WHERE video_key = ? AND status IN ({', '.join('?' * len(IN_FLIGHT))}) "
+                "ORDER BY created_at LIMIT 1",
+                (video_key, *IN_FLIGHT)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                'INSERT INTO jobs (id, url, video_key, status, created_at, owner_pid, heartbeat_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, url, video_key, QUEUED, now, os.getpid(), now)
+            )
+            conn.commit()
+        
+        self._executor.submit(self._run, job_id, url)
+        return job_id
+    
+    def status(self, job_id: str) -> Optional[Dict]:
+        """
+        Current state of a job
+        
+        Returns:
+            Dict with 'id', 'url', 'status' (queued, running, done or failed),
+            'stage', 'error', timestamps and, while queued, 'position' (jobs
+            queued ahead of it); None for an unknown job
+        """
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT id, url, status, stage, error, created_at, started_at, finished_at '
+                'FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = dict(zip(('id', 'url', 'status', 'stage', 'error',
+                            'created_at', 'started_at', 'finished_at'), row))
+            if job['status'] == QUEUED:
+                job['position'] = conn.execute(
+                    'SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?',
+                    (QUEUED, job['created_at'])
+                ).fetchone()[0]
+        return job
+    
+    def result(self, job_id: str) -> Optional[Dict]:
+        """Analysis results of a finished job, or None if it is not done"""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT result FROM jobs WHERE id = ? AND status = ?', (job_id, DONE)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+    
+    def _run(self, job_id: str, url: str):
+        self._update(job_id, status=RUNNING, stage='link', started_at=time.time())
+        trace = Trace()
+        try:
+            video_info = self.pipeline.process_link(url, trace)
+            if not video_info:
+                self._update(job_id, status=FAILED, error=INVALID_LINK_ERROR,
+                             finished_at=time.time())
+                return
+            
+            self._update(job_id, stage='transcript')
+            transcript = self.pipeline.extract_transcript(video_info, trace)
+            
+            self._update(job_id, stage='analysis')
+            analysis_results = self.pipeline.analyze(url, video_info, transcript, trace)
+            if self.results_store is not None:
+                self.results_store.append(analysis_results)
+            
+            self._update(job_id, status=DONE, stage=None, finished_at=time.time(),
+                         result=json.dumps(analysis_results, default=str))
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            write_metrics_file_from_env()
+    
+    def close(self):
+        """Wait for running jobs and stop the workers"""
+        self._executor.shutdown(wait=True)
+        self._stopped.set()
+        self._heartbeat.join()
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
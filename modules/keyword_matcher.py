@@ -0,0 +1,187 @@
+"""
+Keyword Matcher Module
+Single-pass multi-pattern keyword matching shared by the analysis modules
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# Default ruleset used by ClaimDetector and RiskAnalyzer.
+# Category order matters: keyword IDs are assigned in this order.
+DEFAULT_RULESET: Dict[str, List[str]] = {
+    'claim': [
+        'studies show', 'research proves', 'data shows', 'experts say',
+        'doctors recommend', 'scientists discovered', 'proven fact',
+        'statistics show', 'according to', 'it was found that'
+    ],
+    'suspicious': [
+        'they dont want you to know', 'secret', 'hidden truth',
+        'big pharma', 'government conspiracy', 'cover up',
+        'shocking', 'unbelievable', 'this one trick'
+    ],
+    'attribution': ['according', 'study', 'research', 'reported'],
+    'scam': [
+        'buy now', 'limited time', 'act fast', 'only today',
+        'click here', 'crypto', 'guaranteed returns', 'risk-free',
+        'work from home', 'make money fast', 'payment required'
+    ],
+    'deepfake': [
+        'deepfake', 'ai generated', 'fake', 'synthetic',
+        'altered', 'edited', 'morphed'
+    ],
+    'emotional': ['shocking', 'unbelievable', 'horrific', 'tragic', 'devastating'],
+    'social_pressure': ['everyone knows', 'most people', 'trend'],
+    'fear': ['danger', 'warning', 'alert', 'threat'],
+    'urgency': ['now', 'today', 'immediately', 'limited'],
+    'source': ['study', 'research'],
+    'vague': [
+        'some people say', 'they say', 'doctors hate',
+        'this one trick', 'secret method'
+    ],
+}
+
+
+class KeywordMatch(NamedTuple):
+    """A single keyword hit in the scanned text"""
+    start: int
+    end: int
+    category: str
+    keyword: str
+    keyword_id: int
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a categorized keyword ruleset
+
+    Matching is case-insensitive substring matching, the same semantics as
+    ``keyword in text.lower()``, but every keyword of every category is found
+    in a single pass over the text.
+    """
+
+    def __init__(self, ruleset: Dict[str, Sequence[str]]):
+        self.ruleset = {category: list(keywords) for category, keywords in ruleset.items()}
+
+        # keyword_id -> (category, keyword), in ruleset order
+        self.keywords: List[Tuple[str, str]] = []
+        for category, keywords in self.ruleset.items():
+            for keyword in keywords:
+                self.keywords.append((category, keyword.lower()))
+
+        self._ids: Dict[Tuple[str, str], int] = {}
+        for keyword_id, entry in enumerate(self.keywords):
+            self._ids.setdefault(entry, keyword_id)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._build()
+
+    def _build(self):
+        """Build the trie and failure links"""
+        for keyword_id, (_, keyword) in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(keyword_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, text: str) -> List[KeywordMatch]:
+        """
+        Find every keyword occurrence in text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches sorted by start offset, with offsets into ``text``
+        """
+        if not text:
+            return []
+
+        lowered = text.lower()
+        # str.lower() can change the length of some characters; map back
+        # to offsets in the original text when it does
+        offsets = None if len(lowered) == len(text) else self._lowered_offsets(text)
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        keywords = self.keywords
+
+        matches = []
+        state = 0
+        for index, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = index + 1
+                for keyword_id in output[state]:
+                    category, keyword = keywords[keyword_id]
+                    start = end - len(keyword)
+                    if offsets is None:
+                        matches.append(KeywordMatch(start, end, category, keyword, keyword_id))
+                    else:
+                        matches.append(KeywordMatch(
+                            offsets[start], offsets[end - 1] + 1, category, keyword, keyword_id
+                        ))
+
+        matches.sort(key=lambda match: (match.start, match.keyword_id))
+        return matches
+
+    @staticmethod
+    def _lowered_offsets(text: str) -> List[int]:
+        """Map each index of text.lower() to its index in text"""
+        offsets = []
+        for index, char in enumerate(text):
+            offsets.extend([index] * len(char.lower()))
+        return offsets
+
+    def keyword_id(self, category: str, keyword: str) -> Optional[int]:
+        """Look up the ID of a keyword within a category"""
+        return self._ids.get((category, keyword.lower()))
+
+
+def categories_found(matches: Iterable[KeywordMatch]) -> Dict[str, List[str]]:
+    """
+    Group matches by category
+
+    Returns:
+        Category -> distinct keywords found, in ruleset order
+    """
+    found: Dict[str, Dict[int, str]] = {}
+    for match in matches:
+        found.setdefault(match.category, {})[match.keyword_id] = match.keyword
+    return {
+        category: [keywords[keyword_id] for keyword_id in sorted(keywords)]
+        for category, keywords in found.items()
+    }
+
+
+@lru_cache(maxsize=1)
+def get_default_matcher() -> KeywordMatcher:
+    """Return the process-wide matcher for DEFAULT_RULESET"""
+    return KeywordMatcher(DEFAULT_RULESET)
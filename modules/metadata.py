@@ -0,0 +1,512 @@
+"""
+Metadata Module
+Title, duration and upload date lookups with batching, pooled HTTP and TTL caches
+"""
+
+import importlib.util
+import os
+import queue
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+from modules.video_processor import VideoKey, canonical_key, canonical_url, is_resolved
+
+
+YOUTUBE_API_BASE_URL = 'https://www.googleapis.com/youtube/v3'
+
+# Maximum IDs per YouTube videos.list call
+YOUTUBE_BATCH_SIZE = 50
+
+# Seconds a caller waits for a batched lookup
+LOOKUP_TIMEOUT_SECONDS = 60.0
+
+ISO8601_DURATION = re.compile(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+# Fields copied from backend metadata into video_info
+METADATA_FIELDS = ('title', 'duration', 'upload_date', 'channel')
+
+# Cached marker for videos a backend reported as not found
+_MISSING = object()
+
+
+def parse_iso8601_duration(value: str) -> int:
+    """Seconds in an ISO 8601 duration such as 'PT1H2M3S' (0 if unparseable)"""
+    match = ISO8601_DURATION.match(value or '')
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _new_session(pool_size: int = 16):
+    """requests.Session with a connection pool sized for concurrent lookups"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL"""
+    
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, value, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class MetadataBackend(ABC):
+    """Metadata source interface"""
+    
+    name = 'base'
+    platforms: Tuple[str, ...] = ()
+    batch_size = 1
+    
+    @abstractmethod
+    def fetch(self, platform: str, video_ids: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Look up up to ``batch_size`` videos of one platform
+        
+        Returns:
+            video_id -> metadata dict (title, duration, upload_date, ...)
+            for the videos that were found
+        """
+    
+    def warm_up(self):
+        """Prepare clients ahead of the first lookup (no-op by default)"""
+
+
+class StubMetadataBackend(MetadataBackend):
+    """
+    Offline backend for tests and dry runs
+    
+    Serves metadata from a (platform, video_id) -> dict mapping and
+    records the ID batches it was asked for.
+    """
+    
+    name = 'stub'
+    
+    def __init__(self, records: Dict[VideoKey, Dict],
+                 platforms: Tuple[str, ...] = ('youtube', 'tiktok', 'instagram'),
+                 batch_size: int = YOUTUBE_BATCH_SIZE):
+        self.records = records
+        self.platforms = platforms
+        self.batch_size = batch_size
+        self.batches: List[List[str]] = []
+    
+    def fetch(self, platform: str, video_ids: Sequence[str]) -> Dict[str, Dict]:
+        self.batches.append(list(video_ids))
+        return {video_id: self.records[(platform, video_id)]
+                for video_id in video_ids if (platform, video_id) in self.records}
+
+
+class YouTubeDataAPIBackend(MetadataBackend):
+    """YouTube Data API v3 videos.list, up to 50 IDs per request"""
+    
+    name = 'youtube_api'
+    platforms = ('youtube',)
+    batch_size = YOUTUBE_BATCH_SIZE
+    
+    def __init__(self, api_key: str, session=None, base_url: str = YOUTUBE_API_BASE_URL,
+                 timeout: float = 10.0):
+        self.api_key = api_key
+        self.session = session or _new_session()
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+    
+    def fetch(self, platform: str, video_ids: Sequence[str]) -> Dict[str, Dict]:
+        response = self.session.get(
+            f"{self.base_url}/videos",
+            params={
+                'part': 'snippet,contentDetails',
+                'id': ','.join(video_ids),
+                'maxResults': self.batch_size,
+                'key': self.api_key,
+            },
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            # Not raise_for_status: its message would include the API key
+            raise RuntimeError(f"videos.list returned HTTP {response.status_code}")
+        
+        found = {}
+        for item in response.json().get('items', []):
+            snippet = item.get('snippet', {})
+            found[item['id']] = {
+                'title': snippet.get('title'),
+                'duration': parse_iso8601_duration(item.get('contentDetails', {}).get('duration')),
+                'upload_date': (snippet.get('publishedAt') or '')[:10] or None,
+                'channel': snippet.get('channelTitle'),
+            }
+        return found
+
+
+class YtDlpBackend(MetadataBackend):
+    """
+    yt-dlp info extraction, one video per call
+    
+    Only the extractor runs (no format selection or download). Each
+    thread keeps its own YoutubeDL instance since they are not thread-safe.
+    """
+    
+    name = 'yt_dlp'
+    
+    def __init__(self, platforms: Tuple[str, ...] = ('youtube', 'tiktok', 'instagram')):
+        self.platforms = platforms
+        self._local = threading.local()
+    
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            from yt_dlp import YoutubeDL
+            
+            client = YoutubeDL({'quiet': True, 'no_warnings': True, 'skip_download': True,
+                                'noplaylist': True})
+            self._local.client = client
+        return client
+    
+    def warm_up(self):
+        self._client()
+    
+    def fetch(self, platform: str, video_ids: Sequence[str]) -> Dict[str, Dict]:
+        found = {}
+        for video_id in video_ids:
+            info = self._client().extract_info(
+                canonical_url((platform, video_id)), download=False, process=False
+            )
+            if not info:
+                continue
+            upload_date = info.get('upload_date')
+            found[video_id] = {
+                'title': info.get('title'),
+                'duration': int(info.get('duration') or 0),
+                'upload_date': (f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:8]}"
+                                if upload_date else None),
+                'channel': info.get('uploader') or info.get('channel'),
+            }
+        return found
+
+
+class MetadataBatcher:
+    """
+    Group lookups from concurrent callers into shared backend calls
+    
+    Same scheme as the claim classifier's MicroBatcher: a background thread
+    takes the first queued lookup, collects more until ``batch_size`` or
+    ``max_latency_ms`` is reached, and calls ``fetch`` once per platform.
+    A failure fails every unresolved future of that platform's lookups,
+    not the thread.
+    """
+    
+    def __init__(self, backend: MetadataBackend, max_latency_ms: float = 10.0):
+        self.backend = backend
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue: 'queue.Queue[Tuple[str, str, Future]]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f'metadata-{backend.name}', daemon=True)
+        self._thread.start()
+    
+    def submit(self, platform: str, video_id: str) -> Future:
+        """Queue a lookup; the future resolves to the metadata dict or None"""
+        future = Future()
+        self._queue.put((platform, video_id, future))
+        return future
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.backend.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            by_platform: Dict[str, List[Tuple[str, Future]]] = {}
+            for platform, video_id, future in batch:
+                by_platform.setdefault(platform, []).append((video_id, future))
+            
+            for platform, lookups in by_platform.items():
+                try:
+                    # Each ID is requested once even if several callers asked for it
+                    found = self.backend.fetch(platform, list(dict.fromkeys(video_id for video_id, _ in lookups)))
+                    for video_id, future in lookups:
+                        future.set_result(found.get(video_id))
+                except Exception as e:
+                    for _, future in lookups:
+                        if not future.done():
+                            future.set_exception(e)
+
+
+class ShortLinkResolver:
+    """
+    Resolve TikTok short links (vm.tiktok.com/{code}) to numeric video IDs
+    
+    Redirects are followed by hand, one hop at a time, and resolution stops
+    at the first Location that names a video, so the (heavy) video page
+    itself is never fetched.
+    """
+    
+    def __init__(self, session=None, timeout: float = 10.0, max_redirects: int = 5):
+        self.session = session or _new_session()
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+    
+    def resolve(self, url: str) -> Optional[VideoKey]:
+        """
+        Returns:
+            ('tiktok', numeric_id), or None if the link does not redirect to a video
+        """
+        current = url if '://' in url else f"https://{url}"
+        for _ in range(self.max_redirects):
+            response = self.session.get(current, allow_redirects=False, stream=True, timeout=self.timeout)
+            location = response.headers.get('Location')
+            response.close()
+            if not location or not response.is_redirect:
+                return None
+            
+            current = urljoin(current, location)
+            key = canonical_key(current)
+            if key is not None and key[0] == 'tiktok' and key[1].isdigit():
+                return key
+        return None
+
+
+class MetadataProvider:
+    """
+    Fill in title, duration and upload date of analyzed videos
+    
+    Backends are tried in order for each platform they support; IDs one
+    backend does not find go on to the next. Backends that accept several
+    IDs per call get them through a MetadataBatcher, so concurrent analyses
+    share API requests. Metadata, not-found results and short-link
+    redirect targets are cached in memory with TTLs. Lookup failures are
+    reported and not cached, so they are retried on the next analysis.
+    
+    ``session`` is the pooled HTTP session the backends and resolver were
+    built with, if any, so other fetchers can share its connections.
+    """
+    
+    def __init__(self, backends: Sequence[MetadataBackend],
+                 resolver: Optional[ShortLinkResolver] = None,
+                 ttl_seconds: float = 24 * 3600,
+                 negative_ttl_seconds: float = 3600,
+                 max_entries: int = 100000,
+                 max_latency_ms: float = 10.0,
+                 session=None):
+        self.backends = list(backends)
+        self.resolver = resolver
+        self.session = session
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.cache = TTLCache(max_entries)
+        self.redirects = TTLCache(max_entries)
+        
+        self._batchers = {backend.name: MetadataBatcher(backend, max_latency_ms)
+                          for backend in self.backends if backend.batch_size > 1}
+        self._status = threading.local()
+    
+    @classmethod
+    def from_env(cls) -> Optional['MetadataProvider']:
+        """
+        Build a provider from environment settings
+        
+        METADATA_BACKENDS is a comma-separated, ordered list of 'youtube_api'
+        and 'yt_dlp'. It is empty by default, which disables metadata
+        lookups and short-link resolution, so analyses make no metadata
+        requests unless configured to. The YouTube
+        backend needs YOUTUBE_API_KEY and is skipped without it;
+        YOUTUBE_API_BASE_URL points it at another server (e.g. a local stub).
+        METADATA_CACHE_TTL sets the cache TTL and METADATA_TIMEOUT the HTTP
+        timeout, both in seconds.
+        """
+        names = os.environ.get('METADATA_BACKENDS', '')
+        if not names:
+            return None
+        
+        timeout = float(os.environ.get('METADATA_TIMEOUT', 10))
+        session = _new_session()
+        backends = []
+        for name in (name.strip() for name in names.split(',')):
+            if name == 'youtube_api':
+                api_key = os.environ.get('YOUTUBE_API_KEY', '')
+                if api_key:
+                    base_url = os.environ.get('YOUTUBE_API_BASE_URL') or YOUTUBE_API_BASE_URL
+                    backends.append(YouTubeDataAPIBackend(api_key, session, base_url, timeout))
+            elif name == 'yt_dlp':
+                if importlib.util.find_spec('yt_dlp') is not None:
+                    backends.append(YtDlpBackend())
+            elif name:
+                raise ValueError(f"Unknown metadata backend: {name}")
+        
+        ttl = os.environ.get('METADATA_CACHE_TTL')
+        resolver = ShortLinkResolver(session, timeout)
+        if ttl:
+            return cls(backends, resolver, ttl_seconds=float(ttl), session=session)
+        return cls(backends, resolver, session=session)
+    
+    def warm_up(self):
+        """Prepare backend clients ahead of the first video"""
+        for backend in self.backends:
+            backend.warm_up()
+    
+    def last_cache_status(self) -> Optional[str]:
+        """'hit' if this thread's last enrich call was served from cache, 'miss' if not"""
+        return getattr(self._status, 'cache', None)
+    
+    def resolve_key(self, key: VideoKey) -> VideoKey:
+        """
+        Canonical key with a TikTok short-link code replaced by the numeric video ID
+        
+        Keys that are not short links, and short links that cannot be
+        resolved, are returned unchanged.
+        """
+        code = key[1]
+        if self.resolver is None or not code or is_resolved(key):
+            return key
+        
+        resolved = self.redirects.get(code, _MISSING)
+        if resolved is _MISSING:
+            try:
+                resolved = self.resolver.resolve(canonical_url(key))
+            except Exception as e:
+                print(f"Error resolving TikTok short link {code}: {e}")
+                return key
+            self.redirects.set(code, resolved, self.ttl_seconds if resolved else self.negative_ttl_seconds)
+        return resolved or key
+    
+    def resolve_short_link(self, video_info: Dict):
+        """Replace a TikTok short-link code in video_info with the numeric video ID"""
+        key = (video_info.get('platform'), video_info.get('video_id'))
+        resolved = self.resolve_key(key)
+        if resolved != key:
+            video_info['video_id'] = resolved[1]
+            video_info['canonical_url'] = canonical_url(resolved)
+    
+    def enrich(self, video_info: Dict) -> Dict:
+        """Fill in one video's metadata in place (returns video_info)"""
+        self.enrich_many([video_info])
+        return video_info
+    
+    def enrich_many(self, video_infos: Iterable[Dict]) -> List[Dict]:
+        """
+        Fill in metadata for many videos in place
+        
+        Cache misses are looked up together, so e.g. 120 YouTube videos
+        cost three videos.list calls.
+        
+        Returns:
+            The video_info dicts
+        """
+        video_infos = list(video_infos)
+        for video_info in video_infos:
+            self.resolve_short_link(video_info)
+        
+        metadata: Dict[VideoKey, Optional[Dict]] = {}
+        pending: List[VideoKey] = []
+        for video_info in video_infos:
+            key = (video_info.get('platform'), video_info.get('video_id'))
+            if not key[1] or key in metadata:
+                continue
+            cached = self.cache.get(key, _MISSING)
+            if cached is _MISSING:
+                metadata[key] = None
+                pending.append(key)
+            else:
+                metadata[key] = cached
+        self._status.cache = 'miss' if pending else 'hit'
+        
+        failed = set()
+        for backend in self.backends:
+            lookups = [key for key in pending if key[0] in backend.platforms]
+            if not lookups:
+                continue
+            found, errors = self._lookup(backend, lookups)
+            failed |= errors
+            for key, value in found.items():
+                metadata[key] = value
+                self.cache.set(key, value, self.ttl_seconds)
+            pending = [key for key in pending if key not in found]
+        
+        # "Not found" is only cached when no backend failed on the video
+        for key in pending:
+            if key not in failed:
+                self.cache.set(key, None, self.negative_ttl_seconds)
+        
+        for video_info in video_infos:
+            found = metadata.get((video_info.get('platform'), video_info.get('video_id')))
+            if found:
+                video_info.update({field: found[field] for field in METADATA_FIELDS
+                                   if found.get(field) is not None})
+        return video_infos
+    
+    def _lookup(self, backend: MetadataBackend, keys: List[VideoKey]):
+        """Look up keys with one backend; returns (found metadata, keys that failed)"""
+        found: Dict[VideoKey, Dict] = {}
+        failed = set()
+        batcher = self._batchers.get(backend.name)
+        
+        if batcher is not None:
+            futures = [(key, batcher.submit(*key)) for key in keys]
+            errors = set()
+            deadline = time.monotonic() + LOOKUP_TIMEOUT_SECONDS
+            for key, future in futures:
+                try:
+                    result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except Exception as e:
+                    errors.add(str(e) or type(e).__name__)
+                    failed.add(key)
+                    continue
+                if result is not None:
+                    found[key] = result
+            for error in errors:
+                print(f"Error fetching metadata from {backend.name}: {error}")
+            return found, failed
+        
+        for key in keys:
+            try:
+                result = backend.fetch(key[0], [key[1]]).get(key[1])
+            except Exception as e:
+                print(f"Error fetching {key[0]} metadata for {key[1]} from {backend.name}: {e}")
+                failed.add(key)
+                continue
+            if result is not None:
+                found[key] = result
+        return found, failed
@@ -0,0 +1,312 @@
+"""
+Overlay Text Module
+Reads on-screen text overlays from video frames with change-triggered OCR
+"""
+
+import io
+import os
+import re
+import subprocess
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+THUMBNAIL_SIZE = 64  # side of the grayscale thumbnail used for change detection
+
+
+class OCRBackend(ABC):
+    """Text recognition backend interface"""
+    
+    name = 'base'
+    
+    @abstractmethod
+    def read_text(self, image) -> str:
+        """Return the text visible in a PIL image"""
+    
+    def warm_up(self):
+        """Load the model ahead of the first frame (no-op by default)"""
+
+
+class StubOCRBackend(OCRBackend):
+    """
+    Offline backend for tests and dry runs
+    
+    Returns ``text_for_image(image)`` if given, otherwise an empty string.
+    """
+    
+    name = 'stub'
+    
+    def __init__(self, text_for_image: Optional[Callable] = None):
+        self.text_for_image = text_for_image
+        self.calls = 0
+    
+    def read_text(self, image) -> str:
+        self.calls += 1
+        return self.text_for_image(image) if self.text_for_image else ''
+
+
+@lru_cache(maxsize=2)
+def _load_easyocr_reader(languages: Tuple[str, ...], gpu: bool):
+    """Load an EasyOCR reader once per process"""
+    import easyocr
+    return easyocr.Reader(list(languages), gpu=gpu)
+
+
+class EasyOCRBackend(OCRBackend):
+    """EasyOCR running locally"""
+    
+    name = 'easyocr'
+    
+    def __init__(self, languages: Tuple[str, ...] = ('en',), gpu: bool = False):
+        self.languages = tuple(languages)
+        self.gpu = gpu
+    
+    def warm_up(self):
+        _load_easyocr_reader(self.languages, self.gpu)
+    
+    def read_text(self, image) -> str:
+        import numpy as np
+        
+        reader = _load_easyocr_reader(self.languages, self.gpu)
+        return ' '.join(reader.readtext(np.asarray(image.convert('RGB')), detail=0))
+
+
+def build_ocr_backend(name: str, **kwargs) -> OCRBackend:
+    """Create an OCR backend by name ('stub' or 'easyocr')"""
+    if name == 'stub':
+        return StubOCRBackend(**kwargs)
+    elif name == 'easyocr':
+        return EasyOCRBackend(**kwargs)
+    raise ValueError(f"Unknown OCR backend: {name}")
+
+
+def thumbnail(image):
+    """Downscale a PIL image to the grayscale array used for change detection"""
+    import numpy as np
+    
+    return np.asarray(image.convert('L').resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE)), dtype=np.uint8)
+
+
+def iter_video_thumbnails(path: str, fps: float = 2.0) -> Iterator[Tuple[float, 'object']]:
+    """
+    Stream (timestamp, thumbnail) pairs from a video via ffmpeg
+    
+    Frames are decoded straight to tiny grayscale thumbnails, so the cheap
+    change check never materialises full-resolution frames.
+    """
+    import numpy as np
+    
+    frame_bytes = THUMBNAIL_SIZE * THUMBNAIL_SIZE
+    command = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error', '-i', path,
+        '-vf', f'fps={fps},scale={THUMBNAIL_SIZE}:{THUMBNAIL_SIZE},format=gray',
+        '-f', 'rawvideo', '-'
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    finished = False
+    try:
+        index = 0
+        while True:
+            data = process.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                finished = True
+                break
+            yield index / fps, np.frombuffer(data, dtype=np.uint8).reshape(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+            index += 1
+    finally:
+        process.stdout.close()
+        if not finished:
+            # Closed early or failed downstream: stop ffmpeg and let the original exception through
+            process.kill()
+        returncode = process.wait()
+    
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {path}")
+
+
+def decode_frame(path: str, timestamp: float):
+    """Decode one full-resolution frame at timestamp as a PIL image"""
+    from PIL import Image
+    
+    command = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error', '-ss', f'{timestamp:.3f}', '-i', path,
+        '-frames:v', '1', '-f', 'image2pipe', '-vcodec', 'png', '-'
+    ]
+    data = subprocess.run(command, stdout=subprocess.PIPE, check=True).stdout
+    return Image.open(io.BytesIO(data))
+
+
+def normalize_overlay_text(text: str) -> str:
+    """Normalize OCR output for comparing consecutive frames"""
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def overlay_text_to_transcript(segments: List[Dict]) -> str:
+    """Join overlay segments into sentence-separated text for the analyzers"""
+    return OverlayTranscript(segments).text
+
+
+class OverlayTranscript:
+    """
+    Overlay segments joined into sentence-separated text
+    
+    Remembers where each segment's text starts, so sentences (and the
+    claims detected in them) can be traced back to the segment's time
+    range. Each segment ends a sentence, so no sentence spans two segments.
+    """
+    
+    def __init__(self, segments: List[Dict]):
+        pieces: List[str] = []
+        self._offsets: List[int] = []
+        self._segments: List[Dict] = []
+        position = 0
+        for segment in segments:
+            if not segment['text'].strip():
+                continue
+            piece = segment['text'].rstrip('.!? ') + '.'
+            self._offsets.append(position)
+            self._segments.append(segment)
+            pieces.append(piece)
+            position += len(piece) + 1
+        self.text = ' '.join(pieces)
+    
+    def after(self, spoken: str) -> str:
+        """The spoken transcript followed by the overlay text, with a sentence break between them"""
+        spoken = spoken.rstrip()
+        if not spoken:
+            return self.text
+        if not spoken.endswith(('.', '!', '?')):
+            spoken += '.'
+        return f"{spoken}\n{self.text}"
+    
+    def segment_at(self, offset: int) -> Optional[Dict]:
+        """Segment the character at offset of ``text`` came from"""
+        index = bisect_right(self._offsets, offset) - 1
+        return self._segments[index] if index >= 0 else None
+    
+    def time_claims(self, claims: List[Dict], spoken: str = '') -> List[Dict]:
+        """
+        Add the 'start' and 'end' (seconds) of the overlay segment each claim was read from
+        
+        Claims whose text also occurs in the spoken transcript are left
+        untimed, since they cannot be told apart from spoken claims.
+        
+        Returns:
+            claims, updated in place
+        """
+        for claim in claims:
+            if claim['text'] in spoken:
+                continue
+            offset = self.text.find(claim['text'])
+            if offset < 0:
+                continue
+            segment = self.segment_at(offset)
+            claim['start'] = segment['start']
+            claim['end'] = segment['end']
+        return claims
+
+
+class OverlayTextExtractor:
+    """
+    Extract on-screen text overlays with adaptive frame sampling
+    
+    Each sampled frame is first reduced to a small grayscale thumbnail. The
+    full frame is only decoded and sent to OCR when the thumbnail differs
+    from the last OCR'd one by more than ``change_threshold`` (mean absolute
+    pixel difference, 0-255). Identical text on consecutive OCR'd frames
+    is merged into one timed segment.
+    """
+    
+    def __init__(self, backend: OCRBackend, fps: float = 2.0, change_threshold: float = 8.0):
+        self.backend = backend
+        self.fps = fps
+        self.change_threshold = change_threshold
+        self.frames_sampled = 0
+        self.frames_ocrd = 0
+    
+    @classmethod
+    def from_env(cls) -> Optional['OverlayTextExtractor']:
+        """
+        Build an extractor from environment settings
+        
+        OCR_BACKEND selects the backend ('easyocr' or 'stub'; empty disables
+        overlay text extraction).
+        """
+        name = os.environ.get('OCR_BACKEND', '')
+        if not name:
+            return None
+        return cls(build_ocr_backend(name))
+    
+    def warm_up(self):
+        """Load the OCR backend ahead of the first video"""
+        self.backend.warm_up()
+    
+    def extract_from_video(self, path: str) -> List[Dict]:
+        """
+        Extract overlay text segments from a local video file
+        
+        Returns:
+            List of dicts with 'start', 'end' (seconds) and 'text'
+        """
+        frames = (
+            (timestamp, small, lambda timestamp=timestamp: decode_frame(path, timestamp))
+            for timestamp, small in iter_video_thumbnails(path, self.fps)
+        )
+        return self.extract(frames)
+    
+    def extract_from_images(self, images: Iterable[Tuple[float, 'object']]) -> List[Dict]:
+        """Extract overlay text segments from (timestamp, PIL image) pairs"""
+        frames = (
+            (timestamp, thumbnail(image), lambda image=image: image)
+            for timestamp, image in images
+        )
+        return self.extract(frames)
+    
+    def extract(self, frames: Iterable[Tuple[float, 'object', Callable]]) -> List[Dict]:
+        """
+        Run change-triggered OCR over sampled frames
+        
+        Args:
+            frames: (timestamp, thumbnail array, full-frame loader) triples
+            
+        Returns:
+            List of dicts with 'start', 'end' (seconds) and 'text'
+        """
+        import numpy as np
+        
+        segments: List[Dict] = []
+        current: Optional[Dict] = None
+        current_key = ''
+        reference = None
+        
+        for timestamp, small, load_frame in frames:
+            self.frames_sampled += 1
+            
+            changed = reference is None or float(
+                np.mean(np.abs(small.astype(np.int16) - reference.astype(np.int16)))
+            ) > self.change_threshold
+            
+            if not changed:
+                if current is not None:
+                    current['end'] = timestamp
+                continue
+            
+            reference = small
+            self.frames_ocrd += 1
+            text = self.backend.read_text(load_frame()).strip()
+            key = normalize_overlay_text(text)
+            
+            if key and key == current_key:
+                current['end'] = timestamp
+                continue
+            
+            if current is not None:
+                segments.append(current)
+            current = {'start': timestamp, 'end': timestamp, 'text': text} if key else None
+            current_key = key
+        
+        if current is not None:
+            segments.append(current)
+        return segments
@@ -0,0 +1,316 @@
+"""
+PDF Report Module
+Dependency-free PDF report rendering, streamed to disk in a background worker
+"""
+
+import hashlib
+import json
+import os
+import textwrap
+import threading
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_REPORT_DIR = os.path.join('.cache', 'reports')
+
+# Rendered reports kept on disk; the least recently rendered are removed first
+DEFAULT_MAX_REPORTS = 200
+
+PAGE_WIDTH = 612   # US Letter, in points
+PAGE_HEIGHT = 792
+MARGIN = 54
+
+# Approximate average Helvetica glyph width as a fraction of the font size
+AVERAGE_CHAR_WIDTH = 0.52
+
+# Fixed object numbers; page and content objects follow from 5
+CATALOG_ID = 1
+PAGES_ID = 2
+FONT_ID = 3
+BOLD_FONT_ID = 4
+
+# Result fields a report is rendered from, and so its cache key is hashed over
+REPORT_FIELDS = ('url', 'video_info', 'credibility_score', 'claims', 'risk_analysis', 'duplicate_of')
+
+# (text, font size, bold) lines that make up a report
+ReportLine = Tuple[str, float, bool]
+
+
+def _winansi(text: str) -> bytes:
+    """
+    Encode text in WinAnsi (cp1252), the only encoding the built-in fonts have
+    
+    Characters outside cp1252 are first decomposed (so e.g. accented Latin
+    letters keep their base letter), and what still has no glyph is written
+    as a \\uXXXX escape instead of '?', so non-Latin claims stay recoverable.
+    The JSON and HTML reports keep the original text.
+    """
+    try:
+        return text.encode('cp1252')
+    except UnicodeEncodeError:
+        pass
+    characters = []
+    for character in text:
+        try:
+            characters.append(character.encode('cp1252'))
+            continue
+        except UnicodeEncodeError:
+            pass
+        base = ''.join(c for c in unicodedata.normalize('NFKD', character) if not unicodedata.combining(c))
+        try:
+            characters.append(base.encode('cp1252') if base else b'')
+        except UnicodeEncodeError:
+            characters.append(character.encode('cp1252', errors='backslashreplace'))
+    return b''.join(characters)
+
+
+def _pdf_string(text: str) -> bytes:
+    """Encode text as a PDF literal string in WinAnsi (cp1252) encoding"""
+    data = _winansi(text)
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+class PDFWriter:
+    """
+    Minimal streaming PDF writer for plain text pages
+    
+    Objects are written to the output as soon as they are complete, so
+    only the current page is ever held in memory. Uses the built-in
+    Helvetica fonts, so no font embedding or third-party library is needed.
+    """
+    
+    def __init__(self, out: BinaryIO, margin: float = MARGIN):
+        self.out = out
+        self.margin = margin
+        self.pages_written = 0
+        
+        self._position = 0
+        self._offsets: Dict[int, int] = {}
+        self._page_ids: List[int] = []
+        self._next_id = BOLD_FONT_ID + 1
+        self._commands: List[bytes] = []
+        self._y = PAGE_HEIGHT - margin
+        
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._write_object(FONT_ID, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+                                    b'/Encoding /WinAnsiEncoding >>')
+        self._write_object(BOLD_FONT_ID, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold '
+                                         b'/Encoding /WinAnsiEncoding >>')
+    
+    def _write(self, data: bytes):
+        self.out.write(data)
+        self._position += len(data)
+    
+    def _write_object(self, object_id: int, body: bytes):
+        self._offsets[object_id] = self._position
+        self._write(b'%d 0 obj\n' % object_id + body + b'\nendobj\n')
+    
+    def _allocate(self) -> int:
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+    
+    def write_line(self, text: str, size: float = 10, bold: bool = False):
+        """Write a paragraph, wrapping it to the page width and breaking pages as needed"""
+        width = int((PAGE_WIDTH - 2 * self.margin) / (size * AVERAGE_CHAR_WIDTH))
+        font = b'/F2' if bold else b'/F1'
+        leading = size * 1.4
+        
+        for line in textwrap.wrap(text, width) or ['']:
+            if self._y - leading < self.margin:
+                self.new_page()
+            self._y -= leading
+            self._commands.append(
+                b'BT %s %g Tf %g %g Td %s Tj ET' % (font, size, self.margin, self._y, _pdf_string(line))
+            )
+    
+    def space(self, points: float):
+        """Leave vertical space"""
+        self._y -= points
+    
+    def new_page(self):
+        """Flush the current page to the output and start a new one"""
+        content_id = self._allocate()
+        page_id = self._allocate()
+        stream = b'\n'.join(self._commands)
+        self._write_object(content_id, b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        self._write_object(page_id, (
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>'
+        ) % (PAGES_ID, PAGE_WIDTH, PAGE_HEIGHT, FONT_ID, BOLD_FONT_ID, content_id))
+        self._page_ids.append(page_id)
+        self.pages_written += 1
+        self._commands = []
+        self._y = PAGE_HEIGHT - self.margin
+    
+    def close(self):
+        """Flush the last page and write the page tree, catalog and cross-reference table"""
+        if self._commands or not self._page_ids:
+            self.new_page()
+        
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self._page_ids)
+        self._write_object(PAGES_ID, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._page_ids)))
+        self._write_object(CATALOG_ID, b'<< /Type /Catalog /Pages %d 0 R >>' % PAGES_ID)
+        
+        xref_position = self._position
+        count = self._next_id
+        self._write(b'xref\n0 %d\n0000000000 65535 f \n' % count)
+        for object_id in range(1, count):
+            self._write(b'%010d 00000 n \n' % self._offsets[object_id])
+        self._write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                    % (count, CATALOG_ID, xref_position))
+
+
+def iter_report_lines(analysis_results: Dict) -> Iterator[ReportLine]:
+    """Yield the lines of one analysis section"""
+    risk_analysis = analysis_results.get('risk_analysis') or {}
+    video_info = analysis_results.get('video_info') or {}
+    
+    yield f"Credibility Score: {analysis_results.get('credibility_score', 0)}/100", 16, True
+    yield f"URL: {analysis_results.get('url') or ''}", 10, False
+    yield f"Platform: {video_info.get('platform', 'Unknown')}", 10, False
+    if analysis_results.get('duplicate_of'):
+        yield f"Repost of: {analysis_results['duplicate_of'].get('url')}", 10, False
+    
+    yield 'Risk Assessment', 13, True
+    yield (f"Scam Risk: {str(risk_analysis.get('scam_risk_level', 'low')).upper()} "
+           f"({risk_analysis.get('scam_risk_score', 0)}/100)"), 10, False
+    yield (f"Deepfake Risk: {str(risk_analysis.get('deepfake_risk_level', 'low')).upper()} "
+           f"({risk_analysis.get('deepfake_risk_score', 0)}/100)"), 10, False
+    if risk_analysis.get('manipulation_indicators'):
+        yield f"Manipulation: {', '.join(risk_analysis['manipulation_indicators'])}", 10, False
+    if risk_analysis.get('red_flags'):
+        yield f"Red flags: {', '.join(risk_analysis['red_flags'])}", 10, False
+    
+    yield 'Detected Claims', 13, True
+    claims = analysis_results.get('claims') or []
+    if not claims:
+        yield 'No significant claims detected.', 10, False
+    for index, claim in enumerate(claims, 1):
+        yield f"{index}. {claim.get('text', 'N/A')}", 10, False
+        yield (f"    Status: {str(claim.get('status', 'unknown')).upper()}  "
+               f"Confidence: {claim.get('confidence', 0)}%"), 9, False
+
+
+def write_pdf_report(results: Iterable[Dict], out: BinaryIO,
+                     title: str = 'Misinformation Analysis Report') -> int:
+    """
+    Stream a PDF report for one or more analyses to a binary file
+    
+    Returns:
+        Number of pages written
+    """
+    writer = PDFWriter(out)
+    writer.write_line(title, size=20, bold=True)
+    writer.write_line(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", size=9)
+    
+    for analysis_results in results:
+        writer.space(12)
+        for text, size, bold in iter_report_lines(analysis_results):
+            if bold:
+                writer.space(6)
+            writer.write_line(text, size=size, bold=bold)
+    
+    writer.close()
+    return writer.pages_written
+
+
+def result_hash(analysis_results: Dict) -> str:
+    """
+    Stable content hash of the parts of an analysis result a report shows
+    
+    'timestamp' and 'timings' are left out, so serving the same analysis
+    again (e.g. from the result cache, with new timings) reuses its PDF.
+    """
+    payload = json.dumps({field: analysis_results.get(field) for field in REPORT_FIELDS},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PDFReportService:
+    """
+    Render PDF reports off the calling thread, cached on disk by result hash
+    
+    ``submit`` returns immediately with a future for the PDF path. A result
+    that was rendered before resolves at once from the cache, and a result
+    already being rendered shares the in-flight job. At most ``max_reports``
+    files are kept in the cache directory.
+    """
+    
+    def __init__(self, cache_dir: str = DEFAULT_REPORT_DIR, max_workers: int = 1,
+                 max_reports: int = DEFAULT_MAX_REPORTS):
+        self.cache_dir = cache_dir
+        self.max_reports = max_reports
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pdf-report')
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def path_for(self, analysis_results: Dict, digest: Optional[str] = None) -> str:
+        """Cache path of the PDF for a result, from its ``result_hash`` if already known"""
+        return os.path.join(self.cache_dir, f"{digest or result_hash(analysis_results)}.pdf")
+    
+    def submit(self, analysis_results: Dict, digest: Optional[str] = None) -> Future:
+        """
+        Start rendering a result in the background
+        
+        Args:
+            analysis_results: Result to render
+            digest: The result's ``result_hash``, if the caller already computed it
+            
+        Returns:
+            Future that resolves to the PDF path
+        """
+        path = self.path_for(analysis_results, digest)
+        with self._lock:
+            if path in self._in_flight:
+                return self._in_flight[path]
+            if os.path.exists(path):
+                future = Future()
+                future.set_result(path)
+                return future
+            
+            future = self._executor.submit(self._render, analysis_results, path)
+            self._in_flight[path] = future
+        future.add_done_callback(lambda _: self._forget(path))
+        return future
+    
+    def render(self, analysis_results: Dict) -> str:
+        """Render a result (or reuse the cached file) and return the PDF path"""
+        return self.submit(analysis_results).result()
+    
+    def _forget(self, path: str):
+        with self._lock:
+            self._in_flight.pop(path, None)
+    
+    def _render(self, analysis_results: Dict, path: str) -> str:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary name so a half-written file is never served
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as out:
+            write_pdf_report([analysis_results], out)
+        os.replace(temporary, path)
+        self._prune()
+        return path
+    
+    def _prune(self):
+        """Remove the oldest reports beyond max_reports"""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir)
+                       if entry.name.endswith('.pdf') and entry.is_file()]
+        except OSError:
+            return
+        if len(entries) <= self.max_reports:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_reports]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass  # Already removed by another process
+    
+    def close(self):
+        """Wait for pending renders and stop the worker"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,339 @@
+"""
+Pipeline Module
+UI-free analysis pipeline: link -> metadata -> transcript -> claims -> fact-check -> risks -> score
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from modules.video_processor import VideoProcessor
+from modules.metadata import MetadataProvider
+from modules.transcript_extractor import TranscriptExtractor
+from modules.transcript_cache import TranscriptCache
+from modules.speech_to_text import ChunkedTranscriber
+from modules.overlay_text import OverlayTextExtractor, OverlayTranscript
+from modules.deepfake_detector import DeepfakeScorer
+from modules.claim_detector import ClaimDetector
+from modules.claim_classifier import ClaimClassifier
+from modules.fact_checker import FactChecker
+from modules.duplicate_index import DuplicateIndex
+from modules.risk_analyzer import RiskAnalyzer
+from modules.scoring import calculate_credibility_score
+from modules.tracing import Trace
+
+
+NO_TRANSCRIPT = "[No transcript available]"
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.aac', '.ogg', '.opus', '.flac')
+
+
+class AnalysisPipeline:
+    """Run the full analysis chain for a video link without any UI"""
+    
+    def __init__(self, video_processor: Optional[VideoProcessor] = None,
+                 transcript_extractor: Optional[TranscriptExtractor] = None,
+                 claim_detector: Optional[ClaimDetector] = None,
+                 risk_analyzer: Optional[RiskAnalyzer] = None,
+                 overlay_extractor: Optional[OverlayTextExtractor] = None,
+                 deepfake_scorer: Optional[DeepfakeScorer] = None,
+                 fact_checker: Optional[FactChecker] = None,
+                 duplicate_index: Optional[DuplicateIndex] = None,
+                 metadata_provider: Optional[MetadataProvider] = None):
+        self.video_processor = video_processor or VideoProcessor()
+        self.transcript_extractor = transcript_extractor or TranscriptExtractor(
+            cache=TranscriptCache.from_env(),
+            transcriber=ChunkedTranscriber.from_env()
+        )
+        self.claim_detector = claim_detector or ClaimDetector(classifier=ClaimClassifier.from_env())
+        self.risk_analyzer = risk_analyzer or RiskAnalyzer(matcher=self.claim_detector.matcher)
+        self.overlay_extractor = overlay_extractor or OverlayTextExtractor.from_env()
+        self.deepfake_scorer = deepfake_scorer or DeepfakeScorer.from_env()
+        self.fact_checker = fact_checker or FactChecker.from_env()
+        self.duplicate_index = duplicate_index or DuplicateIndex.from_env()
+        self.metadata_provider = metadata_provider or MetadataProvider.from_env()
+    
+    def warm_up(self):
+        """
+        Load every configured model, index and backend ahead of the first request
+        
+        Heavy dependencies (torch, transformers, EasyOCR) are only imported on
+        first use, so this is the place to pay that cost, typically from a
+        background thread via ``modules.start_warm_up``. A stage that fails
+        to load is reported and skipped; it will fail again on first use.
+        """
+        stages = [
+            ('metadata', self.metadata_provider),
+            ('transcript', self.transcript_extractor),
+            ('claim classifier', self.claim_detector.classifier),
+            ('overlay OCR', self.overlay_extractor),
+            ('deepfake model', self.deepfake_scorer),
+            ('duplicate index', self.duplicate_index),
+        ]
+        for name, stage in stages:
+            if stage is None:
+                continue
+            try:
+                stage.warm_up()
+            except Exception as e:
+                print(f"Error warming up {name}: {e}")
+    
+    def run(self, url: str) -> Optional[Dict]:
+        """
+        Analyze a video link end to end
+        
+        Args:
+            url: Video URL
+            
+        Returns:
+            Analysis results, or None if the link is invalid
+        """
+        trace = Trace()
+        video_info = self.process_link(url, trace)
+        if not video_info:
+            return None
+        
+        transcript = self.extract_transcript(video_info, trace)
+        return self.analyze(url, video_info, transcript, trace)
+    
+    def run_media(self, media_path: str, platform: str = 'tiktok',
+                  url: Optional[str] = None) -> Dict:
+        """
+        Analyze a local audio or video file
+        
+        Args:
+            media_path: Path to the media file
+            platform: Platform the media came from
+            url: Original video URL, if known
+            
+        Returns:
+            Analysis results
+        """
+        trace = Trace()
+        video_info = (self.process_link(url, trace) if url else None) or {
+            'platform': platform,
+            'url': url,
+            'video_id': os.path.splitext(os.path.basename(media_path))[0],
+            'title': os.path.basename(media_path),
+            'duration': 0,
+            'upload_date': None,
+        }
+        video_info['media_path'] = media_path
+        
+        media_size = os.path.getsize(media_path) if os.path.exists(media_path) else None
+        with trace.span('overlay_ocr', bytes_processed=media_size):
+            overlay_text = self.extract_overlay_text(media_path)
+        if overlay_text:
+            video_info['overlay_text'] = overlay_text
+        
+        with trace.span('deepfake_frames', bytes_processed=media_size):
+            deepfake_scores = self.score_deepfake_frames(media_path)
+        if deepfake_scores:
+            video_info.update(deepfake_scores)
+        
+        transcript = self.extract_transcript(video_info, trace)
+        return self.analyze(url or media_path, video_info, transcript, trace)
+    
+    def process_link(self, url: str, trace: Optional[Trace] = None) -> Optional[Dict]:
+        """Validate the link, extract video info and look up its metadata (I/O stage)"""
+        trace = trace or Trace()
+        video_info = self.validate_link(url, trace)
+        if video_info:
+            video_info.update(self.fetch_metadata(video_info, trace))
+        return video_info
+    
+    def process_links(self, urls: Iterable[str]) -> Dict:
+        """
+        Validate many links and drop duplicates of the same video
+        
+        With a metadata provider configured, TikTok short links are resolved
+        first, so they dedup against full links to the same video.
+        
+        Returns:
+            ``VideoProcessor.process_links`` counts and video infos
+        """
+        resolve = self.metadata_provider.resolve_key if self.metadata_provider is not None else None
+        return self.video_processor.process_links(urls, resolve)
+    
+    def validate_link(self, url: str, trace: Optional[Trace] = None) -> Optional[Dict]:
+        """Validate the link and extract video info, without network access (CPU stage)"""
+        trace = trace or Trace()
+        with trace.span('link', bytes_processed=len(url or '')):
+            return self.video_processor.process_link(url)
+    
+    def fetch_metadata(self, video_info: Dict, trace: Optional[Trace] = None) -> Dict:
+        """
+        Look up title, duration and upload date, resolving short links (I/O stage)
+        
+        video_info is not modified, so this can run alongside other fetches.
+        
+        Returns:
+            video_info fields to update (empty without a metadata provider)
+        """
+        if self.metadata_provider is None:
+            return {}
+        
+        trace = trace or Trace()
+        enriched = dict(video_info)
+        with trace.span('metadata') as span:
+            self.metadata_provider.enrich(enriched)
+            span['cache'] = self.metadata_provider.last_cache_status()
+        return {field: value for field, value in enriched.items() if video_info.get(field) != value}
+    
+    def extract_transcript(self, video_info: Dict, trace: Optional[Trace] = None) -> Optional[str]:
+        """Fetch the transcript for a video (I/O stage)"""
+        trace = trace or Trace()
+        with trace.span('transcript') as span:
+            transcript = self.transcript_extractor.extract(video_info)
+            span['bytes'] = len(transcript.encode('utf-8')) if transcript else 0
+            span['cache'] = self.transcript_extractor.last_cache_status()
+        return transcript
+    
+    def extract_overlay_text(self, media_path: str) -> Optional[list]:
+        """
+        OCR on-screen text overlays from a local video (I/O and CPU stage)
+        
+        Returns:
+            Timed overlay text segments, or None if OCR is not configured,
+            the file is audio-only, or decoding fails
+        """
+        if self.overlay_extractor is None or media_path.lower().endswith(AUDIO_EXTENSIONS):
+            return None
+        
+        try:
+            return self.overlay_extractor.extract_from_video(media_path)
+        except Exception as e:
+            print(f"Error extracting overlay text from {media_path}: {e}")
+            return None
+    
+    def score_deepfake_frames(self, media_path: str) -> Optional[Dict]:
+        """
+        Score sampled frames of a local video with the deepfake model (CPU stage)
+        
+        Returns:
+            Dict with 'deepfake_model_score', or None if no model is
+            configured, the file is audio-only, or scoring fails
+        """
+        if self.deepfake_scorer is None or media_path.lower().endswith(AUDIO_EXTENSIONS):
+            return None
+        
+        try:
+            return self.deepfake_scorer.score_video_file(media_path)
+        except Exception as e:
+            print(f"Error scoring deepfake frames for {media_path}: {e}")
+            return None
+    
+    def analyze(self, url: str, video_info: Dict, transcript: Optional[str],
+                trace: Optional[Trace] = None) -> Dict:
+        """
+        Detect claims, analyze risks and score credibility (CPU stage)
+        
+        On-screen overlay text in video_info['overlay_text'] is analyzed
+        together with the spoken transcript; claims read from the overlay
+        get the 'start' and 'end' time of their overlay segment. Claims are
+        looked up in the fact-check index, if one is configured, before
+        risk scoring.
+        
+        When the text nearly duplicates an earlier analysis of another video
+        (e.g. a reposted scam script), that analysis's claims are reused
+        instead of detected again and the result gets a 'duplicate_of'
+        pointer to the original. Fact-check status, risk analysis and the
+        credibility score are always computed for this video.
+        
+        Each stage is timed as a span of ``trace``; the spans (including
+        those recorded earlier on the same trace) are returned in 'timings'.
+        
+        Args:
+            url: Original video URL
+            video_info: Video metadata from ``process_link``
+            transcript: Transcript text, or None if unavailable
+            trace: Trace of the earlier stages of this analysis
+            
+        Returns:
+            Analysis results
+        """
+        trace = trace or Trace()
+        if not transcript:
+            transcript = NO_TRANSCRIPT
+        
+        spoken = '' if transcript == NO_TRANSCRIPT else transcript
+        text = transcript
+        overlay = None
+        if video_info.get('overlay_text'):
+            overlay = OverlayTranscript(video_info['overlay_text'])
+            text = overlay.after(spoken)
+        
+        text_size = len(text.encode('utf-8'))
+        
+        signature = None
+        duplicate = None
+        if self.duplicate_index is not None:
+            with trace.span('duplicate_lookup', bytes_processed=text_size) as span:
+                signature = self.duplicate_index.fingerprint(text)
+                if signature is not None:
+                    duplicate = self.duplicate_index.find(
+                        signature, exclude=(video_info.get('platform'), video_info.get('video_id'))
+                    )
+                    span['cache'] = 'miss' if duplicate is None else 'hit'
+        
+        if duplicate is not None:
+            # Claims depend only on the text; their fact-check status and
+            # overlay timings belong to this analysis and are redone below
+            claims = [self._reused_claim(claim) for claim in duplicate['claims']]
+            keyword_matches = None
+            if overlay is not None:
+                overlay.time_claims(claims, spoken)
+        else:
+            with trace.span('claim_detection', bytes_processed=text_size):
+                keyword_matches = self.claim_detector.matcher.scan(text)
+                claims = self.claim_detector.detect_claims(text, matches=keyword_matches)
+                if overlay is not None:
+                    overlay.time_claims(claims, spoken)
+        
+        if self.fact_checker is not None:
+            with trace.span('fact_check'):
+                self.fact_checker.check_claims(claims)
+        
+        # Scores depend on this video's platform, duration, model score and
+        # claim statuses, so they are never copied from a duplicate
+        with trace.span('risk_analysis', bytes_processed=text_size):
+            risk_analysis = self.risk_analyzer.analyze(
+                transcript=text,
+                claims=claims,
+                video_info=video_info,
+                matches=keyword_matches
+            )
+        
+        if signature is not None and duplicate is None:
+            with trace.span('duplicate_index_add'):
+                self.duplicate_index.add(signature, video_info, url, claims, risk_analysis)
+        
+        with trace.span('scoring'):
+            credibility_score = calculate_credibility_score(risk_analysis, claims)
+        
+        result = {
+            "timestamp": datetime.now().isoformat(),
+            "video_info": video_info,
+            "transcript": transcript,
+            "claims": claims,
+            "risk_analysis": risk_analysis,
+            "credibility_score": credibility_score,
+            "url": url,
+            "timings": trace.to_list()
+        }
+        if duplicate is not None:
+            result["duplicate_of"] = {
+                "url": duplicate['url'],
+                "platform": duplicate['platform'],
+                "video_id": duplicate['video_id'],
+                "similarity": duplicate['similarity']
+            }
+        return result
+    
+    @staticmethod
+    def _reused_claim(claim: Dict) -> Dict:
+        """A claim from a duplicate's analysis, without its per-analysis status and timing"""
+        claim = {key: value for key, value in claim.items()
+                 if key not in ('fact_check', 'match_score', 'start', 'end')}
+        claim['status'] = 'unknown'
+        return claim
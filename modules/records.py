@@ -0,0 +1,339 @@
+"""
+Records Module
+Compact typed claim and result records, with a columnar (Arrow) bulk export
+
+Analysis results are nested dicts, which is convenient for display and
+JSON reports but costly when holding many of them. These NamedTuple
+records keep the same information with far less per-object overhead:
+claim keywords become integer IDs into the keyword ruleset, repeated
+labels are interned, and the transcript is dropped unless asked for.
+``to_dict`` restores the dict form used by ``display_results`` and reports.
+``ResultCache`` and ``run_batch`` hold records rather than dicts.
+"""
+
+import sys
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from modules.keyword_matcher import KeywordMatcher, get_default_matcher
+
+
+# Keyword categories reported in a claim's 'keywords_found'
+CLAIM_KEYWORD_CATEGORIES = ('claim', 'suspicious')
+
+# Rows per Arrow record batch when streaming an export
+ARROW_BATCH_SIZE = 10000
+
+# Columns of the columnar export, in order
+ARROW_COLUMNS = (
+    'timestamp', 'url', 'platform', 'video_id', 'canonical_url', 'title', 'channel', 'duration',
+    'upload_date', 'credibility_score', 'scam_risk_level', 'scam_risk_score', 'deepfake_risk_level',
+    'deepfake_risk_score', 'manipulation_indicators', 'red_flags', 'claims', 'transcript',
+    'duplicate_of_url',
+)
+
+# Fields of a stage timing span, as recorded by ``modules.tracing.Trace``
+TIMING_FIELDS = ('stage', 'duration_ms', 'bytes', 'cache', 'error')
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ClaimRecord(NamedTuple):
+    """One detected claim"""
+    text: str
+    confidence: int
+    status: str
+    is_suspicious: bool
+    keyword_ids: Tuple[int, ...]
+    match_score: Optional[float] = None
+    fact_check: Optional[Tuple[str, str]] = None  # (checked claim, source)
+    start: Optional[float] = None  # overlay claims: seconds on screen
+    end: Optional[float] = None
+    
+    @classmethod
+    def from_dict(cls, claim: Dict, matcher: KeywordMatcher) -> 'ClaimRecord':
+        keyword_ids = []
+        for keyword in claim.get('keywords_found') or []:
+            for category in CLAIM_KEYWORD_CATEGORIES:
+                keyword_id = matcher.keyword_id(category, keyword)
+                if keyword_id is not None:
+                    keyword_ids.append(keyword_id)
+                    break
+        fact_check = claim.get('fact_check')
+        return cls(
+            text=claim.get('text', ''),
+            confidence=claim.get('confidence', 0),
+            status=_intern(claim.get('status', 'unknown')),
+            is_suspicious=bool(claim.get('is_suspicious', False)),
+            keyword_ids=tuple(keyword_ids),
+            match_score=claim.get('match_score'),
+            fact_check=(fact_check.get('claim'), fact_check.get('source')) if fact_check else None,
+            start=claim.get('start'),
+            end=claim.get('end'),
+        )
+    
+    def to_dict(self, matcher: KeywordMatcher) -> Dict:
+        claim = {
+            'text': self.text,
+            'confidence': self.confidence,
+            'status': self.status,
+            'is_suspicious': self.is_suspicious,
+            'keywords_found': [matcher.keywords[keyword_id][1] for keyword_id in self.keyword_ids],
+        }
+        if self.match_score is not None:
+            claim['match_score'] = self.match_score
+        if self.fact_check is not None:
+            claim['fact_check'] = {'claim': self.fact_check[0], 'source': self.fact_check[1]}
+        if self.start is not None:
+            claim['start'] = self.start
+            claim['end'] = self.end
+        return claim
+
+
+class RiskRecord(NamedTuple):
+    """Scam and deepfake risk assessment"""
+    scam_risk_level: str
+    scam_risk_score: int
+    deepfake_risk_level: str
+    deepfake_risk_score: int
+    manipulation_indicators: Tuple[str, ...]
+    red_flags: Tuple[str, ...]
+    
+    @classmethod
+    def from_dict(cls, risk_analysis: Dict) -> 'RiskRecord':
+        return cls(
+            scam_risk_level=_intern(risk_analysis.get('scam_risk_level', 'low')),
+            scam_risk_score=risk_analysis.get('scam_risk_score', 0),
+            deepfake_risk_level=_intern(risk_analysis.get('deepfake_risk_level', 'low')),
+            deepfake_risk_score=risk_analysis.get('deepfake_risk_score', 0),
+            manipulation_indicators=tuple(map(_intern, risk_analysis.get('manipulation_indicators') or ())),
+            red_flags=tuple(map(_intern, risk_analysis.get('red_flags') or ())),
+        )
+    
+    def to_dict(self) -> Dict:
+        return {
+            'scam_risk_level': self.scam_risk_level,
+            'scam_risk_score': self.scam_risk_score,
+            'deepfake_risk_level': self.deepfake_risk_level,
+            'deepfake_risk_score': self.deepfake_risk_score,
+            'manipulation_indicators': list(self.manipulation_indicators),
+            'red_flags': list(self.red_flags),
+        }
+
+
+class VideoRecord(NamedTuple):
+    """Video identity and platform metadata"""
+    platform: str
+    video_id: Optional[str]
+    url: Optional[str]
+    title: Optional[str]
+    duration: int
+    upload_date: Optional[str]
+    canonical_url: Optional[str] = None
+    channel: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, video_info: Dict) -> 'VideoRecord':
+        return cls(
+            platform=_intern(video_info.get('platform', '')),
+            video_id=video_info.get('video_id'),
+            url=video_info.get('url'),
+            title=video_info.get('title'),
+            duration=video_info.get('duration', 0) or 0,
+            upload_date=video_info.get('upload_date'),
+            canonical_url=video_info.get('canonical_url'),
+            channel=video_info.get('channel'),
+        )
+    
+    def to_dict(self) -> Dict:
+        video_info = self._asdict()
+        # Only present when known, as in the pipeline's video_info
+        for field in ('canonical_url', 'channel'):
+            if video_info[field] is None:
+                del video_info[field]
+        return video_info
+
+
+class ResultRecord(NamedTuple):
+    """
+    One analysis result
+    
+    Keeps what reports and the results view show, including stage timings.
+    Auxiliary video_info keys (overlay text, media path, model scores) are
+    not kept; the transcript only if requested in ``from_dict``.
+    """
+    timestamp: str
+    url: Optional[str]
+    video: VideoRecord
+    claims: Tuple[ClaimRecord, ...]
+    risk: RiskRecord
+    credibility_score: int
+    transcript: Optional[str] = None
+    duplicate_of: Optional[Tuple[str, str, str, float]] = None  # (url, platform, video_id, similarity)
+    timings: Tuple[Tuple, ...] = ()  # TIMING_FIELDS values of each span
+    
+    @classmethod
+    def from_dict(cls, analysis_results: Dict, matcher: Optional[KeywordMatcher] = None,
+                  include_transcript: bool = False) -> 'ResultRecord':
+        """
+        Compact an analysis result dict
+        
+        Args:
+            analysis_results: Result from ``AnalysisPipeline.analyze``
+            matcher: Matcher whose ruleset the claims were detected with
+                (default: the default ruleset)
+            include_transcript: Keep the transcript text
+        """
+        matcher = matcher or get_default_matcher()
+        duplicate = analysis_results.get('duplicate_of')
+        if duplicate:
+            duplicate = (duplicate['url'], duplicate['platform'], duplicate['video_id'], duplicate['similarity'])
+        return cls(
+            timestamp=analysis_results.get('timestamp', ''),
+            url=analysis_results.get('url'),
+            video=VideoRecord.from_dict(analysis_results.get('video_info') or {}),
+            claims=tuple(ClaimRecord.from_dict(claim, matcher) for claim in analysis_results.get('claims') or []),
+            risk=RiskRecord.from_dict(analysis_results.get('risk_analysis') or {}),
+            credibility_score=analysis_results.get('credibility_score', 0),
+            transcript=analysis_results.get('transcript') if include_transcript else None,
+            duplicate_of=duplicate or None,
+            timings=tuple(
+                (_intern(span.get('stage')), span.get('duration_ms'), span.get('bytes'),
+                 _intern(span.get('cache')), span.get('error'))
+                for span in analysis_results.get('timings') or ()
+            ),
+        )
+    
+    def to_dict(self, matcher: Optional[KeywordMatcher] = None) -> Dict:
+        """Dict form, as returned by ``AnalysisPipeline.analyze``"""
+        matcher = matcher or get_default_matcher()
+        result = {
+            'timestamp': self.timestamp,
+            'video_info': self.video.to_dict(),
+            'transcript': self.transcript,
+            'claims': [claim.to_dict(matcher) for claim in self.claims],
+            'risk_analysis': self.risk.to_dict(),
+            'credibility_score': self.credibility_score,
+            'url': self.url,
+        }
+        if self.duplicate_of is not None:
+            result['duplicate_of'] = dict(zip(('url', 'platform', 'video_id', 'similarity'), self.duplicate_of))
+        if self.timings:
+            result['timings'] = [dict(zip(TIMING_FIELDS, span)) for span in self.timings]
+        return result
+
+
+def iter_records(results: Iterable[Dict], matcher: Optional[KeywordMatcher] = None,
+                 include_transcript: bool = False) -> Iterator[ResultRecord]:
+    """Lazily compact result dicts, skipping batch error records"""
+    matcher = matcher or get_default_matcher()
+    for analysis_results in results:
+        if 'error' not in analysis_results:
+            yield ResultRecord.from_dict(analysis_results, matcher, include_transcript)
+
+
+def to_columns(records: Iterable[ResultRecord]) -> Dict[str, List]:
+    """
+    Column-oriented form of many records
+    
+    Each result field becomes one list. Claims stay nested per result
+    ('claims' holds a list of claim dicts with 'keyword_ids') so a columnar
+    writer can store them as a list<struct> column.
+    """
+    columns: Dict[str, List] = {name: [] for name in ARROW_COLUMNS}
+    for record in records:
+        video, risk = record.video, record.risk
+        values = (
+            record.timestamp, record.url, video.platform, video.video_id, video.canonical_url,
+            video.title, video.channel, video.duration, video.upload_date, record.credibility_score,
+            risk.scam_risk_level, risk.scam_risk_score, risk.deepfake_risk_level, risk.deepfake_risk_score,
+            list(risk.manipulation_indicators), list(risk.red_flags),
+            [
+                {
+                    'text': claim.text,
+                    'confidence': claim.confidence,
+                    'status': claim.status,
+                    'is_suspicious': claim.is_suspicious,
+                    'keyword_ids': list(claim.keyword_ids),
+                    'match_score': claim.match_score,
+                }
+                for claim in record.claims
+            ],
+            record.transcript,
+            record.duplicate_of[0] if record.duplicate_of else None,
+        )
+        for name, value in zip(ARROW_COLUMNS, values):
+            columns[name].append(value)
+    return columns
+
+
+def arrow_schema():
+    """Arrow schema of ``to_columns`` output"""
+    import pyarrow as pa
+    
+    claim = pa.struct([
+        ('text', pa.string()),
+        ('confidence', pa.int16()),
+        ('status', pa.dictionary(pa.int8(), pa.string())),
+        ('is_suspicious', pa.bool_()),
+        ('keyword_ids', pa.list_(pa.int16())),
+        ('match_score', pa.float32()),
+    ])
+    level = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema([
+        ('timestamp', pa.string()),
+        ('url', pa.string()),
+        ('platform', pa.dictionary(pa.int8(), pa.string())),
+        ('video_id', pa.string()),
+        ('canonical_url', pa.string()),
+        ('title', pa.string()),
+        ('channel', pa.string()),
+        ('duration', pa.int32()),
+        ('upload_date', pa.string()),
+        ('credibility_score', pa.int16()),
+        ('scam_risk_level', level),
+        ('scam_risk_score', pa.int16()),
+        ('deepfake_risk_level', level),
+        ('deepfake_risk_score', pa.int16()),
+        ('manipulation_indicators', pa.list_(pa.string())),
+        ('red_flags', pa.list_(pa.string())),
+        ('claims', pa.list_(claim)),
+        ('transcript', pa.string()),
+        ('duplicate_of_url', pa.string()),
+    ])
+
+
+def to_arrow_table(records: Iterable[ResultRecord]):
+    """pyarrow.Table of many records (requires pyarrow)"""
+    import pyarrow as pa
+    
+    return pa.Table.from_pydict(to_columns(records), schema=arrow_schema())
+
+
+def write_arrow(records: Iterable[ResultRecord], path: str, batch_size: int = ARROW_BATCH_SIZE) -> int:
+    """
+    Stream records to an Arrow IPC (Feather v2) file, ``batch_size`` rows at a time
+    
+    Requires pyarrow. The file can be read with pyarrow, pandas
+    (``read_feather``), polars or DuckDB.
+    
+    Returns:
+        Number of records written
+    """
+    import pyarrow as pa
+    
+    schema = arrow_schema()
+    count = 0
+    batch: List[ResultRecord] = []
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pydict(to_columns(batch), schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pydict(to_columns(batch), schema=schema))
+            count += len(batch)
+    return count
@@ -3,27 +3,34 @@ Report Generator Module
 Generates analysis reports in various formats
 """
 
-from typing import Dict
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Union
 from datetime import datetime
+from html import escape
+from string import Template
 import json
 
+from modules.export import serialize
+from modules.pdf_report import PDFReportService
+from modules.video_processor import canonical_key, canonical_url
+
 
 class ReportGenerator:
     """Generate analysis reports"""
     
-    def __init__(self):
-        self.report_formats = ['json', 'pdf', 'html']
+    def __init__(self, pdf_service: Optional[PDFReportService] = None):
+        self.report_formats = ['json', 'pdf', 'html', 'ndjson', 'msgpack']
+        self.pdf_service = pdf_service or PDFReportService()
     
-    def generate(self, analysis_results: Dict, format_type: str = 'json') -> str:
+    def generate(self, analysis_results: Dict, format_type: str = 'json') -> Union[str, bytes]:
         """
         Generate analysis report
         
         Args:
             analysis_results: Complete analysis results
-            format_type: Output format (json, pdf, html)
+            format_type: Output format (json, pdf, html, ndjson, msgpack)
             
         Returns:
-            Report as string or file path
+            Report as string, file path (pdf) or bytes (ndjson, msgpack)
         """
         
         if format_type == 'json':
@@ -32,6 +39,8 @@ class ReportGenerator:
             return self._generate_pdf_report(analysis_results)
         elif format_type == 'html':
             return self._generate_html_report(analysis_results)
+        elif format_type in ('ndjson', 'msgpack'):
+            return serialize(analysis_results, format_type)
         else:
             return self._generate_json_report(analysis_results)
     
@@ -52,12 +61,13 @@ class ReportGenerator:
         """
         Generate PDF format report
         
-        Future implementation will use:
-        - reportlab
-        - weasyprint
+        Renders through the shared PDFReportService, so a result that was
+        already rendered (e.g. in the background for the UI) is reused.
+        
+        Returns:
+            Path of the PDF file
         """
-        # Placeholder for PDF implementation
-        return "PDF report generation coming soon"
+        return self.pdf_service.render(analysis_results)
     
     def _generate_html_report(self, analysis_results: Dict) -> str:
         """
@@ -65,36 +75,41 @@ class ReportGenerator:
         
         Creates a standalone HTML file with embedded CSS and data
         """
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Misinformation Analysis Report</title>
-            <style>
-                body {{
+        return ''.join(iter_html_report([analysis_results]))
+    
+    def _claims_to_html(self, claims: list) -> str:
+        """Convert claims to HTML"""
+        return ''.join(_iter_claims_html(claims))
+
+
+REPORT_CSS = """
+                body {
                     font-family: Arial, sans-serif;
                     margin: 20px;
                     background-color: #f5f5f5;
-                }}
-                .container {{
+                }
+                .container {
                     max-width: 900px;
                     margin: 0 auto;
                     background-color: white;
                     padding: 30px;
                     border-radius: 8px;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                h1 {{
+                }
+                h1 {
                     color: #333;
                     border-bottom: 3px solid #0066cc;
                     padding-bottom: 10px;
-                }}
-                h2 {{
+                }
+                h2 {
                     color: #0066cc;
                     margin-top: 30px;
-                }}
-                .score-card {{
+                }
+                .analysis + .analysis {
+                    border-top: 2px solid #ddd;
+                    margin-top: 40px;
+                }
+                .score-card {
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     color: white;
                     padding: 20px;
@@ -103,97 +118,228 @@ class ReportGenerator:
                     font-size: 48px;
                     font-weight: bold;
                     margin: 20px 0;
-                }}
-                .risk-section {{
+                }
+                .risk-section {
                     display: flex;
                     gap: 20px;
                     margin: 20px 0;
-                }}
-                .risk-card {{
+                }
+                .risk-card {
                     flex: 1;
                     padding: 15px;
                     border-radius: 8px;
                     text-align: center;
-                }}
-                .risk-low {{
+                }
+                .risk-low {
                     background-color: #d4edda;
                     color: #155724;
-                }}
-                .risk-medium {{
+                }
+                .risk-medium {
                     background-color: #fff3cd;
                     color: #856404;
-                }}
-                .risk-high {{
+                }
+                .risk-high {
                     background-color: #f8d7da;
                     color: #721c24;
-                }}
-                .claim {{
+                }
+                .claim {
                     background-color: #f8f9fa;
                     padding: 12px;
                     margin: 10px 0;
                     border-left: 4px solid #0066cc;
                     border-radius: 4px;
-                }}
-                .timestamp {{
+                }
+                .timestamp {
                     color: #666;
                     font-size: 12px;
                     text-align: right;
                     margin-top: 20px;
                     padding-top: 20px;
                     border-top: 1px solid #ddd;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>🔍 Misinformation Analysis Report</h1>
-                
-                <div class="score-card">
-                    {analysis_results.get('credibility_score', 0)}/100
-                </div>
-                
-                <h2>Risk Assessment</h2>
-                <div class="risk-section">
-                    <div class="risk-card risk-{analysis_results['risk_analysis'].get('scam_risk_level', 'low')}">
-                        <strong>Scam Risk</strong><br>
-                        {analysis_results['risk_analysis'].get('scam_risk_level', 'low').upper()}
-                    </div>
-                    <div class="risk-card risk-{analysis_results['risk_analysis'].get('deepfake_risk_level', 'low')}">
-                        <strong>Deepfake Risk</strong><br>
-                        {analysis_results['risk_analysis'].get('deepfake_risk_level', 'low').upper()}
-                    </div>
+                }
+"""
+
+# Templates are parsed once at import; each fragment is a single substitute()
+REPORT_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>$title</title>
+    <style>$css</style>
+</head>
+<body>
+    <div class="container">
+        <h1>🔍 $title</h1>
+""")
+
+ANALYSIS_HEAD = Template("""
+        <section class="analysis">
+            <div class="score-card">
+                $credibility_score/100
+            </div>
+            
+            <h2>Risk Assessment</h2>
+            <div class="risk-section">
+                <div class="risk-card risk-$scam_level">
+                    <strong>Scam Risk</strong><br>
+                    $scam_level_label
                 </div>
-                
-                <h2>Detected Claims</h2>
-                {self._claims_to_html(analysis_results.get('claims', []))}
-                
-                <h2>Video Information</h2>
-                <p><strong>Platform:</strong> {analysis_results['video_info'].get('platform', 'Unknown')}</p>
-                <p><strong>URL:</strong> <a href="{analysis_results['url']}">{analysis_results['url']}</a></p>
-                
-                <div class="timestamp">
-                    Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                <div class="risk-card risk-$deepfake_level">
+                    <strong>Deepfake Risk</strong><br>
+                    $deepfake_level_label
                 </div>
             </div>
-        </body>
-        </html>
-        """
-        
-        return html
-    
-    def _claims_to_html(self, claims: list) -> str:
-        """Convert claims to HTML"""
-        if not claims:
-            return "<p>No significant claims detected.</p>"
-        
-        html = ""
-        for claim in claims:
-            html += f"""
+            
+            <h2>Detected Claims</h2>
+""")
+
+CLAIM_ITEM = Template("""
             <div class="claim">
-                <p><strong>Claim:</strong> {claim.get('text', 'N/A')}</p>
-                <p><strong>Status:</strong> {claim.get('status', 'unknown').upper()}</p>
-                <p><strong>Confidence:</strong> {claim.get('confidence', 0)}%</p>
+                <p><strong>Claim:</strong> $text</p>
+                <p><strong>Status:</strong> $status</p>
+                <p><strong>Confidence:</strong> $confidence%</p>
             </div>
-            """
-        
-        return html
+""")
+
+NO_CLAIMS = "<p>No significant claims detected.</p>"
+
+ANALYSIS_TAIL = Template("""
+            <h2>Video Information</h2>
+            <p><strong>Platform:</strong> $platform</p>
+            <p><strong>URL:</strong> <a href="$href">$url</a></p>
+        </section>
+""")
+
+REPORT_TAIL = Template("""
+        <div class="timestamp">
+            Generated: $generated
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+
+def _iter_claims_html(claims: Iterable[Dict]) -> Iterator[str]:
+    """Yield escaped HTML fragments for claims"""
+    empty = True
+    for claim in claims:
+        empty = False
+        yield CLAIM_ITEM.substitute(
+            text=escape(str(claim.get('text', 'N/A'))),
+            status=escape(str(claim.get('status', 'unknown')).upper()),
+            confidence=escape(str(claim.get('confidence', 0)))
+        )
+    if empty:
+        yield NO_CLAIMS
+
+
+class HTMLReportWriter:
+    """
+    Write an HTML report for any number of analyses to a text stream
+    
+    Each analysis is rendered to small fragments and written immediately,
+    so memory stays constant and time is linear in the number of results.
+    All analysis content is HTML-escaped.
+    
+    Usage:
+        with open('report.html', 'w', encoding='utf-8') as f:
+            with HTMLReportWriter(f) as writer:
+                for result in results:
+                    writer.write_analysis(result)
+    """
+    
+    def __init__(self, out: TextIO, title: str = 'Misinformation Analysis Report'):
+        self.out = out
+        self.title = title
+        self.analyses_written = 0
+        self._started = False
+    
+    def __enter__(self) -> 'HTMLReportWriter':
+        self.write_header()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.write_footer()
+    
+    def write_header(self):
+        """Write the document head (once)"""
+        if not self._started:
+            self.out.write(REPORT_HEAD.substitute(title=escape(self.title), css=REPORT_CSS))
+            self._started = True
+    
+    def write_analysis(self, analysis_results: Dict):
+        """Write one analysis section"""
+        self.write_header()
+        for fragment in iter_analysis_html(analysis_results):
+            self.out.write(fragment)
+        self.analyses_written += 1
+    
+    def write_footer(self):
+        """Close the document"""
+        self.write_header()
+        self.out.write(REPORT_TAIL.substitute(generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+
+def _report_link(analysis_results: Dict) -> str:
+    """
+    Canonical link of the analyzed video, for use in an href
+    
+    The raw input URL is never linked, since it may carry any scheme.
+    """
+    video_info = analysis_results.get('video_info') or {}
+    if video_info.get('canonical_url'):
+        return str(video_info['canonical_url'])
+    key = canonical_key(str(analysis_results.get('url') or ''))
+    return canonical_url(key) if key else ''
+
+
+def iter_analysis_html(analysis_results: Dict) -> Iterator[str]:
+    """Yield the escaped HTML fragments of one analysis section"""
+    risk_analysis = analysis_results.get('risk_analysis') or {}
+    video_info = analysis_results.get('video_info') or {}
+    scam_level = str(risk_analysis.get('scam_risk_level', 'low'))
+    deepfake_level = str(risk_analysis.get('deepfake_risk_level', 'low'))
+    
+    yield ANALYSIS_HEAD.substitute(
+        credibility_score=escape(str(analysis_results.get('credibility_score', 0))),
+        scam_level=escape(scam_level),
+        scam_level_label=escape(scam_level.upper()),
+        deepfake_level=escape(deepfake_level),
+        deepfake_level_label=escape(deepfake_level.upper())
+    )
+    yield from _iter_claims_html(analysis_results.get('claims') or [])
+    link = _report_link(analysis_results)
+    yield ANALYSIS_TAIL.substitute(
+        platform=escape(str(video_info.get('platform', 'Unknown'))),
+        href=escape(link),
+        url=escape(link or str(analysis_results.get('url') or ''))
+    )
+
+
+def iter_html_report(results: Iterable[Dict], title: str = 'Misinformation Analysis Report') -> Iterator[str]:
+    """
+    Lazily yield a complete HTML report as fragments
+    
+    Suitable for streaming responses or ``writelines``; results is
+    consumed one analysis at a time.
+    """
+    yield REPORT_HEAD.substitute(title=escape(title), css=REPORT_CSS)
+    for analysis_results in results:
+        yield from iter_analysis_html(analysis_results)
+    yield REPORT_TAIL.substitute(generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def write_html_report(results: Iterable[Dict], path: str,
+                      title: str = 'Misinformation Analysis Report') -> int:
+    """
+    Stream an HTML report for many analyses to a file
+    
+    Returns:
+        Number of analyses written
+    """
+    with open(path, 'w', encoding='utf-8') as out:
+        with HTMLReportWriter(out, title=title) as writer:
+            for analysis_results in results:
+                writer.write_analysis(analysis_results)
+    return writer.analyses_written
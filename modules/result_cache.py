@@ -0,0 +1,76 @@
+"""
+Result Cache Module
+In-memory LRU cache of finished analyses keyed by video link
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from modules.keyword_matcher import KeywordMatcher
+from modules.records import ResultRecord
+from modules.video_processor import canonical_key
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of analysis results with a TTL
+    
+    Results are held as compact ``ResultRecord``s (transcript included), so
+    a full cache costs a fraction of the nested dicts. ``get`` returns a
+    new dict each time, without auxiliary video_info keys such as overlay
+    text or model scores.
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600,
+                 matcher: Optional[KeywordMatcher] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.matcher = matcher
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored_at, ResultRecord)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(url: str) -> str:
+        """
+        Normalize a video link into a cache key
+        
+        Links to the same video share the 'platform:video_id' key; links that
+        are not recognized fall back to the stripped URL.
+        """
+        key = canonical_key(url)
+        if key is None:
+            return url.strip()
+        return f"{key[0]}:{key[1]}"
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached result for url, or None on a miss or expired entry"""
+        key = self.make_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[1].to_dict(self.matcher)
+    
+    def set(self, url: str, result: Dict):
+        """Store a result, evicting the least recently used entry if full"""
+        key = self.make_key(url)
+        record = ResultRecord.from_dict(result, self.matcher, include_transcript=True)
+        with self._lock:
+            self._entries[key] = (time.time(), record)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,321 @@
+"""
+Results Store Module
+Persistent, indexed SQLite history of analysis results with paged queries
+
+Usage:
+    python -m modules.results_store import results.ndjson
+    python -m modules.results_store query --platform tiktok --scam-risk high --days 7
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.export import read_ndjson
+
+
+DEFAULT_RESULTS_PATH = os.path.join('.cache', 'results.db')
+
+# Columns returned for each row of a query page (the full result is fetched with ``get``)
+SUMMARY_COLUMNS = (
+    'id', 'platform', 'video_id', 'url', 'title', 'analyzed_at', 'credibility_score',
+    'scam_risk_level', 'scam_risk_score', 'deepfake_risk_level', 'deepfake_risk_score',
+    'claim_count',
+)
+
+INSERT_SQL = (
+    'INSERT INTO results (platform, video_id, url, title, analyzed_at, credibility_score, '
+    'scam_risk_level, scam_risk_score, deepfake_risk_level, deepfake_risk_score, '
+    'claim_count, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+def _analyzed_at(analysis_results: Dict) -> float:
+    """Epoch seconds of a result's ISO timestamp (now if missing or malformed)"""
+    try:
+        return datetime.fromisoformat(analysis_results['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+def encode_cursor(analyzed_at: float, result_id: int) -> str:
+    """Opaque cursor for the page after a row"""
+    return f"{analyzed_at!r}:{result_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    analyzed_at, result_id = cursor.rsplit(':', 1)
+    return float(analyzed_at), int(result_id)
+
+
+class ResultsStore:
+    """
+    On-disk history of every finished analysis
+    
+    Each result is stored once as JSON, next to indexed columns for the
+    fields history views filter on: (platform, video_id), analysis time,
+    credibility score and scam/deepfake risk levels. Queries return pages
+    of summary rows newest first, using keyset pagination on
+    (analyzed_at, id), so paging deep into the history costs the same as
+    the first page and never loads more than one page into memory.
+    """
+    
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+    
+    @classmethod
+    def from_env(cls) -> Optional['ResultsStore']:
+        """
+        Build a store from environment settings
+        
+        RESULTS_DB_PATH sets the database file; an empty value disables the
+        results history.
+        """
+        path = os.environ.get('RESULTS_DB_PATH', DEFAULT_RESULTS_PATH)
+        if not path:
+            return None
+        return cls(path)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are opened lazily and never shared across a fork
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT,
+                    video_id TEXT,
+                    url TEXT,
+                    title TEXT,
+                    analyzed_at REAL NOT NULL,
+                    credibility_score INTEGER,
+                    scam_risk_level TEXT,
+                    scam_risk_score INTEGER,
+                    deepfake_risk_level TEXT,
+                    deepfake_risk_score INTEGER,
+                    claim_count INTEGER,
+                    result TEXT NOT NULL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_video ON results (platform, video_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_time ON results (analyzed_at, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_score ON results (credibility_score)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_scam ON results (scam_risk_level, analyzed_at, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_deepfake '
+                         'ON results (deepfake_risk_level, analyzed_at, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_platform_time '
+                         'ON results (platform, analyzed_at, id)')
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+    
+    @staticmethod
+    def _row(analysis_results: Dict) -> tuple:
+        video_info = analysis_results.get('video_info') or {}
+        risk_analysis = analysis_results.get('risk_analysis') or {}
+        return (
+            video_info.get('platform'),
+            video_info.get('video_id'),
+            analysis_results.get('url'),
+            video_info.get('title'),
+            _analyzed_at(analysis_results),
+            analysis_results.get('credibility_score'),
+            risk_analysis.get('scam_risk_level'),
+            risk_analysis.get('scam_risk_score'),
+            risk_analysis.get('deepfake_risk_level'),
+            risk_analysis.get('deepfake_risk_score'),
+            len(analysis_results.get('claims') or []),
+            json.dumps(analysis_results, ensure_ascii=False, separators=(',', ':'), default=str),
+        )
+    
+    def append(self, analysis_results: Dict) -> int:
+        """
+        Store one result
+        
+        Returns:
+            Row ID of the stored result
+        """
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(INSERT_SQL, self._row(analysis_results))
+            conn.commit()
+        return cursor.lastrowid
+    
+    def append_many(self, results: Iterable[Dict], batch_size: int = 1000) -> int:
+        """
+        Store many results, one transaction per ``batch_size`` rows
+        
+        Batch error records (which have an 'error' key) are skipped.
+        
+        Returns:
+            Number of results stored
+        """
+        count = 0
+        batch: List[tuple] = []
+        for analysis_results in results:
+            if 'error' in analysis_results:
+                continue
+            batch.append(self._row(analysis_results))
+            if len(batch) >= batch_size:
+                count += self._insert(batch)
+                batch = []
+        if batch:
+            count += self._insert(batch)
+        return count
+    
+    def _insert(self, rows: List[tuple]) -> int:
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(INSERT_SQL, rows)
+            conn.commit()
+        return len(rows)
+    
+    @staticmethod
+    def _filters(platform: Optional[str] = None, video_id: Optional[str] = None,
+                 scam_risk_level: Optional[str] = None, deepfake_risk_level: Optional[str] = None,
+                 min_score: Optional[int] = None, max_score: Optional[int] = None,
+                 since: Optional[float] = None, until: Optional[float] = None) -> Tuple[List[str], List]:
+        clauses, params = [], []
+        for column, value in (('platform', platform), ('video_id', video_id),
+                              ('scam_risk_level', scam_risk_level),
+                              ('deepfake_risk_level', deepfake_risk_level)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if min_score is not None:
+            clauses.append('credibility_score >= ?')
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append('credibility_score <= ?')
+            params.append(max_score)
+        if since is not None:
+            clauses.append('analyzed_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('analyzed_at < ?')
+            params.append(until)
+        return clauses, params
+    
+    def query(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> Dict:
+        """
+        One page of matching results, newest first
+        
+        Args:
+            limit: Maximum rows in the page
+            cursor: 'next_cursor' of the previous page, None for the first page
+            **filters: platform, video_id, scam_risk_level, deepfake_risk_level,
+                min_score and max_score (credibility), since and until (epoch seconds)
+                
+        Returns:
+            Dict with 'rows' (summary dicts, see SUMMARY_COLUMNS) and
+            'next_cursor' (None on the last page)
+        """
+        clauses, params = self._filters(**filters)
+        if cursor is not None:
+            analyzed_at, result_id = decode_cursor(cursor)
+            clauses.append('(analyzed_at < ? OR (analyzed_at = ? AND id < ?))')
+            params += [analyzed_at, analyzed_at, result_id]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM results {where} "
+                'ORDER BY analyzed_at DESC, id DESC LIMIT ?',
+                (*params, limit + 1)
+            ).fetchall()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[SUMMARY_COLUMNS.index('analyzed_at')], last[0])
+        return {
+            'rows': [dict(zip(SUMMARY_COLUMNS, row)) for row in rows],
+            'next_cursor': next_cursor,
+        }
+    
+    def count(self, **filters) -> int:
+        """Number of results matching the same filters as ``query``"""
+        clauses, params = self._filters(**filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            return self._connect().execute(f'SELECT COUNT(*) FROM results {where}', params).fetchone()[0]
+    
+    def get(self, result_id: int) -> Optional[Dict]:
+        """Full analysis result of a row, or None if it does not exist"""
+        with self._lock:
+            row = self._connect().execute('SELECT result FROM results WHERE id = ?', (result_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def latest(self, platform: str, video_id: str) -> Optional[Dict]:
+        """Most recent full result for a video, or None"""
+        page = self.query(limit=1, platform=platform, video_id=video_id)
+        return self.get(page['rows'][0]['id']) if page['rows'] else None
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def main(argv=None) -> int:
+    """Command-line entry point: bulk import NDJSON results or query the history"""
+    parser = argparse.ArgumentParser(description="Import and query the analysis results history")
+    parser.add_argument('--db', default=None, help="Results database (default: RESULTS_DB_PATH or .cache/results.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    import_parser = commands.add_parser('import', help="Append NDJSON results (e.g. batch output)")
+    import_parser.add_argument('input', help="NDJSON results file")
+    
+    query_parser = commands.add_parser('query', help="Print matching results, newest first")
+    query_parser.add_argument('--platform', choices=('tiktok', 'instagram', 'youtube'))
+    query_parser.add_argument('--scam-risk', choices=('low', 'medium', 'high'))
+    query_parser.add_argument('--deepfake-risk', choices=('low', 'medium', 'high'))
+    query_parser.add_argument('--max-score', type=int, help="Maximum credibility score")
+    query_parser.add_argument('--days', type=float, help="Only results from the last N days")
+    query_parser.add_argument('--limit', type=int, default=50, help="Rows per page")
+    query_parser.add_argument('--cursor', default=None, help="Cursor printed after the previous page")
+    args = parser.parse_args(argv)
+    
+    store = ResultsStore(args.db or os.environ.get('RESULTS_DB_PATH') or DEFAULT_RESULTS_PATH)
+    
+    if args.command == 'import':
+        with open(args.input, 'rb') as source:
+            count = store.append_many(read_ndjson(source))
+        print(f"Imported {count} results into {store.path}")
+        return 0
+    
+    since = (datetime.now() - timedelta(days=args.days)).timestamp() if args.days else None
+    page = store.query(
+        limit=args.limit, cursor=args.cursor, platform=args.platform,
+        scam_risk_level=args.scam_risk, deepfake_risk_level=args.deepfake_risk,
+        max_score=args.max_score, since=since
+    )
+    for row in page['rows']:
+        analyzed = datetime.fromtimestamp(row['analyzed_at']).strftime('%Y-%m-%d %H:%M')
+        print(f"{row['id']:>8}  {analyzed}  {row['platform'] or '-':<9}  "
+              f"score {row['credibility_score']:>3}  scam {row['scam_risk_level'] or '-':<6}  {row['url']}")
+    if page['next_cursor']:
+        print(f"Next page: --cursor {page['next_cursor']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
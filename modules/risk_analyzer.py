@@ -3,25 +3,61 @@ Risk Analyzer Module
 Analyzes scam and deepfake risks
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
+
+from modules.keyword_matcher import (
+    DEFAULT_RULESET, KeywordMatch, KeywordMatcher, categories_found, get_default_matcher
+)
+
+
+# Layout of the vector returned by RiskAnalyzer.extract_features
+FEATURE_NAMES = (
+    'scam_indicator_count',
+    'unverified_claims',
+    'suspicious_claims',
+    'total_claims',
+    'is_tiktok',
+    'is_instagram',
+    'duration',
+    'has_emotional',
+    'has_social_pressure',
+    'has_fear',
+    'has_urgency',
+    'has_sources',
+    'has_vague',
+    'deepfake_model_score',
+)
+FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+
+RISK_LEVELS = ('low', 'medium', 'high')
+SCAM_LEVEL_THRESHOLDS = (30, 70)
+DEEPFAKE_LEVEL_THRESHOLDS = (25, 60)
+
+# Feature flag -> manipulation tactic, in reporting order
+MANIPULATION_TACTICS = (
+    ('has_emotional', 'emotional_manipulation'),
+    ('has_social_pressure', 'social_pressure'),
+    ('has_fear', 'fear_mongering'),
+    ('has_urgency', 'urgency_tactic'),
+)
+RED_FLAGS = ('no_sources_cited', 'vague_language', 'all_unverified_claims')
+
+# Weight of the frame-level model score when blending it with the heuristic
+# deepfake score: (heuristic + 3 * model) / 4, rounded half up
+DEEPFAKE_MODEL_WEIGHT = 3
 
 
 class RiskAnalyzer:
     """Analyze risks in content"""
     
-    def __init__(self):
-        self.scam_indicators = [
-            'buy now', 'limited time', 'act fast', 'only today',
-            'click here', 'crypto', 'guaranteed returns', 'risk-free',
-            'work from home', 'make money fast', 'payment required'
-        ]
+    def __init__(self, matcher: Optional[KeywordMatcher] = None):
+        self.matcher = matcher or get_default_matcher()
         
-        self.deepfake_indicators = [
-            'deepfake', 'ai generated', 'fake', 'synthetic',
-            'altered', 'edited', 'morphed'
-        ]
+        self.scam_indicators = self.matcher.ruleset.get('scam', DEFAULT_RULESET['scam'])
+        self.deepfake_indicators = self.matcher.ruleset.get('deepfake', DEFAULT_RULESET['deepfake'])
     
-    def analyze(self, transcript: str, claims: List[Dict], video_info: Dict) -> Dict:
+    def analyze(self, transcript: str, claims: List[Dict], video_info: Dict,
+                matches: Optional[List[KeywordMatch]] = None) -> Dict:
         """
         Analyze risks in content
         
@@ -29,132 +65,229 @@ class RiskAnalyzer:
             transcript: Video transcript
             claims: Detected claims
             video_info: Video metadata
+            matches: Keyword matches for transcript from ``self.matcher.scan``,
+                shared with ClaimDetector; scanned here if not given
             
         Returns:
             Risk analysis results
         """
         
+        features = self.extract_features(transcript, claims, video_info, matches=matches)
+        
+        scam_score = self._calculate_scam_score(features)
+        deepfake_score = self._calculate_deepfake_score(features)
+        
         analysis = {
-            'scam_risk_level': self._assess_scam_risk(transcript, claims),
-            'scam_risk_score': self._calculate_scam_score(transcript, claims),
-            'deepfake_risk_level': self._assess_deepfake_risk(video_info, transcript),
-            'deepfake_risk_score': self._calculate_deepfake_score(video_info),
-            'manipulation_indicators': self._detect_manipulation(transcript),
-            'red_flags': self._identify_red_flags(transcript, claims)
+            'scam_risk_level': self._assess_scam_risk(scam_score),
+            'scam_risk_score': scam_score,
+            'deepfake_risk_level': self._assess_deepfake_risk(deepfake_score),
+            'deepfake_risk_score': deepfake_score,
+            'manipulation_indicators': self._detect_manipulation(features),
+            'red_flags': self._identify_red_flags(features)
         }
         
         return analysis
     
-    def _assess_scam_risk(self, transcript: str, claims: List[Dict]) -> str:
-        """Assess overall scam risk level"""
-        score = self._calculate_scam_score(transcript, claims)
+    def extract_features(self, transcript: str, claims: List[Dict], video_info: Dict,
+                         matches: Optional[List[KeywordMatch]] = None) -> List[float]:
+        """
+        Reduce a (transcript, claims, video_info) triple to a feature vector
+        
+        Every risk score, level, tactic and red flag is a function of this
+        vector, laid out as FEATURE_NAMES. 'deepfake_model_score' is -1 when
+        no frame-level model score is available.
+        
+        Args:
+            transcript: Video transcript
+            claims: Detected claims
+            video_info: Video metadata
+            matches: Keyword matches for transcript; scanned here if not given
+        
+        Returns:
+            Feature values in FEATURE_NAMES order
+        """
+        if matches is None:
+            matches = self.matcher.scan(transcript)
+        found = categories_found(matches)
+        
+        platform = video_info.get('platform', '')
+        
+        return [
+            len(found.get('scam', [])),
+            sum(1 for claim in claims if claim.get('status') == 'unknown'),
+            sum(1 for claim in claims if claim.get('is_suspicious', False)),
+            len(claims),
+            int(platform == 'tiktok'),
+            int(platform == 'instagram'),
+            float(video_info.get('duration', 0) or 0),
+            int('emotional' in found),
+            int('social_pressure' in found),
+            int('fear' in found),
+            int('urgency' in found),
+            int('source' in found),
+            int('vague' in found),
+            float(video_info.get('deepfake_model_score', -1)),
+        ]
+    
+    def score_batch(self, features: Sequence[Sequence[float]]) -> Dict:
+        """
+        Score many feature vectors at once with NumPy
+        
+        Produces exactly the values ``analyze`` would for each item.
         
-        if score < 30:
+        Args:
+            features: N feature vectors from ``extract_features`` (N x len(FEATURE_NAMES))
+        
+        Returns:
+            Dict of length-N arrays: integer scores ('scam_risk_score',
+            'deepfake_risk_score'), level codes into RISK_LEVELS
+            ('scam_risk_code', 'deepfake_risk_code'), plus boolean matrices
+            'manipulation' (N x len(MANIPULATION_TACTICS)) and
+            'red_flags' (N x len(RED_FLAGS))
+        """
+        import numpy as np
+        
+        matrix = np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+        column = {name: matrix[:, index] for name, index in FEATURE_INDEX.items()}
+        
+        scam_score = (
+            10
+            + column['scam_indicator_count'] * 8
+            + column['unverified_claims'] * 5
+            + column['suspicious_claims'] * 10
+        )
+        scam_score = np.clip(scam_score, 0, 100).astype(np.int64)
+        
+        deepfake_score = (
+            15
+            + column['is_tiktok'] * 10
+            + column['is_instagram'] * 5
+            + (column['duration'] < 15) * 5
+        )
+        deepfake_score = np.clip(deepfake_score, 0, 100)
+        model_score = column['deepfake_model_score']
+        blended = (deepfake_score + DEEPFAKE_MODEL_WEIGHT * model_score + 2) // (DEEPFAKE_MODEL_WEIGHT + 1)
+        deepfake_score = np.where(model_score >= 0, np.clip(blended, 0, 100), deepfake_score).astype(np.int64)
+        
+        manipulation = np.stack(
+            [column[flag] > 0 for flag, _ in MANIPULATION_TACTICS], axis=1
+        )
+        red_flags = np.stack([
+            column['has_sources'] == 0,
+            column['has_vague'] > 0,
+            (column['unverified_claims'] == column['total_claims']) & (column['total_claims'] > 0),
+        ], axis=1)
+        
+        return {
+            'scam_risk_score': scam_score,
+            'scam_risk_code': np.searchsorted(SCAM_LEVEL_THRESHOLDS, scam_score, side='right'),
+            'deepfake_risk_score': deepfake_score,
+            'deepfake_risk_code': np.searchsorted(DEEPFAKE_LEVEL_THRESHOLDS, deepfake_score, side='right'),
+            'manipulation': manipulation,
+            'red_flags': red_flags,
+        }
+    
+    @staticmethod
+    def batch_to_analyses(batch: Dict) -> List[Dict]:
+        """Expand ``score_batch`` output into per-item analysis dicts"""
+        tactics = [tactic for _, tactic in MANIPULATION_TACTICS]
+        analyses = []
+        for index in range(len(batch['scam_risk_score'])):
+            analyses.append({
+                'scam_risk_level': RISK_LEVELS[batch['scam_risk_code'][index]],
+                'scam_risk_score': int(batch['scam_risk_score'][index]),
+                'deepfake_risk_level': RISK_LEVELS[batch['deepfake_risk_code'][index]],
+                'deepfake_risk_score': int(batch['deepfake_risk_score'][index]),
+                'manipulation_indicators': [
+                    tactic for tactic, present in zip(tactics, batch['manipulation'][index]) if present
+                ],
+                'red_flags': [
+                    flag for flag, present in zip(RED_FLAGS, batch['red_flags'][index]) if present
+                ]
+            })
+        return analyses
+    
+    def _assess_scam_risk(self, score: int) -> str:
+        """Assess overall scam risk level"""
+        if score < SCAM_LEVEL_THRESHOLDS[0]:
             return 'low'
-        elif score < 70:
+        elif score < SCAM_LEVEL_THRESHOLDS[1]:
             return 'medium'
         else:
             return 'high'
     
-    def _calculate_scam_score(self, transcript: str, claims: List[Dict]) -> int:
+    def _calculate_scam_score(self, features: List[float]) -> int:
         """Calculate scam risk score (0-100)"""
         score = 10  # Base score
         
-        transcript_lower = transcript.lower()
-        
         # Check for scam indicators
-        indicator_count = sum(1 for indicator in self.scam_indicators 
-                            if indicator in transcript_lower)
-        score += indicator_count * 8
+        score += features[FEATURE_INDEX['scam_indicator_count']] * 8
         
         # Check for unverified claims
-        unverified = sum(1 for claim in claims if claim.get('status') == 'unknown')
-        score += unverified * 5
+        score += features[FEATURE_INDEX['unverified_claims']] * 5
         
         # Check for suspicious language
-        suspicious = sum(1 for claim in claims if claim.get('is_suspicious', False))
-        score += suspicious * 10
+        score += features[FEATURE_INDEX['suspicious_claims']] * 10
         
         return min(100, max(0, score))
     
-    def _assess_deepfake_risk(self, video_info: Dict, transcript: str) -> str:
+    def _assess_deepfake_risk(self, score: int) -> str:
         """Assess deepfake risk level"""
-        score = self._calculate_deepfake_score(video_info)
-        
-        if score < 25:
+        if score < DEEPFAKE_LEVEL_THRESHOLDS[0]:
             return 'low'
-        elif score < 60:
+        elif score < DEEPFAKE_LEVEL_THRESHOLDS[1]:
             return 'medium'
         else:
             return 'high'
     
-    def _calculate_deepfake_score(self, video_info: Dict) -> int:
+    def _calculate_deepfake_score(self, features: List[float]) -> int:
         """Calculate deepfake risk score (0-100)"""
         score = 15  # Base score for unknown videos
         
-        # Check video quality indicators
-        # Lower quality videos have higher deepfake risk
-        # (In real implementation, would analyze video frames)
-        
-        platform = video_info.get('platform', '')
-        
         # Platform-specific risk adjustments
-        if platform == 'tiktok':
+        if features[FEATURE_INDEX['is_tiktok']]:
             score += 10  # TikTok has more edited content
-        elif platform == 'instagram':
+        elif features[FEATURE_INDEX['is_instagram']]:
             score += 5   # Instagram also has significant editing
         
         # Duration-based check (very short videos have higher risk)
-        duration = video_info.get('duration', 0)
-        if duration < 15:
+        if features[FEATURE_INDEX['duration']] < 15:
             score += 5
         
-        return min(100, max(0, score))
-    
-    def _detect_manipulation(self, transcript: str) -> List[str]:
-        """Detect manipulation tactics in content"""
-        tactics = []
-        transcript_lower = transcript.lower()
-        
-        # Emotional manipulation
-        emotional_words = ['shocking', 'unbelievable', 'horrific', 'tragic', 'devastating']
-        if any(word in transcript_lower for word in emotional_words):
-            tactics.append('emotional_manipulation')
-        
-        # Social pressure
-        if any(phrase in transcript_lower for phrase in ['everyone knows', 'most people', 'trend']):
-            tactics.append('social_pressure')
+        score = min(100, max(0, score))
         
-        # Fear-mongering
-        if any(phrase in transcript_lower for phrase in ['danger', 'warning', 'alert', 'threat']):
-            tactics.append('fear_mongering')
+        # Blend in the frame-level model score when frames were analyzed
+        model_score = features[FEATURE_INDEX['deepfake_model_score']]
+        if model_score >= 0:
+            blended = (score + DEEPFAKE_MODEL_WEIGHT * model_score + 2) // (DEEPFAKE_MODEL_WEIGHT + 1)
+            score = int(min(100, max(0, blended)))
         
-        # Urgency tactics
-        if any(phrase in transcript_lower for phrase in ['now', 'today', 'immediately', 'limited']):
-            tactics.append('urgency_tactic')
-        
-        return tactics
+        return score
     
-    def _identify_red_flags(self, transcript: str, claims: List[Dict]) -> List[str]:
+    def _detect_manipulation(self, features: List[float]) -> List[str]:
+        """Detect manipulation tactics in content"""
+        # Emotional manipulation, social pressure, fear-mongering, urgency tactics
+        return [
+            tactic for flag, tactic in MANIPULATION_TACTICS
+            if features[FEATURE_INDEX[flag]]
+        ]
+    
+    def _identify_red_flags(self, features: List[float]) -> List[str]:
         """Identify specific red flags"""
         red_flags = []
-        transcript_lower = transcript.lower()
         
         # Missing sources
-        if 'study' not in transcript_lower and 'research' not in transcript_lower:
+        if not features[FEATURE_INDEX['has_sources']]:
             red_flags.append('no_sources_cited')
         
         # Vague claims
-        vague_phrases = [
-            'some people say', 'they say', 'doctors hate',
-            'this one trick', 'secret method'
-        ]
-        if any(phrase in transcript_lower for phrase in vague_phrases):
+        if features[FEATURE_INDEX['has_vague']]:
             red_flags.append('vague_language')
         
         # All claims unverified
-        unverified_count = sum(1 for claim in claims if claim.get('status') == 'unknown')
-        if unverified_count == len(claims) and len(claims) > 0:
+        unverified_count = features[FEATURE_INDEX['unverified_claims']]
+        total_claims = features[FEATURE_INDEX['total_claims']]
+        if unverified_count == total_claims and total_claims > 0:
             red_flags.append('all_unverified_claims')
         
         return red_flags
@@ -0,0 +1,153 @@
+"""
+Scoring Module
+Credibility scoring shared by the UI and batch pipeline
+"""
+
+from typing import Dict, Iterable, List
+
+from modules.risk_analyzer import RISK_LEVELS
+
+
+# Points deducted from the credibility score per risk level
+SCAM_DEDUCTIONS = {'low': 5, 'medium': 20, 'high': 40}
+DEEPFAKE_DEDUCTIONS = {'low': 5, 'medium': 15, 'high': 35}
+FALSE_CLAIM_DEDUCTION = 10
+
+
+def calculate_credibility_score(risk_analysis: Dict, claims: List[Dict]) -> int:
+    """Calculate credibility score based on risk analysis and claims"""
+    
+    score = 100
+    
+    # Deduct based on scam risk
+    scam_risk = risk_analysis.get('scam_risk_level', 'low')
+    score -= SCAM_DEDUCTIONS.get(scam_risk, 0)
+    
+    # Deduct based on deepfake risk
+    deepfake_risk = risk_analysis.get('deepfake_risk_level', 'low')
+    score -= DEEPFAKE_DEDUCTIONS.get(deepfake_risk, 0)
+    
+    # Deduct based on false claims
+    false_claims = sum(1 for claim in claims if claim.get('status') == 'false')
+    score -= false_claims * FALSE_CLAIM_DEDUCTION
+    
+    # Floor at 0
+    return max(0, min(100, score))
+
+
+def calculate_credibility_scores(scam_codes, deepfake_codes, false_claims):
+    """
+    Vectorized ``calculate_credibility_score`` over columns
+    
+    Args:
+        scam_codes: Scam risk level codes into RISK_LEVELS (-1 for unknown)
+        deepfake_codes: Deepfake risk level codes into RISK_LEVELS (-1 for unknown)
+        false_claims: Number of false claims per row
+    
+    Returns:
+        Integer NumPy array of credibility scores
+    """
+    import numpy as np
+    
+    # Trailing 0 is picked up by code -1 (unknown level, no deduction)
+    scam_table = np.array([SCAM_DEDUCTIONS[level] for level in RISK_LEVELS] + [0])
+    deepfake_table = np.array([DEEPFAKE_DEDUCTIONS[level] for level in RISK_LEVELS] + [0])
+    
+    score = (
+        100
+        - scam_table[np.asarray(scam_codes, dtype=np.int64)]
+        - deepfake_table[np.asarray(deepfake_codes, dtype=np.int64)]
+        - np.asarray(false_claims, dtype=np.int64) * FALSE_CLAIM_DEDUCTION
+    )
+    return np.clip(score, 0, 100)
+
+
+def results_to_frame(results: Iterable[Dict]):
+    """
+    Flatten analysis results into a compact pandas DataFrame
+    
+    Risk levels become categoricals over RISK_LEVELS and claims collapse
+    to a false-claim count, so rescoring never touches the nested dicts.
+    
+    Returns:
+        DataFrame with timestamp, platform, video_id, scam_risk_level,
+        deepfake_risk_level, false_claims and credibility_score columns
+    """
+    import pandas as pd
+    
+    columns = {
+        'timestamp': [], 'platform': [], 'video_id': [],
+        'scam_risk_level': [], 'deepfake_risk_level': [],
+        'false_claims': [], 'credibility_score': []
+    }
+    for result in results:
+        video_info = result.get('video_info') or {}
+        risk_analysis = result.get('risk_analysis') or {}
+        columns['timestamp'].append(result.get('timestamp'))
+        columns['platform'].append(video_info.get('platform'))
+        columns['video_id'].append(video_info.get('video_id'))
+        columns['scam_risk_level'].append(risk_analysis.get('scam_risk_level', 'low'))
+        columns['deepfake_risk_level'].append(risk_analysis.get('deepfake_risk_level', 'low'))
+        columns['false_claims'].append(
+            sum(1 for claim in result.get('claims', []) if claim.get('status') == 'false')
+        )
+        columns['credibility_score'].append(result.get('credibility_score'))
+    
+    frame = pd.DataFrame(columns)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'], errors='coerce', format='ISO8601')
+    frame['platform'] = frame['platform'].astype('category')
+    for column in ('scam_risk_level', 'deepfake_risk_level'):
+        frame[column] = pd.Categorical(frame[column], categories=RISK_LEVELS)
+    frame['false_claims'] = frame['false_claims'].astype('int32')
+    frame['credibility_score'] = pd.to_numeric(frame['credibility_score'], errors='coerce')
+    return frame
+
+
+def score_frame(frame):
+    """
+    Recompute credibility scores for a ``results_to_frame`` DataFrame
+    
+    Returns:
+        Integer Series aligned with frame
+    """
+    import pandas as pd
+    
+    scores = calculate_credibility_scores(
+        frame['scam_risk_level'].cat.codes.to_numpy(),
+        frame['deepfake_risk_level'].cat.codes.to_numpy(),
+        frame['false_claims'].to_numpy()
+    )
+    return pd.Series(scores, index=frame.index, name='credibility_score')
+
+
+def aggregate_scores(frame, freq: str = 'D'):
+    """
+    Aggregate credibility per platform and time bucket
+    
+    Args:
+        frame: DataFrame from ``results_to_frame``
+        freq: pandas offset alias for the time bucket (default: daily)
+    
+    Returns:
+        DataFrame indexed by (platform, period) with analysis counts,
+        mean/min credibility and the share of high scam/deepfake risk
+    """
+    import pandas as pd
+    
+    working = pd.DataFrame({
+        'platform': frame['platform'],
+        'period': frame['timestamp'].dt.to_period(freq),
+        'credibility_score': frame['credibility_score'],
+        'high_scam_risk': frame['scam_risk_level'] == 'high',
+        'high_deepfake_risk': frame['deepfake_risk_level'] == 'high',
+        'false_claims': frame['false_claims'],
+    })
+    
+    return working.groupby(['platform', 'period'], observed=True).agg(
+        analyses=('credibility_score', 'size'),
+        mean_credibility=('credibility_score', 'mean'),
+        min_credibility=('credibility_score', 'min'),
+        high_scam_share=('high_scam_risk', 'mean'),
+        high_deepfake_share=('high_deepfake_risk', 'mean'),
+        false_claims=('false_claims', 'sum'),
+    )
@@ -0,0 +1,120 @@
+"""
+Similarity Module
+MinHash signatures and LSH banding for near-duplicate text lookup
+"""
+
+import random
+import re
+import zlib
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Hash values stay below 2**31 so (a * h + b) fits in uint64 arithmetic
+MERSENNE_PRIME = (1 << 31) - 1
+MAX_HASH = MERSENNE_PRIME
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (apostrophes kept, so "don't" stays one token)"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def shingles(tokens: List[str], size: int = 1) -> Set[str]:
+    """Set of word n-grams; falls back to single words for short texts"""
+    if size <= 1 or len(tokens) < size:
+        return set(tokens)
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def jaccard(a: Set, b: Set) -> float:
+    """Jaccard similarity of two sets (0.0 when both are empty)"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures over string features
+    
+    Features are hashed with CRC32, so signatures are stable across
+    processes and can be stored on disk. All permutations are applied in
+    one NumPy broadcast; NumPy is only imported on the first signature.
+    """
+    
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        self.seed = seed
+        self._a = None
+        self._b = None
+    
+    def _permutations(self):
+        if self._a is None:
+            import numpy as np
+            
+            rng = random.Random(self.seed)
+            a = np.array([rng.randrange(1, MERSENNE_PRIME) for _ in range(self.num_perm)], dtype=np.uint64)
+            b = np.array([rng.randrange(0, MERSENNE_PRIME) for _ in range(self.num_perm)], dtype=np.uint64)
+            self._a, self._b = a, b
+        return self._a, self._b
+    
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature of a feature set (all MAX_HASH if empty)"""
+        import numpy as np
+        
+        unique = set(features)
+        if not unique:
+            return (MAX_HASH,) * self.num_perm
+        a, b = self._permutations()
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode('utf-8')) for feature in unique),
+            dtype=np.uint64, count=len(unique)
+        )
+        values = (hashes[:, None] * a + b) % MERSENNE_PRIME
+        return tuple(values.min(axis=0).tolist())
+
+
+def band_keys(signature: Tuple[int, ...], bands: int) -> List[int]:
+    """
+    One integer key per LSH band of a signature
+    
+    Two signatures share a band key when all rows of that band agree.
+    Keys are CRC32 values prefixed with the band number, so they fit in
+    a SQLite INTEGER column.
+    """
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        values = signature[band * rows:(band + 1) * rows]
+        packed = b''.join(value.to_bytes(4, 'little') for value in values)
+        keys.append((band << 32) | zlib.crc32(packed))
+    return keys
+
+
+class LSHIndex:
+    """
+    In-memory banded LSH index over MinHash signatures
+    
+    With b bands of r rows, items whose Jaccard similarity is above
+    roughly (1/b) ** (1/r) are very likely to share a bucket.
+    """
+    
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self._buckets: Dict[int, List[Hashable]] = {}
+    
+    def add(self, key: Hashable, signature: Tuple[int, ...]):
+        """Index an item under its signature"""
+        for band_key in band_keys(signature, self.bands):
+            self._buckets.setdefault(band_key, []).append(key)
+    
+    def query(self, signature: Tuple[int, ...]) -> Set[Hashable]:
+        """Keys of items sharing at least one band with signature"""
+        candidates = set()
+        for band_key in band_keys(signature, self.bands):
+            candidates.update(self._buckets.get(band_key, ()))
+        return candidates
@@ -0,0 +1,280 @@
+"""
+Speech-to-Text Module
+Chunked, parallel transcription of local audio/video files
+"""
+
+import os
+import subprocess
+import wave
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit PCM
+READ_SIZE = 64 * 1024
+
+
+class AudioWindow(NamedTuple):
+    """A window of mono 16-bit PCM audio"""
+    index: int
+    start: float
+    end: float
+    samples: bytes
+    sample_rate: int
+
+
+def iter_pcm_chunks(path: str, sample_rate: int = SAMPLE_RATE) -> Iterator[bytes]:
+    """
+    Stream a media file as mono 16-bit PCM without loading it into memory
+    
+    Mono 16-bit PCM WAV files at ``sample_rate`` are read directly; anything
+    else, including WAV files the ``wave`` module cannot parse (e.g. float
+    or compressed samples), is decoded by an ``ffmpeg`` subprocess (the
+    same binary yt-dlp uses).
+    """
+    if path.lower().endswith('.wav'):
+        try:
+            wav = wave.open(path, 'rb')
+        except (wave.Error, EOFError):
+            wav = None  # Not plain PCM; ffmpeg decodes it below
+        if wav is not None:
+            with wav:
+                if (wav.getnchannels() == 1 and wav.getsampwidth() == SAMPLE_WIDTH
+                        and wav.getframerate() == sample_rate):
+                    frames_per_read = READ_SIZE // SAMPLE_WIDTH
+                    while True:
+                        chunk = wav.readframes(frames_per_read)
+                        if not chunk:
+                            return
+                        yield chunk
+    
+    command = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error', '-i', path,
+        '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), '-'
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    finished = False
+    try:
+        while True:
+            chunk = process.stdout.read(READ_SIZE)
+            if not chunk:
+                finished = True
+                break
+            yield chunk
+    finally:
+        process.stdout.close()
+        if not finished:
+            # Closed early or failed downstream: stop ffmpeg and let the original exception through
+            process.kill()
+        returncode = process.wait()
+    
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {path}")
+
+
+def iter_audio_windows(path: str, window_seconds: float = 30.0, overlap_seconds: float = 2.0,
+                       sample_rate: int = SAMPLE_RATE) -> Iterator[AudioWindow]:
+    """
+    Split a media file's audio into overlapping windows
+    
+    Only the current window (plus one read chunk) is held in memory.
+    
+    Args:
+        path: Local audio or video file
+        window_seconds: Window length
+        overlap_seconds: Audio shared by consecutive windows
+        sample_rate: Output sample rate
+    """
+    if overlap_seconds >= window_seconds:
+        raise ValueError("overlap_seconds must be shorter than window_seconds")
+    
+    bytes_per_second = sample_rate * SAMPLE_WIDTH
+    window_bytes = int(window_seconds * sample_rate) * SAMPLE_WIDTH
+    step_bytes = window_bytes - int(overlap_seconds * sample_rate) * SAMPLE_WIDTH
+    
+    buffer = bytearray()
+    offset = 0  # byte offset of buffer[0] in the stream
+    index = 0
+    
+    for chunk in iter_pcm_chunks(path, sample_rate):
+        buffer.extend(chunk)
+        while len(buffer) >= window_bytes:
+            yield AudioWindow(
+                index, offset / bytes_per_second, (offset + window_bytes) / bytes_per_second,
+                bytes(buffer[:window_bytes]), sample_rate
+            )
+            del buffer[:step_bytes]
+            offset += step_bytes
+            index += 1
+    
+    # Final partial window, unless it is entirely overlap already transcribed
+    if buffer and (index == 0 or len(buffer) > window_bytes - step_bytes):
+        yield AudioWindow(
+            index, offset / bytes_per_second, (offset + len(buffer)) / bytes_per_second,
+            bytes(buffer), sample_rate
+        )
+
+
+class ASRBackend(ABC):
+    """Speech recognition backend interface"""
+    
+    name = 'base'
+    
+    @abstractmethod
+    def transcribe(self, window: AudioWindow) -> str:
+        """Return the text spoken in one audio window"""
+    
+    def warm_up(self):
+        """Load the model ahead of the first window (no-op by default)"""
+
+
+class StubASRBackend(ASRBackend):
+    """
+    Offline backend for tests and dry runs
+    
+    Returns ``text_for_window(window)`` if given, otherwise a placeholder
+    naming the window's time range.
+    """
+    
+    name = 'stub'
+    
+    def __init__(self, text_for_window: Optional[Callable[[AudioWindow], str]] = None):
+        self.text_for_window = text_for_window
+    
+    def transcribe(self, window: AudioWindow) -> str:
+        if self.text_for_window is not None:
+            return self.text_for_window(window)
+        return f"[audio {window.start:.1f}s-{window.end:.1f}s]"
+
+
+@lru_cache(maxsize=4)
+def _load_transformers_asr(model_name: str, device: int):
+    """Load a transformers ASR pipeline once per process"""
+    from transformers import pipeline
+    return pipeline('automatic-speech-recognition', model=model_name, device=device)
+
+
+class TransformersASRBackend(ASRBackend):
+    """Whisper (or any transformers ASR model) running locally"""
+    
+    name = 'transformers'
+    
+    def __init__(self, model_name: str = 'openai/whisper-tiny', device: int = -1):
+        self.model_name = model_name
+        self.device = device
+    
+    def warm_up(self):
+        _load_transformers_asr(self.model_name, self.device)
+    
+    def transcribe(self, window: AudioWindow) -> str:
+        import numpy as np
+        
+        asr = _load_transformers_asr(self.model_name, self.device)
+        audio = np.frombuffer(window.samples, dtype=np.int16).astype(np.float32) / 32768.0
+        result = asr({'raw': audio, 'sampling_rate': window.sample_rate})
+        return result.get('text', '').strip()
+
+
+def build_asr_backend(name: str, **kwargs) -> ASRBackend:
+    """Create an ASR backend by name ('stub' or 'transformers')"""
+    if name == 'stub':
+        return StubASRBackend(**kwargs)
+    elif name == 'transformers':
+        return TransformersASRBackend(**kwargs)
+    raise ValueError(f"Unknown ASR backend: {name}")
+
+
+def merge_overlapping_text(previous: str, current: str, max_overlap_words: int = 20) -> str:
+    """
+    Drop the words at the start of current that repeat the end of previous
+    
+    Consecutive windows share audio, so their transcripts usually repeat a
+    few words at the seam.
+    """
+    previous_words = previous.split()
+    current_words = current.split()
+    limit = min(max_overlap_words, len(previous_words), len(current_words))
+    
+    for size in range(limit, 0, -1):
+        tail = [word.lower().strip('.,!?') for word in previous_words[-size:]]
+        head = [word.lower().strip('.,!?') for word in current_words[:size]]
+        if tail == head:
+            return ' '.join(current_words[size:])
+    return current
+
+
+class ChunkedTranscriber:
+    """
+    Transcribe long media files window by window in a worker pool
+    
+    Windows are decoded lazily and at most ``max_pending`` are in flight,
+    so memory stays bounded regardless of file length. Segments come back
+    in audio order with the overlap between windows removed.
+    """
+    
+    def __init__(self, backend: ASRBackend, window_seconds: float = 30.0,
+                 overlap_seconds: float = 2.0, max_workers: int = 2,
+                 max_pending: Optional[int] = None):
+        self.backend = backend
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 2
+    
+    @classmethod
+    def from_env(cls) -> Optional['ChunkedTranscriber']:
+        """
+        Build a transcriber from environment settings
+        
+        ASR_BACKEND selects the backend ('stub' or 'transformers'; empty
+        disables local transcription) and ASR_MODEL the transformers model.
+        """
+        name = os.environ.get('ASR_BACKEND', '')
+        if not name:
+            return None
+        if name == 'transformers' and os.environ.get('ASR_MODEL'):
+            return cls(TransformersASRBackend(os.environ['ASR_MODEL']))
+        return cls(build_asr_backend(name))
+    
+    def warm_up(self):
+        """Load the ASR backend ahead of the first file"""
+        self.backend.warm_up()
+    
+    def iter_segments(self, path: str) -> Iterator[Dict]:
+        """
+        Yield transcript segments in order
+        
+        Returns:
+            Iterator of dicts with 'start', 'end' (seconds) and 'text'
+        """
+        windows = iter_audio_windows(path, self.window_seconds, self.overlap_seconds)
+        previous_text = ''
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque()
+            for window in windows:
+                pending.append((window.start, window.end, pool.submit(self.backend.transcribe, window)))
+                if len(pending) >= self.max_pending:
+                    segment, previous_text = self._next_segment(pending, previous_text)
+                    if segment:
+                        yield segment
+            while pending:
+                segment, previous_text = self._next_segment(pending, previous_text)
+                if segment:
+                    yield segment
+    
+    def _next_segment(self, pending: deque, previous_text: str):
+        start, end, future = pending.popleft()
+        text = future.result().strip()
+        merged = merge_overlapping_text(previous_text, text) if previous_text else text
+        segment = {'start': start, 'end': end, 'text': merged} if merged else None
+        return segment, (text or previous_text)
+    
+    def transcribe(self, path: str) -> Optional[str]:
+        """Transcribe a media file to a single string (None if nothing was recognised)"""
+        texts: List[str] = [segment['text'] for segment in self.iter_segments(path)]
+        return ' '.join(texts) if texts else None
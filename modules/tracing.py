@@ -0,0 +1,223 @@
+"""
+Tracing Module
+Per-stage timing spans and Prometheus text-format metrics
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsRegistry:
+    """
+    Thread-safe per-stage latency histograms and counters
+    
+    Spans from every Trace are observed here and rendered in the
+    Prometheus text exposition format.
+    """
+    
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict] = {}
+    
+    def observe(self, span: Dict):
+        """Record a finished span"""
+        seconds = span['duration_ms'] / 1000.0
+        with self._lock:
+            stage = self._stages.get(span['stage'])
+            if stage is None:
+                stage = self._stages[span['stage']] = {
+                    'bucket_counts': [0] * len(self.buckets),
+                    'count': 0, 'sum': 0.0, 'errors': 0, 'bytes': 0,
+                    'cache': {'hit': 0, 'miss': 0},
+                }
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stage['bucket_counts'][index] += 1
+            stage['count'] += 1
+            stage['sum'] += seconds
+            if span.get('error'):
+                stage['errors'] += 1
+            if span.get('bytes'):
+                stage['bytes'] += span['bytes']
+            if span.get('cache') in stage['cache']:
+                stage['cache'][span['cache']] += 1
+    
+    def render(self) -> str:
+        """Metrics in Prometheus text format"""
+        with self._lock:
+            stages = {name: {**stage, 'bucket_counts': list(stage['bucket_counts']),
+                             'cache': dict(stage['cache'])}
+                      for name, stage in sorted(self._stages.items())}
+        
+        lines = [
+            '# HELP analysis_stage_duration_seconds Time spent in each analysis stage',
+            '# TYPE analysis_stage_duration_seconds histogram',
+        ]
+        for name, stage in stages.items():
+            for bound, count in zip(self.buckets, stage['bucket_counts']):
+                lines.append(f'analysis_stage_duration_seconds_bucket{{stage="{name}",le="{bound:g}"}} {count}')
+            lines.append(f'analysis_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}')
+            lines.append(f'analysis_stage_duration_seconds_sum{{stage="{name}"}} {stage["sum"]:.6f}')
+            lines.append(f'analysis_stage_duration_seconds_count{{stage="{name}"}} {stage["count"]}')
+        
+        lines += [
+            '# HELP analysis_stage_errors_total Spans that ended with an error',
+            '# TYPE analysis_stage_errors_total counter',
+        ]
+        lines += [f'analysis_stage_errors_total{{stage="{name}"}} {stage["errors"]}'
+                  for name, stage in stages.items()]
+        
+        lines += [
+            '# HELP analysis_stage_bytes_total Bytes of input processed by each stage',
+            '# TYPE analysis_stage_bytes_total counter',
+        ]
+        lines += [f'analysis_stage_bytes_total{{stage="{name}"}} {stage["bytes"]}'
+                  for name, stage in stages.items()]
+        
+        lines += [
+            '# HELP analysis_stage_cache_total Cache lookups per stage by result',
+            '# TYPE analysis_stage_cache_total counter',
+        ]
+        for name, stage in stages.items():
+            if not any(stage['cache'].values()):
+                continue
+            for result, count in stage['cache'].items():
+                lines.append(f'analysis_stage_cache_total{{stage="{name}",result="{result}"}} {count}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path: str):
+        """Atomically write the metrics to a file (e.g. for a node_exporter textfile collector)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temporary, path)
+    
+    def reset(self):
+        """Forget every observation"""
+        with self._lock:
+            self._stages.clear()
+
+
+# Process-wide registry every Trace reports to
+METRICS = MetricsRegistry()
+
+
+class Trace:
+    """
+    Ordered timing spans for one analysis
+    
+    Usage:
+        trace = Trace()
+        with trace.span('transcript', bytes_processed=len(url)) as span:
+            ...
+            span['cache'] = 'hit'
+        result['timings'] = trace.to_list()
+    """
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or METRICS
+        self.spans: List[Dict] = []
+    
+    @contextmanager
+    def span(self, stage: str, bytes_processed: Optional[int] = None,
+             cache: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Time a stage
+        
+        The yielded dict can be updated inside the block ('bytes', 'cache').
+        An exception is recorded as the span's 'error' and re-raised.
+        """
+        record = {'stage': stage, 'duration_ms': 0.0, 'bytes': bytes_processed, 'cache': cache, 'error': None}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            self.spans.append(record)
+            self.registry.observe(record)
+    
+    def total_ms(self) -> float:
+        """Sum of span durations"""
+        return round(sum(span['duration_ms'] for span in self.spans), 3)
+    
+    def to_list(self) -> List[Dict]:
+        """Copies of the spans, in the order they finished"""
+        return [dict(span) for span in self.spans]
+
+
+def start_metrics_server(port: int, host: str = '0.0.0.0',
+                         registry: Optional[MetricsRegistry] = None):
+    """
+    Serve GET /metrics from a daemon thread
+    
+    Returns:
+        The running ThreadingHTTPServer
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    registry = registry or METRICS
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    return server
+
+
+def start_metrics_server_from_env():
+    """
+    Start the metrics server if METRICS_PORT is set
+    
+    Returns:
+        The server, or None if disabled or the port is unavailable
+    """
+    port = os.environ.get('METRICS_PORT', '')
+    if not port:
+        return None
+    try:
+        return start_metrics_server(int(port))
+    except (OSError, ValueError) as e:
+        print(f"Could not start metrics server on port {port}: {e}")
+        return None
+
+
+def write_metrics_file_from_env(registry: Optional[MetricsRegistry] = None):
+    """Write the metrics to METRICS_FILE, if set"""
+    path = os.environ.get('METRICS_FILE', '')
+    if not path:
+        return
+    try:
+        (registry or METRICS).write(path)
+    except OSError as e:
+        print(f"Could not write metrics file {path}: {e}")
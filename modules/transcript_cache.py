@@ -0,0 +1,232 @@
+"""
+Transcript Cache Module
+Persistent SQLite cache of transcripts and availability metadata
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'transcripts.db')
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class TranscriptCache:
+    """
+    On-disk transcript cache keyed by (platform, video_id)
+    
+    Entries expire after a TTL and the least recently used entries are
+    evicted once the cache exceeds its entry or byte cap. Videos known to
+    have no transcript are cached as negative entries with their own
+    (shorter) TTL so they are not re-requested on every analysis.
+    
+    ``hits`` counts lookups that served a transcript and ``negative_hits``
+    those that served a negative entry. Entries holding only availability
+    metadata (from ``get_transcript_availability``) are counted as
+    ``availability_hits``, since the transcript still has to be fetched.
+    """
+    
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 negative_ttl_seconds: float = 6 * 3600,
+                 max_entries: int = 100000,
+                 max_bytes: Optional[int] = 512 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        self.hits = 0
+        self.negative_hits = 0
+        self.availability_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+    
+    @classmethod
+    def from_env(cls) -> Optional['TranscriptCache']:
+        """
+        Build a cache from environment settings
+        
+        TRANSCRIPT_CACHE_PATH sets the database file (an empty value disables
+        caching) and TRANSCRIPT_CACHE_TTL the TTL in seconds; a malformed
+        TTL falls back to the default.
+        """
+        path = os.environ.get('TRANSCRIPT_CACHE_PATH', DEFAULT_CACHE_PATH)
+        if not path:
+            return None
+        
+        ttl = os.environ.get('TRANSCRIPT_CACHE_TTL')
+        if not ttl:
+            return cls(path)
+        try:
+            ttl_seconds = float(ttl)
+        except ValueError:
+            print(f"Warning: invalid TRANSCRIPT_CACHE_TTL {ttl!r}, using {DEFAULT_TTL_SECONDS} seconds")
+            ttl_seconds = DEFAULT_TTL_SECONDS
+        return cls(path, ttl_seconds=ttl_seconds)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are opened lazily and never shared across a fork
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    platform TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    transcript TEXT,
+                    availability TEXT,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (platform, video_id)
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts (accessed_at)')
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+    
+    def get(self, platform: str, video_id: str) -> Optional[Dict]:
+        """
+        Look up a cached entry
+        
+        Returns:
+            Dict with 'transcript', 'availability' and 'negative' keys,
+            or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT transcript, availability, negative, created_at FROM transcripts '
+                'WHERE platform = ? AND video_id = ?',
+                (platform, video_id)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            transcript, availability, negative, created_at = row
+            ttl = self.negative_ttl_seconds if negative else self.ttl_seconds
+            if now - created_at > ttl:
+                conn.execute(
+                    'DELETE FROM transcripts WHERE platform = ? AND video_id = ?',
+                    (platform, video_id)
+                )
+                conn.commit()
+                self.misses += 1
+                return None
+            
+            conn.execute(
+                'UPDATE transcripts SET accessed_at = ? WHERE platform = ? AND video_id = ?',
+                (now, platform, video_id)
+            )
+            conn.commit()
+            
+            if negative:
+                self.negative_hits += 1
+            elif transcript is not None:
+                self.hits += 1
+            else:
+                self.availability_hits += 1
+        
+        return {
+            'transcript': transcript,
+            'availability': json.loads(availability) if availability else None,
+            'negative': bool(negative)
+        }
+    
+    def set(self, platform: str, video_id: str, transcript: Optional[str],
+            availability: Optional[Dict] = None, negative: bool = False):
+        """
+        Store a transcript, or a negative entry when ``negative`` is set
+        
+        Args:
+            platform: Video platform
+            video_id: Platform video ID
+            transcript: Transcript text (None for negative entries)
+            availability: Availability metadata for the video
+            negative: True if the video has no transcript available
+        """
+        now = time.time()
+        availability_json = json.dumps(availability) if availability is not None else None
+        size = len(transcript or '') + len(availability_json or '')
+        
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO transcripts '
+                '(platform, video_id, transcript, availability, negative, created_at, accessed_at, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (platform, video_id, transcript, availability_json, int(negative), now, now, size)
+            )
+            self._evict(conn)
+            conn.commit()
+    
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until under the size caps"""
+        count, total_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts'
+        ).fetchone()
+        
+        over_entries = count - self.max_entries if self.max_entries else 0
+        over_bytes = total_bytes - self.max_bytes if self.max_bytes else 0
+        if over_entries <= 0 and over_bytes <= 0:
+            return
+        
+        removed = 0
+        freed = 0
+        cursor = conn.execute(
+            'SELECT platform, video_id, size FROM transcripts ORDER BY accessed_at'
+        )
+        victims = []
+        for platform, video_id, size in cursor:
+            if removed >= over_entries and freed >= over_bytes:
+                break
+            victims.append((platform, video_id))
+            removed += 1
+            freed += size
+        
+        conn.executemany('DELETE FROM transcripts WHERE platform = ? AND video_id = ?', victims)
+        self.evictions += len(victims)
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters for this cache instance"""
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'availability_hits': self.availability_hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+    
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM transcripts')
+            conn.commit()
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
@@ -4,15 +4,36 @@ Extracts transcripts from videos using various methods
 Gracefully handles unavailable transcripts with informative messages
 """
 
-from typing import Dict, Optional
+import threading
+from typing import Dict, Optional, Tuple
+
+from modules.transcript_cache import TranscriptCache
+from modules.speech_to_text import ChunkedTranscriber
 
 
 class TranscriptExtractor:
     """Extract transcripts from videos with graceful fallback"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[TranscriptCache] = None,
+                 transcriber: Optional[ChunkedTranscriber] = None):
         self.supported_platforms = ['youtube', 'tiktok', 'instagram']
         self.extraction_notes = {}
+        self.cache = cache
+        self.transcriber = transcriber
+        self._status = threading.local()
+    
+    def warm_up(self):
+        """Import the transcript API and load the ASR backend ahead of the first video"""
+        try:
+            import youtube_transcript_api
+        except ImportError:
+            pass
+        if self.transcriber is not None:
+            self.transcriber.warm_up()
+    
+    def last_cache_status(self) -> Optional[str]:
+        """'hit' or 'miss' for this thread's last cached lookup, None if the cache was not consulted"""
+        return getattr(self._status, 'cache', None)
     
     def extract(self, video_info: Dict) -> Optional[str]:
         """
@@ -27,10 +48,15 @@ class TranscriptExtractor:
         
         platform = video_info.get('platform', '')
         video_id = video_info.get('video_id')
+        self._status.cache = None
         
         if not video_id:
             return None
         
+        # A local media file (e.g. downloaded with yt-dlp) is transcribed directly
+        if video_info.get('media_path') and platform != 'youtube':
+            return self.extract_from_media(video_info['media_path'])
+        
         # Try platform-specific extraction
         if platform == 'youtube':
             transcript = self._extract_youtube_transcript(video_id)
@@ -57,6 +83,35 @@ class TranscriptExtractor:
         if not video_id:
             return None
         
+        if self.cache is not None:
+            cached = self.cache.get('youtube', video_id)
+            # Entries written by get_transcript_availability carry no transcript yet
+            if cached is not None and (cached['negative'] or cached['transcript'] is not None):
+                self._status.cache = 'hit'
+                return cached['transcript']
+            self._status.cache = 'miss'
+        
+        fetched = self._fetch_youtube_transcript(video_id)
+        if fetched is None:
+            return None
+        
+        transcript, availability = fetched
+        if self.cache is not None:
+            self.cache.set(
+                'youtube', video_id, transcript, availability,
+                negative=transcript is None
+            )
+        return transcript
+    
+    @staticmethod
+    def _fetch_youtube_transcript(video_id: str) -> Optional[Tuple[Optional[str], Dict]]:
+        """
+        Fetch transcript and availability with a single listing call
+        
+        Returns:
+            (transcript or None, availability info), or None on errors
+            that should not be cached (missing library, network failures)
+        """
         try:
             # Try to import YouTube Transcript API
             from youtube_transcript_api import YouTubeTranscriptApi
@@ -65,25 +120,30 @@ class TranscriptExtractor:
             try:
                 # List available transcripts
                 transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+                availability = TranscriptExtractor._availability_from_listing(video_id, transcript_list)
                 
                 # Prefer manually created transcripts
                 if transcript_list.manually_created_transcripts:
                     transcript = transcript_list.manually_created_transcripts[0]
                     transcript_data = transcript.fetch()
-                    return ' '.join([item['text'] for item in transcript_data])
+                    return ' '.join([item['text'] for item in transcript_data]), availability
                 
                 # Fall back to auto-generated
                 elif transcript_list.generated_transcripts:
                     transcript = transcript_list.generated_transcripts[0]
                     transcript_data = transcript.fetch()
-                    return ' '.join([item['text'] for item in transcript_data])
+                    return ' '.join([item['text'] for item in transcript_data]), availability
                 else:
-                    return None
+                    return None, availability
                     
             except (TranscriptsDisabled, NoTranscriptFound) as e:
                 # Video has transcripts disabled or none available
                 print(f"Transcripts not available for YouTube video {video_id}")
-                return None
+                return None, {
+                    'available': False,
+                    'video_id': video_id,
+                    'reason': str(e)
+                }
                 
         except ImportError:
             print("youtube-transcript-api not installed")
@@ -92,6 +152,36 @@ class TranscriptExtractor:
             print(f"Error extracting YouTube transcript: {e}")
             return None
     
+    @staticmethod
+    def _availability_from_listing(video_id: str, transcript_list) -> Dict:
+        """Build availability info from a YouTube transcript listing"""
+        return {
+            'available': True,
+            'video_id': video_id,
+            'manually_created': bool(transcript_list.manually_created_transcripts),
+            'auto_generated': bool(transcript_list.generated_transcripts),
+            'languages': [t.language for t in (
+                transcript_list.manually_created_transcripts + 
+                transcript_list.generated_transcripts
+            )]
+        }
+    
+    def extract_from_media(self, media_path: str) -> Optional[str]:
+        """
+        Transcribe a local audio or video file with speech-to-text
+        
+        Returns None if no transcriber is configured or transcription fails
+        """
+        if self.transcriber is None:
+            print("No speech-to-text backend configured (set ASR_BACKEND)")
+            return None
+        
+        try:
+            return self.transcriber.transcribe(media_path)
+        except Exception as e:
+            print(f"Error transcribing {media_path}: {e}")
+            return None
+    
     def _extract_tiktok_transcript(self, video_info: Dict) -> Optional[str]:
         """
         Extract transcript from TikTok
@@ -102,13 +192,9 @@ class TranscriptExtractor:
         - Text overlays require OCR (requires video download)
         - Audio requires speech-to-text (requires video download)
         
-        Future enhancement will use:
-        - yt-dlp for video download
-        - EasyOCR for text overlays
-        - Whisper API for audio transcription
-        
-        Currently returns None to allow analysis to proceed
-        without transcript data.
+        Downloaded media is transcribed by ``extract_from_media`` when
+        video_info carries a 'media_path'. Without one this returns None
+        to allow analysis to proceed without transcript data.
         """
         return None
     
@@ -121,16 +207,21 @@ class TranscriptExtractor:
         - Text overlays (requires OCR)
         - Audio content (requires speech-to-text)
         
-        Currently returns None. When transcript unavailable,
-        app analyzes available metadata and visual indicators.
+        Downloaded media is transcribed by ``extract_from_media`` when
+        video_info carries a 'media_path'. Otherwise returns None; when
+        transcript unavailable, app analyzes available metadata and
+        visual indicators.
         """
         return None
     
     @staticmethod
-    def get_transcript_availability(video_id: str, platform: str) -> Dict:
+    def get_transcript_availability(video_id: str, platform: str,
+                                    cache: Optional[TranscriptCache] = None) -> Dict:
         """
         Check what transcript formats are available for a video
         
+        Served from cache when a previous extraction or lookup stored it.
+        
         Returns a detailed dictionary with availability info
         """
         if platform != 'youtube':
@@ -140,23 +231,22 @@ class TranscriptExtractor:
                 'reason': 'Platform transcripts not yet supported'
             }
         
+        cached = cache.get(platform, video_id) if cache is not None else None
+        if cached is not None and cached['availability'] is not None:
+            return cached['availability']
+        
         try:
             from youtube_transcript_api import YouTubeTranscriptApi
             transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-            
-            return {
-                'available': True,
-                'video_id': video_id,
-                'manually_created': bool(transcript_list.manually_created_transcripts),
-                'auto_generated': bool(transcript_list.generated_transcripts),
-                'languages': [t.language for t in (
-                    transcript_list.manually_created_transcripts + 
-                    transcript_list.generated_transcripts
-                )]
-            }
+            availability = TranscriptExtractor._availability_from_listing(video_id, transcript_list)
         except Exception as e:
             return {
                 'available': False,
                 'video_id': video_id,
                 'reason': str(e)
             }
+        
+        if cache is not None:
+            # Keep an already cached transcript alongside the fresh metadata
+            cache.set(platform, video_id, cached['transcript'] if cached else None, availability)
+        return availability
@@ -4,7 +4,143 @@ Extracts video information from platform links
 """
 
 import re
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+# Canonical (platform, video_id) identity of a video, used for dedup and caching
+VideoKey = Tuple[str, str]
+
+# userinfo and port are skipped; groups are scheme, host, path and query.
+# 'host:port' without a scheme is not mistaken for a scheme.
+# Splits like urllib.parse.urlsplit, without building a SplitResult per link
+URL_PARTS = re.compile(
+    r'\s*(?:([a-zA-Z][a-zA-Z0-9+.-]*):(?!\d+(?:[/?#]|$))(?://)?)?(?:[^/?#@]*@)?([^/?#:]*)(?::\d*)?([^?#]*)(?:\?([^#]*))?'
+)
+
+# Links without a scheme are taken as https; any other scheme (javascript:,
+# data:, file:...) is rejected so a key never comes from an unsafe link
+ALLOWED_SCHEMES = ('http', 'https')
+
+YOUTUBE_QUERY_ID = re.compile(r'(?:^|[&;])v=([a-zA-Z0-9_-]{11})(?:[&;#]|$)')
+YOUTUBE_PATH = re.compile(r'/(?:shorts|embed|live|v)/([a-zA-Z0-9_-]{11})(?:/|$)')
+YOUTU_BE_PATH = re.compile(r'/([a-zA-Z0-9_-]{11})(?:/|$)')
+TIKTOK_PATH = re.compile(r'(?:/@[^/]+)?/(?:video|v)/(\d+)(?:\.html)?(?:/|$)')
+TIKTOK_SHORT_PATH = re.compile(r'/(?:t/)?([a-zA-Z0-9]+)/?$')
+INSTAGRAM_PATH = re.compile(r'(?:/[a-zA-Z0-9_.]+)?/(?:p|reel|reels|tv)/([a-zA-Z0-9_-]+)(?:/|$)')
+
+# Host prefixes that do not change which video a link points to
+HOST_PREFIXES = ('www.', 'm.', 'mobile.')
+
+# Host -> platform and extractor name
+HOST_DISPATCH = {
+    'youtube.com': ('youtube', 'youtube'),
+    'music.youtube.com': ('youtube', 'youtube'),
+    'youtube-nocookie.com': ('youtube', 'youtube'),
+    'youtu.be': ('youtube', 'youtu_be'),
+    'tiktok.com': ('tiktok', 'tiktok'),
+    'vm.tiktok.com': ('tiktok', 'tiktok_short'),
+    'vt.tiktok.com': ('tiktok', 'tiktok_short'),
+    'instagram.com': ('instagram', 'instagram'),
+    'instagr.am': ('instagram', 'instagram'),
+}
+
+CANONICAL_URLS = {
+    'youtube': 'https://www.youtube.com/watch?v={}',
+    'tiktok': 'https://www.tiktok.com/video/{}',
+    'instagram': 'https://www.instagram.com/reel/{}/',
+}
+TIKTOK_SHORT_URL = 'https://vm.tiktok.com/{}/'
+
+
+def _extract_youtube(path: str, query: str) -> Optional[str]:
+    if path in ('/watch', '/watch/'):
+        match = YOUTUBE_QUERY_ID.search(query)
+        return match.group(1) if match else None
+    match = YOUTUBE_PATH.match(path)
+    return match.group(1) if match else None
+
+
+def _extract_youtu_be(path: str, query: str) -> Optional[str]:
+    match = YOUTU_BE_PATH.match(path)
+    return match.group(1) if match else None
+
+
+def _extract_tiktok(path: str, query: str) -> Optional[str]:
+    match = TIKTOK_PATH.match(path)
+    if match:
+        return match.group(1)
+    # tiktok.com/t/{code} is the web form of a vm.tiktok.com short link
+    if path.startswith('/t/'):
+        return _extract_tiktok_short(path, query)
+    return None
+
+
+def _extract_tiktok_short(path: str, query: str) -> Optional[str]:
+    match = TIKTOK_SHORT_PATH.match(path)
+    return match.group(1) if match else None
+
+
+def _extract_instagram(path: str, query: str) -> Optional[str]:
+    match = INSTAGRAM_PATH.match(path)
+    return match.group(1) if match else None
+
+
+EXTRACTORS = {
+    'youtube': _extract_youtube,
+    'youtu_be': _extract_youtu_be,
+    'tiktok': _extract_tiktok,
+    'tiktok_short': _extract_tiktok_short,
+    'instagram': _extract_instagram,
+}
+
+
+def canonical_key(url: str) -> Optional[VideoKey]:
+    """
+    Canonical (platform, video_id) of a video link
+    
+    The URL is split once and dispatched on its host, so scheme, ``www.``
+    and mobile hosts, query strings, fragments, trailing slashes and
+    surrounding whitespace do not change the key. Only http, https and scheme-less links are accepted.
+    TikTok short links (vm.tiktok.com) keep their short code as the ID
+    since resolving them needs a network request.
+    
+    Returns:
+        (platform, video_id), or None if the link is invalid or unsupported
+    """
+    url = (url or '').strip()
+    if not url:
+        return None
+    
+    scheme, host, path, query = URL_PARTS.match(url).groups()
+    if scheme is not None and scheme.lower() not in ALLOWED_SCHEMES:
+        return None
+    host = host.lower().rstrip('.')
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    
+    dispatch = HOST_DISPATCH.get(host)
+    if dispatch is None:
+        return None
+    platform, extractor = dispatch
+    
+    video_id = EXTRACTORS[extractor](path, query or '')
+    return (platform, video_id) if video_id else None
+
+
+def canonical_url(key: VideoKey) -> str:
+    """Stable link for a canonical key"""
+    platform, video_id = key
+    if not is_resolved(key):
+        return TIKTOK_SHORT_URL.format(video_id)
+    return CANONICAL_URLS[platform].format(video_id)
+
+
+def is_resolved(key: VideoKey) -> bool:
+    """False for TikTok short-link keys, whose ID needs a network request to resolve"""
+    platform, video_id = key
+    return platform != 'tiktok' or video_id.isdigit()
 
 
 class VideoProcessor:
@@ -24,83 +160,68 @@ class VideoProcessor:
             Dictionary with video info or None if invalid
         """
         
-        if not url:
+        url = (url or '').strip()
+        key = canonical_key(url)
+        if key is None:
             return None
+        return self._video_info(url, key)
+    
+    def process_links(self, urls: Iterable[str],
+                      resolve: Optional[Callable[[VideoKey], VideoKey]] = None) -> Dict:
+        """
+        Process many links, dropping invalid ones and duplicates of the same video
         
-        # Determine platform
-        platform = self._identify_platform(url)
+        Links are deduplicated on their canonical (platform, video_id) key, so
+        e.g. a youtu.be link and a youtube.com/watch link with tracking
+        parameters count as one video. The first link seen for a video is kept.
         
-        if not platform:
-            return None
+        TikTok short links keep their short code unless ``resolve`` is given,
+        so a short link and the full link of the same video only count as one
+        when the caller allows the network requests to resolve them.
         
-        # Extract video ID based on platform
-        if platform == 'tiktok':
-            video_id = self._extract_tiktok_id(url)
-        elif platform == 'instagram':
-            video_id = self._extract_instagram_id(url)
-        elif platform == 'youtube':
-            video_id = self._extract_youtube_id(url)
-        else:
-            return None
+        Args:
+            urls: Video URLs
+            resolve: Maps a short-link key to the video's numeric key, e.g.
+                ``MetadataProvider.resolve_key``; called before dedup
+            
+        Returns:
+            Dict with 'videos' (video info of each unique video, in input
+            order), 'total', 'duplicates' and 'invalid' counts
+        """
+        videos = []
+        seen = set()
+        total = duplicates = invalid = 0
         
-        if not video_id:
-            return None
+        for url in urls:
+            total += 1
+            url = (url or '').strip()
+            key = canonical_key(url)
+            if key is not None and resolve is not None and not is_resolved(key):
+                key = resolve(key)
+            if key is None:
+                invalid += 1
+            elif key in seen:
+                duplicates += 1
+            else:
+                seen.add(key)
+                videos.append(self._video_info(url, key))
         
+        return {
+            'videos': videos,
+            'total': total,
+            'duplicates': duplicates,
+            'invalid': invalid,
+        }
+    
+    @staticmethod
+    def _video_info(url: str, key: VideoKey) -> Dict:
+        platform, video_id = key
         return {
             'platform': platform,
             'url': url,
             'video_id': video_id,
+            'canonical_url': canonical_url(key),
             'title': 'Video Analysis',  # Would be extracted from platform API
             'duration': 0,  # Would be extracted from platform API
             'upload_date': None,  # Would be extracted from platform API
         }
-    
-    def _identify_platform(self, url: str) -> Optional[str]:
-        """Identify platform from URL"""
-        url_lower = url.lower()
-        
-        if 'tiktok.com' in url_lower or 'vm.tiktok.com' in url_lower:
-            return 'tiktok'
-        elif 'instagram.com' in url_lower or 'instagr.am' in url_lower:
-            return 'instagram'
-        elif 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-            return 'youtube'
-        
-        return None
-    
-    def _extract_tiktok_id(self, url: str) -> Optional[str]:
-        """Extract TikTok video ID"""
-        # Pattern for tiktok.com/video/{id}
-        match = re.search(r'/video/(\d+)', url)
-        if match:
-            return match.group(1)
-        
-        # Pattern for vm.tiktok.com/{id}
-        match = re.search(r'/([a-zA-Z0-9]+)$', url)
-        if match:
-            return match.group(1)
-        
-        return None
-    
-    def _extract_instagram_id(self, url: str) -> Optional[str]:
-        """Extract Instagram video/reel ID"""
-        # Pattern for instagram.com/p/{id} or /reel/{id}
-        match = re.search(r'/(p|reel)/([a-zA-Z0-9_-]+)', url)
-        if match:
-            return match.group(2)
-        
-        return None
-    
-    def _extract_youtube_id(self, url: str) -> Optional[str]:
-        """Extract YouTube video ID"""
-        # Pattern for youtube.com/watch?v={id}
-        match = re.search(r'v=([a-zA-Z0-9_-]{11})', url)
-        if match:
-            return match.group(1)
-        
-        # Pattern for youtu.be/{id}
-        match = re.search(r'youtu\.be/([a-zA-Z0-9_-]{11})', url)
-        if match:
-            return match.group(1)
-        
-        return None
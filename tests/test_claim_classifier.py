@@ -0,0 +1,88 @@
+import pytest
+
+from modules.claim_classifier import ClaimClassifier, MicroBatcher, StubClaimBackend
+from modules.claim_detector import ClaimDetector
+
+
+PLAIN_SENTENCE = 'The weather in the valley changed quickly that afternoon'
+NUMBER_SENTENCE = 'Over 90 percent of the town signed the petition last week'
+
+
+class FailingBackend(StubClaimBackend):
+    def predict(self, sentences):
+        raise RuntimeError('model unavailable')
+
+
+class ShortBackend(StubClaimBackend):
+    """Returns one score per batch, whatever its size"""
+    
+    def predict(self, sentences):
+        return [0.5]
+
+
+def test_batcher_scores_duplicates_once():
+    backend = StubClaimBackend(lambda sentence: len(sentence) / 10)
+    batcher = MicroBatcher(backend, max_batch_size=8, max_latency_ms=100)
+    futures = [batcher.submit(sentence) for sentence in ('abc', 'abcde', 'abc')]
+    
+    assert [future.result(timeout=2) for future in futures] == [0.3, 0.5, 0.3]
+    assert backend.batches == [2]
+
+
+def test_batcher_error_reaches_every_caller_and_thread_survives():
+    batcher = MicroBatcher(FailingBackend(), max_latency_ms=50)
+    futures = [batcher.submit('a'), batcher.submit('b')]
+    for future in futures:
+        with pytest.raises(RuntimeError, match='model unavailable'):
+            future.result(timeout=2)
+    
+    batcher.backend = StubClaimBackend(lambda sentence: 0.7)
+    assert batcher.submit('c').result(timeout=2) == 0.7
+
+
+def test_batcher_rejects_wrong_number_of_scores():
+    batcher = MicroBatcher(ShortBackend(), max_latency_ms=100)
+    futures = [batcher.submit('a'), batcher.submit('b')]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
+    
+    assert batcher.submit('c').result(timeout=2) == 0.5
+
+
+def test_classifier_caches_scores_by_normalized_sentence():
+    backend = StubClaimBackend(lambda sentence: 0.9)
+    classifier = ClaimClassifier(backend, max_latency_ms=1)
+    
+    assert classifier.score(['Same  sentence', 'other']) == [0.9, 0.9]
+    assert classifier.score(['same sentence']) == [0.9]
+    assert sum(backend.batches) == 2
+
+
+def test_detector_uses_model_score():
+    classifier = ClaimClassifier(StubClaimBackend(lambda sentence: 0.9 if 'weather' in sentence else 0.1),
+                                 max_latency_ms=1)
+    detector = ClaimDetector(classifier=classifier)
+    
+    claims = detector.detect_claims(f'{PLAIN_SENTENCE}. {NUMBER_SENTENCE}')
+    
+    assert [claim['text'] for claim in claims] == [PLAIN_SENTENCE]
+
+
+def test_detector_falls_back_to_heuristic_when_model_fails():
+    detector = ClaimDetector(classifier=ClaimClassifier(FailingBackend(), max_latency_ms=1))
+    text = f'{PLAIN_SENTENCE}. {NUMBER_SENTENCE}'
+    
+    assert detector.detect_claims(text) == ClaimDetector().detect_claims(text)
+    assert [claim['text'] for claim in detector.iter_claims(text)] == [NUMBER_SENTENCE]
+
+
+def test_streaming_scores_sentences_in_blocks():
+    backend = StubClaimBackend()
+    detector = ClaimDetector(classifier=ClaimClassifier(backend, max_latency_ms=100))
+    text = ' '.join(f'Sentence number {index} is here.' for index in range(70))
+    
+    list(detector.iter_claims(text))
+    
+    assert sum(backend.batches) == 70
+    assert len(backend.batches) <= 3
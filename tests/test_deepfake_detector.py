@@ -0,0 +1,68 @@
+import pytest
+
+from modules.deepfake_detector import CropBatcher, DeepfakeScorer, aggregate_frame_scores
+
+
+class FakeScorer(DeepfakeScorer):
+    """Scores 'crops' that are already probabilities, without torch"""
+    
+    def __init__(self, batch_size=32):
+        self.batches = []
+        super().__init__('unused.pt', batch_size=batch_size)
+    
+    def score_crops(self, crops):
+        self.batches.append(len(crops))
+        return list(crops)
+
+
+def test_aggregate_uses_top_quarter():
+    assert aggregate_frame_scores([]) == 0
+    assert aggregate_frame_scores([0.9, 0.1, 0.1, 0.1]) == 90
+    assert aggregate_frame_scores([0.5] * 8) == 50
+
+
+def test_score_videos_splits_shared_batch_per_video():
+    scorer = FakeScorer()
+    scores = scorer.score_videos({'a': [0.2, 0.4], 'b': [0.9], 'c': []})
+    
+    assert scores['a']['frame_scores'] == [0.2, 0.4]
+    assert scores['b'] == {'deepfake_model_score': 90, 'frame_scores': [0.9], 'frames_scored': 1}
+    assert scores['c']['frames_scored'] == 0
+    assert scorer.batches == [3]
+
+
+def test_batcher_packs_concurrent_requests():
+    calls = []
+    
+    def score_batch(crops):
+        calls.append(len(crops))
+        return [float(crop) for crop in crops]
+    
+    batcher = CropBatcher(score_batch, batch_size=8, max_latency_ms=200)
+    futures = [batcher.submit([index, index]) for index in range(4)]
+    
+    assert [future.result(timeout=2) for future in futures] == [[0.0, 0.0], [1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]
+    assert calls == [8]
+
+
+def test_batcher_error_reaches_every_caller_and_thread_survives():
+    def score_batch(crops):
+        if 'bad' in crops:
+            raise RuntimeError('model failed')
+        return [0.5] * len(crops)
+    
+    batcher = CropBatcher(score_batch, max_latency_ms=50)
+    failed = [batcher.submit(['bad']), batcher.submit(['ok'])]
+    for future in failed:
+        with pytest.raises(RuntimeError, match='model failed'):
+            future.result(timeout=2)
+    
+    assert batcher.submit(['ok']).result(timeout=2) == [0.5]
+
+
+def test_batcher_rejects_wrong_number_of_scores():
+    batcher = CropBatcher(lambda crops: [0.5], max_latency_ms=1)
+    
+    with pytest.raises(ValueError):
+        batcher.submit(['a', 'b']).result(timeout=2)
+    assert batcher.submit(['a']).result(timeout=2) == [0.5]
@@ -0,0 +1,90 @@
+import pytest
+
+from modules.metadata import MetadataBatcher, MetadataProvider, StubMetadataBackend
+from modules.pipeline import AnalysisPipeline
+from modules.video_processor import VideoProcessor
+
+
+SHORT_LINK = 'https://vm.tiktok.com/ZMabc123/'
+FULL_LINK = 'https://www.tiktok.com/@someone/video/7000000000000000001'
+VIDEO_KEY = ('tiktok', '7000000000000000001')
+
+
+class StubResolver:
+    """Resolves every short link to VIDEO_KEY and counts the requests"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def resolve(self, url):
+        self.requests.append(url)
+        return VIDEO_KEY
+
+
+class FailingBackend(StubMetadataBackend):
+    def fetch(self, platform, video_ids):
+        raise RuntimeError('quota exceeded')
+
+
+def make_provider(records=None):
+    return MetadataProvider([StubMetadataBackend(records or {})], StubResolver())
+
+
+def test_short_links_stay_separate_without_resolver():
+    result = VideoProcessor().process_links([SHORT_LINK, FULL_LINK])
+    
+    assert result['duplicates'] == 0
+    assert len(result['videos']) == 2
+
+
+def test_short_link_is_resolved_before_dedup():
+    provider = make_provider()
+    result = VideoProcessor().process_links([SHORT_LINK, FULL_LINK, SHORT_LINK], provider.resolve_key)
+    
+    assert result['duplicates'] == 2
+    assert [video['video_id'] for video in result['videos']] == [VIDEO_KEY[1]]
+    assert result['videos'][0]['canonical_url'] == 'https://www.tiktok.com/video/7000000000000000001'
+    # The redirect is cached, and full links need no request
+    assert provider.resolver.requests == ['https://vm.tiktok.com/ZMabc123/']
+
+
+def test_pipeline_resolves_only_with_a_provider():
+    with_provider = AnalysisPipeline(metadata_provider=make_provider())
+    assert with_provider.process_links([SHORT_LINK, FULL_LINK])['duplicates'] == 1
+    
+    without_provider = AnalysisPipeline()
+    without_provider.metadata_provider = None
+    assert without_provider.process_links([SHORT_LINK, FULL_LINK])['duplicates'] == 0
+
+
+def test_enrich_resolves_short_link_and_fills_metadata():
+    provider = make_provider({VIDEO_KEY: {'title': 'Resolved video', 'duration': 42, 'channel': 'someone'}})
+    video_info = VideoProcessor().process_link(SHORT_LINK)
+    
+    provider.enrich(video_info)
+    
+    assert (video_info['video_id'], video_info['title'], video_info['duration']) == (VIDEO_KEY[1], 'Resolved video', 42)
+    assert provider.last_cache_status() == 'miss'
+    provider.enrich(VideoProcessor().process_link(FULL_LINK))
+    assert provider.last_cache_status() == 'hit'
+
+
+def test_batcher_error_reaches_every_caller_and_thread_survives():
+    batcher = MetadataBatcher(FailingBackend({}), max_latency_ms=50)
+    futures = [batcher.submit('youtube', 'a'), batcher.submit('youtube', 'b')]
+    for future in futures:
+        with pytest.raises(RuntimeError, match='quota exceeded'):
+            future.result(timeout=2)
+    
+    batcher.backend = StubMetadataBackend({('youtube', 'c'): {'title': 'C'}})
+    assert batcher.submit('youtube', 'c').result(timeout=2) == {'title': 'C'}
+
+
+def test_failed_lookups_are_not_cached():
+    provider = MetadataProvider([FailingBackend({})])
+    video_info = {'platform': 'youtube', 'video_id': 'dQw4w9WgXcQ'}
+    
+    provider.enrich(video_info)
+    
+    assert 'title' not in video_info
+    assert provider.cache.get(('youtube', 'dQw4w9WgXcQ'), 'missing') == 'missing'
@@ -0,0 +1,98 @@
+import os
+import struct
+import wave
+
+import pytest
+
+from modules.speech_to_text import (
+    SAMPLE_RATE, ChunkedTranscriber, StubASRBackend, iter_audio_windows, iter_pcm_chunks,
+    merge_overlapping_text,
+)
+
+
+def write_wav(path, seconds, sample_rate=SAMPLE_RATE):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\x00\x00' * int(seconds * sample_rate))
+    return str(path)
+
+
+def write_float_wav(path):
+    """A 32-bit float WAV (format 3), which the wave module cannot open"""
+    data = struct.pack('<4f', 0.0, 0.1, 0.2, 0.3)
+    fmt = struct.pack('<HHIIHH', 3, 1, SAMPLE_RATE, SAMPLE_RATE * 4, 4, 32)
+    riff = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', len(data)) + data
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', len(riff)) + riff)
+    return str(path)
+
+
+def test_windows_overlap(tmp_path):
+    path = write_wav(tmp_path / 'audio.wav', 5.0)
+    windows = list(iter_audio_windows(path, window_seconds=2.0, overlap_seconds=0.5))
+    
+    assert [(window.start, window.end) for window in windows] == [(0.0, 2.0), (1.5, 3.5), (3.0, 5.0)]
+    assert all(len(window.samples) == 2 * SAMPLE_RATE * 2 for window in windows)
+
+
+def test_final_partial_window_is_kept(tmp_path):
+    path = write_wav(tmp_path / 'audio.wav', 4.0)
+    windows = list(iter_audio_windows(path, window_seconds=2.0, overlap_seconds=0.5))
+    
+    assert [(window.start, window.end) for window in windows] == [(0.0, 2.0), (1.5, 3.5), (3.0, 4.0)]
+
+
+def test_short_file_is_one_window(tmp_path):
+    path = write_wav(tmp_path / 'audio.wav', 0.5)
+    windows = list(iter_audio_windows(path, window_seconds=2.0, overlap_seconds=0.5))
+    
+    assert [(window.start, window.end) for window in windows] == [(0.0, 0.5)]
+
+
+def test_overlap_must_be_shorter_than_window(tmp_path):
+    path = write_wav(tmp_path / 'audio.wav', 1.0)
+    with pytest.raises(ValueError):
+        list(iter_audio_windows(path, window_seconds=1.0, overlap_seconds=1.0))
+
+
+def test_merge_drops_repeated_words():
+    assert merge_overlapping_text('the cure works fast', 'Works fast, and cheap') == 'and cheap'
+    assert merge_overlapping_text('the cure works', 'nothing shared here') == 'nothing shared here'
+
+
+def test_transcriber_merges_windows_in_order(tmp_path):
+    path = write_wav(tmp_path / 'audio.wav', 5.0)
+    texts = {0.0: 'the cure works fast', 1.5: 'works fast and cheap', 3.0: 'and cheap today'}
+    transcriber = ChunkedTranscriber(
+        StubASRBackend(lambda window: texts[window.start]),
+        window_seconds=2.0, overlap_seconds=0.5, max_workers=2, max_pending=1
+    )
+    
+    segments = list(transcriber.iter_segments(path))
+    
+    assert [(segment['start'], segment['text']) for segment in segments] == [
+        (0.0, 'the cure works fast'), (1.5, 'and cheap'), (3.0, 'today'),
+    ]
+    assert transcriber.transcribe(path) == 'the cure works fast and cheap today'
+
+
+def test_silent_windows_are_skipped(tmp_path):
+    path = write_wav(tmp_path / 'audio.wav', 5.0)
+    transcriber = ChunkedTranscriber(StubASRBackend(lambda window: ''), window_seconds=2.0, overlap_seconds=0.5)
+    
+    assert transcriber.transcribe(path) is None
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='fake ffmpeg is a shell script')
+def test_unparseable_wav_falls_back_to_ffmpeg(tmp_path, monkeypatch):
+    fake_ffmpeg = tmp_path / 'bin' / 'ffmpeg'
+    fake_ffmpeg.parent.mkdir()
+    fake_ffmpeg.write_text('#!/bin/sh\nhead -c 1000 /dev/zero\n')
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{fake_ffmpeg.parent}{os.pathsep}{os.environ['PATH']}")
+    
+    path = write_float_wav(tmp_path / 'float.wav')
+    
+    assert sum(len(chunk) for chunk in iter_pcm_chunks(path)) == 1000
@@ -0,0 +1,77 @@
+import pytest
+
+from modules.report_generator import iter_analysis_html
+from modules.video_processor import VideoProcessor, canonical_key, canonical_url
+
+
+YOUTUBE_KEY = ('youtube', 'dQw4w9WgXcQ')
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ ',
+    '  https://youtu.be/dQw4w9WgXcQ\n',
+    'youtube.com/watch?feature=share&v=dQw4w9WgXcQ#t=10',
+    'HTTP://M.YouTube.com/shorts/dQw4w9WgXcQ/',
+    'https://www.youtube.com:443/embed/dQw4w9WgXcQ',
+    'www.youtube.com:443/live/dQw4w9WgXcQ',
+    'https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=abc',
+    'https://user@youtube-nocookie.com/embed/dQw4w9WgXcQ',
+])
+def test_youtube_link_forms_share_a_key(url):
+    assert canonical_key(url) == YOUTUBE_KEY
+
+
+@pytest.mark.parametrize('url, key', [
+    ('https://www.tiktok.com/@someone/video/7000000000000000001?lang=en', ('tiktok', '7000000000000000001')),
+    ('https://vm.tiktok.com/ZMabc123/', ('tiktok', 'ZMabc123')),
+    ('https://www.tiktok.com/t/ZMabc123/', ('tiktok', 'ZMabc123')),
+    ('https://www.instagram.com/reel/Cabc_12-3/?igsh=x', ('instagram', 'Cabc_12-3')),
+    ('instagr.am/p/Cabc123', ('instagram', 'Cabc123')),
+])
+def test_other_platforms(url, key):
+    assert canonical_key(url) == key
+
+
+@pytest.mark.parametrize('url', [
+    None,
+    '',
+    '   ',
+    'https://example.com/watch?v=dQw4w9WgXcQ',
+    'https://www.youtube.com/watch?v=short',
+    'https://www.youtube.com/watch?vv=dQw4w9WgXcQ',
+    'javascript://youtube.com/watch?v=dQw4w9WgXcQ%0aalert(1)',
+    'javascript:alert(1)//youtu.be/dQw4w9WgXcQ',
+    'data:text/html,youtube.com/watch?v=dQw4w9WgXcQ',
+    'ftp://youtu.be/dQw4w9WgXcQ',
+])
+def test_invalid_and_unsafe_links_have_no_key(url):
+    assert canonical_key(url) is None
+
+
+def test_canonical_url_round_trips():
+    for key in (YOUTUBE_KEY, ('tiktok', '7000000000000000001'), ('tiktok', 'ZMabc123'), ('instagram', 'Cabc123')):
+        assert canonical_key(canonical_url(key)) == key
+
+
+def test_process_links_strips_and_dedups():
+    result = VideoProcessor().process_links([
+        'https://youtu.be/dQw4w9WgXcQ ',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=tracking',
+        'not a link',
+        'https://www.instagram.com/reel/Cabc123/',
+    ])
+    
+    assert (result['total'], result['duplicates'], result['invalid']) == (4, 1, 1)
+    assert [video['url'] for video in result['videos']] == [
+        'https://youtu.be/dQw4w9WgXcQ', 'https://www.instagram.com/reel/Cabc123/',
+    ]
+
+
+def test_html_report_links_canonical_url_only():
+    html = ''.join(iter_analysis_html({'url': 'javascript://youtube.com/watch?v=dQw4w9WgXcQ'}))
+    assert 'href=""' in html
+    assert 'href="javascript' not in html
+    
+    html = ''.join(iter_analysis_html({'url': 'youtu.be/dQw4w9WgXcQ?si=x'}))
+    assert '<a href="https://www.youtube.com/watch?v=dQw4w9WgXcQ">' in html